@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# mywm1.0/bench/bench_layouts.py
+# Benchmark de layouts, multi-monitor e decorações com X falso
+#
+# Uso (a partir da raiz do repositório):
+#   python3 -m bench.bench_layouts                       # roda tudo
+#   python3 -m bench.bench_layouts --counts 1,10,100     # subconjunto
+#   python3 -m bench.bench_layouts --save bench/baseline.json
+#   python3 -m bench.bench_layouts --compare bench/baseline.json
+#
+# Para cada cenário mede: tempo de um apply a frio (cache de geometria vazio),
+# tempo de um apply repetido (cache quente), requests X emitidos em cada caso,
+# round trips e pico de alocação (tracemalloc). A coluna "growth" é o expoente
+# k estimado de t ~ n^k entre as duas maiores contagens — permite checar
+# afirmações como "BSP é O(n log n)" em vez de adivinhar.
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.fakex import FakeDisplay
+from core.geometry import GeometryCache
+from core.layouts import LayoutManager
+
+DEFAULT_COUNTS = [1, 10, 100, 1000, 10000]
+DEFAULT_MONITORS = [1, 2, 4]
+
+# =======================
+# CENÁRIOS
+# =======================
+class FakeWM:
+    """O mínimo de WM que MultiMonitorWM e Decorations esperam."""
+    def __init__(self, dpy, layout_manager):
+        self.dpy = dpy
+        self.root = dpy.screen().root
+        self.layout_manager = layout_manager
+        self.transaction = None
+        self.monitors = []
+        self.focus = None
+
+
+def _spread(dpy, n, monitors):
+    """Cria n janelas distribuídas entre os monitores (round robin)."""
+    rects = dpy.screen().root.monitors
+    groups = [[] for _ in rects]
+    for i in range(n):
+        mx, my, mw, mh = rects[i % len(rects)]
+        groups[i % len(rects)].append(dpy.create_window(x=mx + 10, y=my + 10, width=mw // 2, height=mh // 2))
+    return rects, groups
+
+
+def layout_scenario(layout_name, n, monitors):
+    dpy = FakeDisplay(monitors)
+    rects, groups = _spread(dpy, n, monitors)
+
+    def setup():
+        lm = LayoutManager(cache=GeometryCache())
+        lm.set_layout(layout_name)
+        return lm
+
+    def run(lm):
+        for rect, wins in zip(rects, groups):
+            lm.apply(wins, rect)
+
+    return dpy, setup, run
+
+
+def multimonitor_scenario(layout_name, n, monitors):
+    from managers.multimonitor import MultiMonitorWM
+    dpy = FakeDisplay(monitors)
+    _, groups = _spread(dpy, n, monitors)
+
+    def setup():
+        lm = LayoutManager(cache=GeometryCache())
+        lm.set_layout(layout_name)
+        mm = MultiMonitorWM(FakeWM(dpy, lm))
+        for mon, wins in zip(mm.monitors, groups):
+            mon.windows = list(wins)
+        return mm
+
+    def run(mm):
+        mm.apply_all_layouts()
+
+    return dpy, setup, run
+
+
+def decorations_scenario(layout_name, n, monitors):
+    from managers.decorations import Decorations
+    dpy = FakeDisplay(monitors)
+    rects, groups = _spread(dpy, n, monitors)
+
+    def setup():
+        wm = FakeWM(dpy, LayoutManager(cache=GeometryCache()))
+        wm.monitors = [type("Mon", (), {"windows": wins})() for wins in groups]
+        return Decorations(wm, {})
+
+    def run(deco):
+        deco.apply_decorations()
+
+    return dpy, setup, run
+
+
+SUITES = {
+    "layout": layout_scenario,
+    "multimonitor": multimonitor_scenario,
+    "decorations": decorations_scenario,
+}
+
+# =======================
+# MEDIÇÃO
+# =======================
+def _reps_for(n):
+    return max(3, min(200, 20000 // max(1, n)))
+
+
+def measure(scenario, layout_name, n, monitors):
+    dpy, setup, run = scenario(layout_name, n, monitors)
+    reps = _reps_for(n)
+
+    # apply a frio: estado novo a cada repetição
+    cold = float("inf")
+    for _ in range(reps):
+        target = setup()
+        dpy.reset()
+        t0 = time.perf_counter()
+        run(target)
+        cold = min(cold, time.perf_counter() - t0)
+    req_cold = dpy.total_requests()
+    rt_cold = dpy.round_trips
+
+    # apply a quente: mesmo estado, nada mudou
+    dpy.reset()
+    run(target)
+    req_warm = dpy.total_requests()
+    warm = float("inf")
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        run(target)
+        warm = min(warm, time.perf_counter() - t0)
+
+    # alocações de um apply a frio
+    target = setup()
+    tracemalloc.start()
+    run(target)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "cold_ms": cold * 1000.0,
+        "warm_ms": warm * 1000.0,
+        "req_cold": req_cold,
+        "req_warm": req_warm,
+        "round_trips": rt_cold,
+        "alloc_kib": peak / 1024.0,
+    }
+
+
+def growth(results, suite, layout_name, monitors, counts):
+    """Expoente k de t ~ n^k entre as duas maiores contagens medidas."""
+    big = [n for n in counts if n >= 10][-2:]
+    if len(big) < 2:
+        return None
+    a = results.get(f"{suite}/{layout_name}/n={big[0]}/m={monitors}")
+    b = results.get(f"{suite}/{layout_name}/n={big[1]}/m={monitors}")
+    if not a or not b or a["cold_ms"] <= 0:
+        return None
+    return math.log(b["cold_ms"] / a["cold_ms"]) / math.log(big[1] / big[0])
+
+# =======================
+# BASELINES
+# =======================
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, cur in results.items():
+        old = baseline.get(key)
+        if not old:
+            continue
+        # requests são determinísticos: qualquer aumento é regressão
+        for field in ("req_cold", "req_warm", "round_trips"):
+            if cur[field] > old[field]:
+                regressions.append(f"{key}: {field} {old[field]} -> {cur[field]}")
+        if old["cold_ms"] > 0.05 and cur["cold_ms"] > old["cold_ms"] * threshold:
+            regressions.append(f"{key}: cold_ms {old['cold_ms']:.3f} -> {cur['cold_ms']:.3f}")
+    return regressions
+
+# =======================
+# CLI
+# =======================
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de layouts do MyWM com X falso")
+    parser.add_argument("--counts", type=_int_list, default=DEFAULT_COUNTS)
+    parser.add_argument("--monitors", type=_int_list, default=DEFAULT_MONITORS)
+    parser.add_argument("--layouts", default=None, help="lista separada por vírgula (padrão: todos)")
+    parser.add_argument("--suites", default=",".join(SUITES))
+    parser.add_argument("--save", metavar="PATH", help="grava resultados como baseline JSON")
+    parser.add_argument("--compare", metavar="PATH", help="compara com baseline JSON")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="fator de piora de tempo tolerado (padrão 1.5)")
+    args = parser.parse_args(argv)
+
+    layout_names = args.layouts.split(",") if args.layouts else [l.name for l in LayoutManager().layouts]
+    results = {}
+
+    header = f"{'scenario':<40} {'cold ms':>9} {'warm ms':>9} {'req':>7} {'req2':>5} {'rt':>6} {'KiB':>9}"
+    for suite in args.suites.split(","):
+        scenario = SUITES[suite]
+        print(f"\n== {suite} ==")
+        print(header)
+        for m in args.monitors:
+            for name in layout_names:
+                for n in args.counts:
+                    key = f"{suite}/{name}/n={n}/m={m}"
+                    try:
+                        r = measure(scenario, name, n, m)
+                    except Exception as e:
+                        print(f"{key:<40} indisponível: {e}")
+                        break
+                    results[key] = r
+                    print(f"{key:<40} {r['cold_ms']:>9.3f} {r['warm_ms']:>9.3f} "
+                          f"{r['req_cold']:>7} {r['req_warm']:>5} {r['round_trips']:>6} {r['alloc_kib']:>9.1f}")
+                k = growth(results, suite, name, m, args.counts)
+                if k is not None:
+                    print(f"{'':<40} growth ~ n^{k:.2f}")
+
+    status = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nRegressões:")
+            for line in regressions:
+                print("  " + line)
+            status = 1
+        else:
+            print("\nSem regressões em relação ao baseline.")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+        print(f"\nBaseline gravado em {args.save}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# mywm1.0/bench/bench_sysinfo.py
+# Microbenchmark dos coletores de /proc e /sys contra o psutil
+#
+# Uso (a partir da raiz do repositório):
+#   python3 -m bench.bench_sysinfo
+#   python3 -m bench.bench_sysinfo --samples 20000
+#
+# Mede o custo por amostra (µs) e a alocação por amostra (tracemalloc) de
+# cada leitor usado pelos módulos cpu/mem/battery da barra. Sem psutil a
+# coluna correspondente fica como "indisponível".
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from managers import sysinfo
+
+DEFAULT_SAMPLES = 5000
+
+
+# =======================
+# LEITORES
+# =======================
+def _psutil():
+    try:
+        import psutil
+        return psutil
+    except Exception:
+        return None
+
+
+def readers():
+    """(nome, fábrica) -> fábrica devolve a função de uma amostra ou levanta."""
+    psutil = _psutil()
+
+    def collector(cls):
+        c = cls()
+        return c.sample
+
+    def need_psutil(fn):
+        if psutil is None:
+            raise RuntimeError("psutil não instalado")
+        return fn
+
+    return [
+        ("cpu  /proc/stat", lambda: collector(sysinfo.CpuCollector)),
+        ("cpu  psutil", lambda: need_psutil(lambda: psutil.cpu_percent(interval=None))),
+        ("mem  /proc/meminfo", lambda: collector(sysinfo.MemCollector)),
+        ("mem  psutil", lambda: need_psutil(lambda: psutil.virtual_memory().percent)),
+        ("bat  /sys/class/power_supply", lambda: collector(sysinfo.BatteryCollector)),
+        ("bat  psutil", lambda: need_psutil(psutil.sensors_battery)),
+    ]
+
+
+# =======================
+# MEDIÇÃO
+# =======================
+def measure(sample, samples):
+    sample()   # aquecimento (e base do delta de CPU)
+    t0 = time.perf_counter()
+    for _ in range(samples):
+        sample()
+    per_us = (time.perf_counter() - t0) / samples * 1e6
+
+    n = min(samples, 1000)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(n):
+        sample()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(s.size_diff for s in after.compare_to(before, "filename") if s.size_diff > 0)
+    return {"us": per_us, "bytes": allocated / n, "value": sample()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos coletores de sistema da barra")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    args = parser.parse_args(argv)
+
+    print(f"{'leitor':<32} {'µs/amostra':>11} {'B/amostra':>10}  valor")
+    for name, factory in readers():
+        try:
+            r = measure(factory(), args.samples)
+        except Exception as e:
+            print(f"{name:<32} indisponível: {e}")
+            continue
+        print(f"{name:<32} {r['us']:>11.2f} {r['bytes']:>10.1f}  {r['value']}")
+
+
+if __name__ == "__main__":
+    main()
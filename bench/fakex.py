@@ -0,0 +1,153 @@
+# mywm1.0/bench/fakex.py
+# Display/janelas X falsos, em processo, para benchmarks
+#
+# Imitam a parte da API do python-xlib usada pelo MyWM e contam cada request
+# que chegaria ao servidor. Requests com reply (GetGeometry, GetProperty...)
+# são contados também como round trips.
+
+from collections import Counter
+
+
+class FakeGeometry:
+    __slots__ = ("x", "y", "width", "height", "border_width")
+
+    def __init__(self, x=0, y=0, width=1, height=1, border_width=0):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.border_width = border_width
+
+
+class _Data:
+    """Imita objetos de reply do Xlib que expõem `_data`."""
+    def __init__(self, **data):
+        self._data = data
+
+
+class FakeWindow:
+    def __init__(self, dpy, wid, x=0, y=0, width=640, height=480):
+        self.display = dpy
+        self.id = wid
+        self.geom = FakeGeometry(x, y, width, height)
+        self.mapped = False
+        self.properties = {}
+        self.wm_name = f"window-{wid}"
+        self.wm_class = ("bench", "Bench")
+
+    def __repr__(self):
+        return f"<FakeWindow 0x{self.id:x}>"
+
+    # requests sem reply
+    def configure(self, **kw):
+        self.display.count("ConfigureWindow")
+        for k in ("x", "y", "width", "height", "border_width"):
+            if k in kw:
+                setattr(self.geom, k, kw[k])
+
+    def map(self):
+        self.display.count("MapWindow")
+        self.mapped = True
+
+    def unmap(self):
+        self.display.count("UnmapWindow")
+        self.mapped = False
+
+    def change_property(self, prop, type, format, data, mode=0):
+        self.display.count("ChangeProperty")
+        self.properties[prop] = data
+
+    def delete_property(self, prop):
+        self.display.count("DeleteProperty")
+        self.properties.pop(prop, None)
+
+    def change_attributes(self, **kw):
+        self.display.count("ChangeWindowAttributes")
+
+    def set_input_focus(self, revert_to, time):
+        self.display.count("SetInputFocus")
+
+    def destroy(self):
+        self.display.count("DestroyWindow")
+
+    # requests com reply (round trip)
+    def get_geometry(self):
+        self.display.count("GetGeometry", round_trip=True)
+        g = self.geom
+        return FakeGeometry(g.x, g.y, g.width, g.height, g.border_width)
+
+    def get_wm_name(self):
+        self.display.count("GetProperty", round_trip=True)
+        return self.wm_name
+
+    def get_wm_class(self):
+        self.display.count("GetProperty", round_trip=True)
+        return self.wm_class
+
+
+class FakeRoot(FakeWindow):
+    def __init__(self, dpy, width, height, monitors):
+        super().__init__(dpy, 1, 0, 0, width, height)
+        self.monitors = monitors
+
+    def xrandr_get_screen_resources(self):
+        self.display.count("RRGetScreenResources", round_trip=True)
+        return _Data(crtcs=list(range(len(self.monitors))), config_timestamp=0)
+
+
+class FakeScreen:
+    def __init__(self, root):
+        self.root = root
+        self.width_in_pixels = root.geom.width
+        self.height_in_pixels = root.geom.height
+
+
+class FakeDisplay:
+    """Display falso com `monitors` lado a lado, cada um `width`x`height`."""
+    def __init__(self, monitors=1, width=1920, height=1080):
+        self.requests = Counter()
+        self.round_trips = 0
+        self.flushes = 0
+        self._next_id = 0x200000
+        rects = [(i * width, 0, width, height) for i in range(monitors)]
+        self._root = FakeRoot(self, width * monitors, height, rects)
+        self._screen = FakeScreen(self._root)
+
+    def count(self, name, round_trip=False):
+        self.requests[name] += 1
+        if round_trip:
+            self.round_trips += 1
+
+    def total_requests(self):
+        return sum(self.requests.values())
+
+    def reset(self):
+        self.requests.clear()
+        self.round_trips = 0
+        self.flushes = 0
+
+    def create_window(self, **geom):
+        wid = self._next_id
+        self._next_id += 1
+        return FakeWindow(self, wid, **geom)
+
+    # API de Display
+    def screen(self):
+        return self._screen
+
+    def fileno(self):
+        return -1
+
+    def pending_events(self):
+        return 0
+
+    def flush(self):
+        self.flushes += 1
+
+    def sync(self):
+        self.count("GetInputFocus", round_trip=True)
+
+    def xrandr_get_crtc_info(self, crtc, timestamp):
+        self.count("RRGetCrtcInfo", round_trip=True)
+        x, y, w, h = self._root.monitors[crtc]
+        return _Data(x=x, y=y, width=w, height=h)
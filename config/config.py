@@ -40,16 +40,53 @@ config = {
         "mod_1": "Mod4+1",  # Mudar para workspace 1
         "mod_2": "Mod4+2",  # Mudar para workspace 2
         # Adicione outros keybindings conforme necessário
+
+        # Acordes: teclas separadas por espaço, uma depois da outra
+        # Ações: métodos do KeyBindings/WM, "mode:<nome>" ou "exec:<comando>"
+        "chords": {
+            "Mod4+w n": "next_workspace",  # Mod4+w, depois n
+            "Mod4+w p": "prev_workspace",
+            "Mod4+o f": "exec:firefox",
+            "Mod4+l": "mode:layout",  # Entra no modo "layout"
+        },
+        # Modos nomeados: enquanto ativos o teclado fica preso no WM
+        # (Escape sempre volta para o modo padrão)
+        "modes": {
+            "layout": {
+                "space": "next_layout",
+                "BackSpace": "prev_layout",
+                "Return": "mode:default",
+            },
+        },
+        "chord_timeout": 1.5,  # Segundos para completar um acorde
     },
 
     # =======================
     # Autostart
     # =======================
+    # Strings sobem direto; dicts aceitam "after" (dependências por nome) e
+    # "ready" ({"wm_class": ...}, {"socket": caminho} ou {"process": nome}).
+    # Entradas independentes sobem em paralelo.
     "autostart": [
-        "nm-applet",
-        "pasystray",
-        "picom --experimental-backends",
-        "xsetroot -cursor_name left_ptr"
+        "xsetroot -cursor_name left_ptr",
+        {"name": "picom", "cmd": "picom --experimental-backends", "ready": {"process": "picom"}},
+        {"cmd": "nm-applet", "after": ["picom"], "ready": {"wm_class": "Nm-applet"}},
+        {"cmd": "pasystray", "after": ["picom"]},
+    ],
+
+    # =======================
+    # Regras de janelas
+    # =======================
+    # match: class, instance, title, role, type (dialog, utility, ...);
+    # valores exatos ou "re:<regex>". Ações: workspace (nome ou número a partir
+    # de 1), monitor (índice ou nome da saída), floating, geometry.
+    # A primeira regra que define cada ação vence.
+    "rules": [
+        {"match": {"class": "Firefox"}, "workspace": 2},
+        {"match": {"type": "dialog"}, "floating": True},
+        {"match": {"role": "pop-up"}, "floating": True},
+        {"match": {"class": "mpv", "title": "re:(?i:\\.(mkv|mp4)$)"}, "floating": True,
+         "geometry": {"x": 100, "y": 100, "width": 960, "height": 540}},
     ],
 
     # =======================
@@ -0,0 +1,108 @@
+# mywm1.0/core/atoms.py
+# Internação de atoms em lote e registro de atoms compartilhado
+#
+# dpy.intern_atom() faz um round trip por atom. intern_atoms() emite todos os
+# InternAtom de uma vez (defer=True) e coleta as replies depois: N atoms pelo
+# custo de um round trip.
+#
+# Módulos declaram os atoms que usam com declare() (só dados, sem X no
+# import). O AtomRegistry do Context resolve de uma vez todos os declarados e
+# ainda não internados na primeira consulta que falhar o cache; a partir daí a
+# busca por nome é um acesso a dict.
+
+from Xlib import X, Xatom
+from Xlib.protocol import request
+
+# atoms predefinidos pelo protocolo (WM_NAME, WM_CLASS, ...) não precisam de
+# InternAtom
+PREDEFINED = {name: value for name, value in vars(Xatom).items()
+              if name.isupper() and name != "LAST_PREDEFINED"}
+
+# nomes declarados pelos módulos; resolvidos em lote pelo registro
+KNOWN_ATOMS = set()
+
+
+def declare(*names):
+    """Declara atoms usados por um módulo. Retorna os nomes, para conveniência."""
+    KNOWN_ATOMS.update(names)
+    return names
+
+
+def intern_atoms(dpy, names, only_if_exists=False):
+    """Interna `names` em um único pipeline. Retorna dict nome -> atom."""
+    names = list(dict.fromkeys(names))
+    pending = [(name, request.InternAtom(display=dpy.display, defer=True,
+                                         name=name, only_if_exists=only_if_exists))
+               for name in names]
+    dpy.flush()
+    atoms = {}
+    cache = getattr(dpy.display, "_atom_cache", None)
+    for name, req in pending:
+        req.reply()
+        atoms[name] = req.atom
+        # alimenta também o cache do próprio Xlib (dpy.get_atom)
+        if cache is not None and req.atom != X.NONE:
+            cache[name] = req.atom
+    return atoms
+
+
+class AtomRegistry:
+    """Cache nome <-> atom compartilhado por todos os módulos (via Context)"""
+    def __init__(self, dpy):
+        self.dpy = dpy
+        self._by_name = dict(PREDEFINED)
+        self._by_atom = {v: k for k, v in PREDEFINED.items()}
+        self._wanted = set()
+        self.batches = 0
+
+    # =======================
+    # CONSULTA
+    # =======================
+    def __getitem__(self, name):
+        atom = self._by_name.get(name)
+        if atom is None:
+            self._wanted.add(name)
+            self.resolve()
+            atom = self._by_name[name]
+        return atom
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except Exception:
+            return default
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def name_of(self, atom):
+        """Nome de um atom; desconhecidos custam um GetAtomName (e ficam em cache)."""
+        name = self._by_atom.get(atom)
+        if name is None:
+            name = self.dpy.get_atom_name(atom)
+            self._by_name[name] = atom
+            self._by_atom[atom] = name
+        return name
+
+    # =======================
+    # RESOLUÇÃO EM LOTE
+    # =======================
+    def want(self, *names):
+        """Enfileira nomes para a próxima resolução em lote."""
+        self._wanted.update(n for n in names if n not in self._by_name)
+
+    def prefetch(self, *names):
+        self.want(*names)
+        self.resolve()
+
+    def resolve(self):
+        """Interna num único pipeline tudo que foi pedido ou declarado e falta."""
+        self._wanted.update(KNOWN_ATOMS.difference(self._by_name))
+        if not self._wanted:
+            return
+        names, self._wanted = self._wanted, set()
+        interned = intern_atoms(self.dpy, names)
+        self.batches += 1
+        for name, atom in interned.items():
+            self._by_name[name] = atom
+            self._by_atom[atom] = name
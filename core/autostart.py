@@ -0,0 +1,205 @@
+# mywm1.0/core/autostart.py
+# Autostart com dependências e detecção de prontidão
+#
+# Antes config["autostart"] subia em série (shell=True, com sleep entre
+# comandos). Aqui cada entrada pode declarar dependências ("after") e uma
+# condição de pronto ("ready"); tudo que não depende de nada sobe junto, e
+# cada entrada parte assim que as suas dependências ficam prontas.
+#
+# Formato (strings continuam valendo, sem dependências nem condição):
+#
+#     "autostart": [
+#         "xsetroot -cursor_name left_ptr",
+#         {"name": "picom", "cmd": "picom", "ready": {"process": "picom"}},
+#         {"cmd": "nm-applet", "after": ["picom"], "ready": {"wm_class": "Nm-applet"}},
+#         {"cmd": "mpd", "ready": {"socket": "~/.mpd/socket"}, "timeout": 5},
+#     ]
+#
+# Condições: "wm_class" (janela com essa classe gerenciada pelo WM),
+# "socket" (caminho existe) e "process" (processo com esse nome rodando).
+# Sem condição a entrada fica pronta ao ser lançada. Passado o timeout a
+# entrada é dada como pronta mesmo assim, para não travar as dependentes.
+
+import os
+import time
+
+# intervalo inicial e máximo (s) entre verificações de socket/processo
+POLL_MIN = 0.05
+POLL_MAX = 0.5
+# segundos até desistir de esperar a condição de pronto
+READY_TIMEOUT = 10.0
+
+
+def process_running(name):
+    """Há processo com esse nome (/proc/<pid>/comm)?"""
+    name = name[:15]   # comm é truncado em 15 caracteres
+    try:
+        pids = [p for p in os.listdir("/proc") if p.isdigit()]
+    except OSError:
+        return False
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/comm", "rb") as f:
+                if f.read().strip().decode(errors="replace") == name:
+                    return True
+        except OSError:
+            continue
+    return False
+
+
+class Entry:
+    """Uma entrada do autostart e o seu estado"""
+    __slots__ = ("name", "cmd", "after", "ready", "timeout",
+                 "state", "pid", "started", "ready_at")
+
+    def __init__(self, spec):
+        if isinstance(spec, str):
+            spec = {"cmd": spec}
+        self.cmd = spec["cmd"]
+        words = self.cmd.split() if isinstance(self.cmd, str) else list(self.cmd)
+        self.name = spec.get("name") or os.path.basename(words[0])
+        self.after = list(spec.get("after", ()))
+        self.ready = dict(spec.get("ready") or {})
+        self.timeout = spec.get("timeout", READY_TIMEOUT)
+        self.state = "waiting"     # waiting -> started -> ready
+        self.pid = None
+        self.started = None
+        self.ready_at = None
+
+
+class AutostartScheduler:
+    """Lança as entradas em paralelo respeitando "after" e "ready"."""
+    def __init__(self, entries, spawner, reactor=None, wm=None):
+        self.spawner = spawner
+        self.reactor = reactor
+        self.entries = {}
+        for spec in entries or ():
+            entry = Entry(spec)
+            if entry.name in self.entries:
+                print(f"[Autostart] nome repetido, ignorando: {entry.name}")
+                continue
+            self.entries[entry.name] = entry
+        self.t0 = None
+        self._poll_timer = None
+        self._poll_interval = POLL_MIN
+        self._done = False
+        # janelas mapeadas chegam pelo WM
+        if wm is not None and hasattr(wm, "add_map_listener"):
+            wm.add_map_listener(self.window_mapped)
+
+    # =======================
+    # CICLO
+    # =======================
+    def start(self):
+        self.t0 = time.monotonic()
+        for entry in self.entries.values():
+            unknown = [dep for dep in entry.after if dep not in self.entries]
+            if unknown:
+                print(f"[Autostart] {entry.name}: dependência desconhecida {unknown}, ignorada")
+                entry.after = [dep for dep in entry.after if dep in self.entries]
+            if self._reaches(entry.name, entry.name, set()):
+                # ciclo em "after": melhor subir fora de ordem do que não subir
+                print(f"[Autostart] {entry.name}: dependência circular, lançando sem esperar")
+                entry.after = []
+        self._launch_ready()
+        self._check_done()
+
+    def _reaches(self, start, target, seen):
+        """`target` está na cadeia de dependências de `start`?"""
+        for dep in self.entries[start].after:
+            if dep == target:
+                return True
+            if dep not in seen:
+                seen.add(dep)
+                if self._reaches(dep, target, seen):
+                    return True
+        return False
+
+    def _launch_ready(self):
+        for entry in self.entries.values():
+            if entry.state == "waiting" and all(
+                    self.entries[d].state == "ready" for d in entry.after):
+                self._launch(entry)
+
+    def _launch(self, entry):
+        entry.state = "started"
+        entry.started = time.monotonic()
+        entry.pid = self.spawner.spawn(entry.cmd)
+        if entry.pid is None or not entry.ready or self.reactor is None:
+            # sem condição (ou sem reator para esperar): pronto ao lançar
+            self._mark_ready(entry)
+            return
+        if self._check(entry):
+            self._mark_ready(entry)
+            return
+        self._schedule_poll()
+
+    def _mark_ready(self, entry, reason=None):
+        if entry.state == "ready":
+            return
+        entry.state = "ready"
+        entry.ready_at = time.monotonic()
+        elapsed = (entry.ready_at - (entry.started or entry.ready_at)) * 1000
+        since = (entry.ready_at - self.t0) * 1000
+        note = f" ({reason})" if reason else ""
+        print(f"[Autostart] {entry.name}: pronto em {elapsed:.0f} ms, "
+              f"{since:.0f} ms desde o início{note}")
+        self._launch_ready()
+        self._check_done()
+
+    def _check_done(self):
+        if self._done or any(e.state != "ready" for e in self.entries.values()):
+            return
+        self._done = True
+        total = (time.monotonic() - self.t0) * 1000
+        print(f"[Autostart] {len(self.entries)} entradas prontas em {total:.0f} ms")
+
+    @property
+    def done(self):
+        return self._done
+
+    # =======================
+    # PRONTIDÃO
+    # =======================
+    def _check(self, entry):
+        ready = entry.ready
+        if "socket" in ready and not os.path.exists(os.path.expanduser(ready["socket"])):
+            return False
+        if "process" in ready and not process_running(ready["process"]):
+            return False
+        # wm_class só é satisfeita por window_mapped()
+        return "wm_class" not in ready
+
+    def window_mapped(self, client):
+        """Listener de map do WM: satisfaz entradas que esperam por WM_CLASS."""
+        wm_class = getattr(client, "wm_class", ()) or ()
+        for entry in self.entries.values():
+            wanted = entry.ready.get("wm_class")
+            if entry.state == "started" and wanted and wanted in wm_class:
+                entry.ready = {k: v for k, v in entry.ready.items() if k != "wm_class"}
+                if self._check(entry):
+                    self._mark_ready(entry)
+
+    def _schedule_poll(self):
+        if self._poll_timer is None and self.reactor is not None:
+            self._poll_timer = self.reactor.call_later(self._poll_interval, self._poll)
+
+    def _poll(self):
+        self._poll_timer = None
+        now = time.monotonic()
+        waiting = False
+        for entry in list(self.entries.values()):
+            if entry.state != "started":
+                continue
+            if self._check(entry):
+                self._mark_ready(entry)
+            elif entry.timeout and now - entry.started >= entry.timeout:
+                self._mark_ready(entry, reason="timeout")
+            else:
+                waiting = True
+        if waiting:
+            # backoff: verificações ficam mais espaçadas enquanto nada muda
+            self._poll_interval = min(self._poll_interval * 2, POLL_MAX)
+            self._schedule_poll()
+        else:
+            self._poll_interval = POLL_MIN
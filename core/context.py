@@ -0,0 +1,40 @@
+# mywm1.0/core/context.py
+# Contexto central do MyWM: dono da única conexão X
+#
+# Antes cada módulo abria seu próprio display.Display() (ewmh, window, main),
+# custando um socket e um handshake cada, sem ordem de flush entre conexões.
+# Agora o Context abre uma conexão só e é injetado em EWMH, WindowManager,
+# layouts (via WM), multi-monitor e keybindings.
+
+from Xlib import display
+
+from core.atoms import AtomRegistry
+
+
+class Context:
+    """Conexão X compartilhada e recursos globais do WM"""
+    def __init__(self, config=None, dpy=None, display_name=None):
+        self.config = config or {}
+        self.dpy = dpy if dpy is not None else display.Display(display_name)
+        self.screen = self.dpy.screen()
+        self.root = self.screen.root
+        # atoms internados em lote e compartilhados por todos os módulos
+        self.atoms = AtomRegistry(self.dpy)
+        self.reactor = None
+        # lançador de processos (core.spawner), ligado ao reator pelo main
+        self.spawner = None
+
+    def fileno(self):
+        return self.dpy.fileno()
+
+    def flush(self):
+        self.dpy.flush()
+
+    def sync(self):
+        self.dpy.sync()
+
+    def close(self):
+        try:
+            self.dpy.close()
+        except Exception:
+            pass
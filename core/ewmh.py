@@ -1,29 +1,58 @@
 # mywm1.0/core/ewmh.py
 # EWMH avançado para MyWM com suporte a scratchpads e notifications
 
-from Xlib import X, Xatom, display
+from Xlib import X, Xatom
 
-dpy = display.Display()
-root = dpy.screen().root
+from core.atoms import declare
+
+# Conexão compartilhada do WM, injetada por attach(ctx) — nada é aberto no import
+ctx = None
+dpy = None
+root = None
 
 # =======================
 # ATOMS EWMH
 # =======================
-NET_SUPPORTED = dpy.intern_atom("_NET_SUPPORTED")
-NET_WM_NAME = dpy.intern_atom("_NET_WM_NAME")
-NET_CLIENT_LIST = dpy.intern_atom("_NET_CLIENT_LIST")
-NET_ACTIVE_WINDOW = dpy.intern_atom("_NET_ACTIVE_WINDOW")
-NET_NUMBER_OF_DESKTOPS = dpy.intern_atom("_NET_NUMBER_OF_DESKTOPS")
-NET_CURRENT_DESKTOP = dpy.intern_atom("_NET_CURRENT_DESKTOP")
-NET_DESKTOP_NAMES = dpy.intern_atom("_NET_DESKTOP_NAMES")
-NET_DESKTOP_VIEWPORT = dpy.intern_atom("_NET_DESKTOP_VIEWPORT")
-NET_SHOWING_DESKTOP = dpy.intern_atom("_NET_SHOWING_DESKTOP")
-NET_WM_STATE = dpy.intern_atom("_NET_WM_STATE")
-NET_WM_STATE_FULLSCREEN = dpy.intern_atom("_NET_WM_STATE_FULLSCREEN")
-NET_WM_STATE_MAXIMIZED_VERT = dpy.intern_atom("_NET_WM_STATE_MAXIMIZED_VERT")
-NET_WM_STATE_MAXIMIZED_HORZ = dpy.intern_atom("_NET_WM_STATE_MAXIMIZED_HORZ")
-NET_SUPPORTING_WM_CHECK = dpy.intern_atom("_NET_SUPPORTING_WM_CHECK")
-UTF8_STRING = dpy.intern_atom("UTF8_STRING")
+# nome da variável do módulo -> nome do atom; valores preenchidos por attach()
+ATOM_NAMES = {
+    "NET_SUPPORTED": "_NET_SUPPORTED",
+    "NET_WM_NAME": "_NET_WM_NAME",
+    "NET_CLIENT_LIST": "_NET_CLIENT_LIST",
+    "NET_CLIENT_LIST_STACKING": "_NET_CLIENT_LIST_STACKING",
+    "NET_ACTIVE_WINDOW": "_NET_ACTIVE_WINDOW",
+    "NET_NUMBER_OF_DESKTOPS": "_NET_NUMBER_OF_DESKTOPS",
+    "NET_CURRENT_DESKTOP": "_NET_CURRENT_DESKTOP",
+    "NET_DESKTOP_NAMES": "_NET_DESKTOP_NAMES",
+    "NET_DESKTOP_VIEWPORT": "_NET_DESKTOP_VIEWPORT",
+    "NET_SHOWING_DESKTOP": "_NET_SHOWING_DESKTOP",
+    "NET_WM_STATE": "_NET_WM_STATE",
+    "NET_WM_STATE_FULLSCREEN": "_NET_WM_STATE_FULLSCREEN",
+    "NET_WM_STATE_MAXIMIZED_VERT": "_NET_WM_STATE_MAXIMIZED_VERT",
+    "NET_WM_STATE_MAXIMIZED_HORZ": "_NET_WM_STATE_MAXIMIZED_HORZ",
+    "NET_SUPPORTING_WM_CHECK": "_NET_SUPPORTING_WM_CHECK",
+    "UTF8_STRING": "UTF8_STRING",
+}
+globals().update(dict.fromkeys(ATOM_NAMES))
+declare(*ATOM_NAMES.values())
+
+# ações de ClientMessage _NET_WM_STATE (data.l[0])
+NET_WM_STATE_REMOVE, NET_WM_STATE_ADD, NET_WM_STATE_TOGGLE = 0, 1, 2
+
+def attach(context):
+    """Passa a usar a conexão do Context e o seu registro de atoms."""
+    global ctx, dpy, root
+    ctx = context
+    dpy = context.dpy
+    root = context.root
+    # primeira consulta resolve num único lote todos os atoms declarados
+    atoms = context.atoms
+    globals().update({var: atoms[name] for var, name in ATOM_NAMES.items()})
+
+def _ensure():
+    # uso isolado (scripts/testes): abre um contexto próprio sob demanda
+    if dpy is None:
+        from core.context import Context
+        attach(Context())
 
 # =======================
 # WM CHECK WINDOW
@@ -36,8 +65,12 @@ scratchpads = {}
 # -----------------------
 # Inicialização EWMH
 # -----------------------
-def init_ewmh(wm_name="MyWM", workspaces=None):
+def init_ewmh(wm_name="MyWM", workspaces=None, context=None):
     global wm_check, workspace_names, current_desktop
+    if context is not None:
+        attach(context)
+    else:
+        _ensure()
     workspace_names = workspaces if workspaces else [str(i+1) for i in range(9)]
     current_desktop = 0
 
@@ -47,10 +80,11 @@ def init_ewmh(wm_name="MyWM", workspaces=None):
 
     root.change_property(NET_SUPPORTING_WM_CHECK, Xatom.WINDOW, 32, [wm_check.id])
     root.change_property(NET_WM_NAME, UTF8_STRING, 8, wm_name.encode())
-    root.change_property(dpy.intern_atom("WM_NAME"), Xatom.STRING, 8, wm_name.encode())
-    root.change_property(dpy.intern_atom("WM_CLASS"), Xatom.STRING, 8, wm_name.encode())
+    root.change_property(Xatom.WM_NAME, Xatom.STRING, 8, wm_name.encode())
+    root.change_property(Xatom.WM_CLASS, Xatom.STRING, 8, wm_name.encode())
     root.change_property(NET_NUMBER_OF_DESKTOPS, Xatom.CARDINAL, 32, [len(workspace_names)])
     root.change_property(NET_CURRENT_DESKTOP, Xatom.CARDINAL, 32, [current_desktop])
+    state.published("NET_CURRENT_DESKTOP", (current_desktop,))
 
     names_bytes = b"\0".join([n.encode() for n in workspace_names])
     root.change_property(NET_DESKTOP_NAMES, UTF8_STRING, 8, names_bytes)
@@ -62,51 +96,310 @@ def init_ewmh(wm_name="MyWM", workspaces=None):
     root.change_property(NET_SHOWING_DESKTOP, Xatom.CARDINAL, 32, [0])
 
     supported_atoms = [
-        NET_SUPPORTED, NET_WM_NAME, NET_CLIENT_LIST, NET_ACTIVE_WINDOW,
+        NET_SUPPORTED, NET_WM_NAME, NET_CLIENT_LIST, NET_CLIENT_LIST_STACKING,
+        NET_ACTIVE_WINDOW,
         NET_NUMBER_OF_DESKTOPS, NET_CURRENT_DESKTOP, NET_DESKTOP_NAMES,
         NET_DESKTOP_VIEWPORT, NET_SHOWING_DESKTOP, NET_WM_STATE,
         NET_WM_STATE_FULLSCREEN, NET_WM_STATE_MAXIMIZED_VERT,
         NET_WM_STATE_MAXIMIZED_HORZ, NET_SUPPORTING_WM_CHECK
     ]
     root.change_property(NET_SUPPORTED, Xatom.ATOM, 32, supported_atoms)
+    # listas vazias publicadas já no init: daqui em diante só append/rewrite
+    client_list.reset()
+    client_list.publish()
+    dpy.flush()
+
+def flush():
+    """Envia de uma vez as mudanças de propriedade acumuladas.
+
+    Os setters abaixo não escrevem nem fazem flush: o loop principal chama
+    publish() e o reator faz um único flush ao fim de cada lote de eventos.
+    """
+    _ensure()
     dpy.flush()
 
 # -----------------------
 # Janelas e Workspaces
 # -----------------------
+class ClientList:
+    """Estado de _NET_CLIENT_LIST e _NET_CLIENT_LIST_STACKING
+
+    Adições viram um PropModeAppend só com os ids novos; remoções e
+    reordenações marcam a propriedade para reescrita. publish() roda uma vez
+    por lote de eventos, então N unmaps no mesmo lote custam uma reescrita.
+    """
+    def __init__(self):
+        self.mapping = {}    # wid -> None, ordem de mapeamento (dict ordenado)
+        self.stacking = {}   # wid -> None, de baixo para cima
+        self._appended = []
+        self._stack_appended = []
+        self._rewrite = False
+        self._stack_rewrite = False
+        self.appends = 0
+        self.rewrites = 0
+
+    def reset(self):
+        self.mapping.clear()
+        self.stacking.clear()
+        self._appended = []
+        self._stack_appended = []
+        self._rewrite = True
+        self._stack_rewrite = True
+
+    def __contains__(self, wid):
+        return wid in self.mapping
+
+    def __len__(self):
+        return len(self.mapping)
+
+    # -----------------------
+    # Mudanças (só estado, sem X)
+    # -----------------------
+    def add(self, wid):
+        if wid in self.mapping:
+            return
+        # janela recém-mapeada entra no topo da pilha
+        self.mapping[wid] = None
+        self.stacking[wid] = None
+        self._appended.append(wid)
+        self._stack_appended.append(wid)
+
+    def remove(self, wid):
+        if wid not in self.mapping:
+            return
+        del self.mapping[wid]
+        self.stacking.pop(wid, None)
+        self._rewrite = True
+        self._stack_rewrite = True
+
+    def raise_(self, wid):
+        if wid not in self.stacking or next(reversed(self.stacking)) == wid:
+            return
+        del self.stacking[wid]
+        self.stacking[wid] = None
+        self._stack_rewrite = True
+
+    def sync(self, wids):
+        """Converge para a lista `wids` (chamadas antigas com a lista inteira)."""
+        wanted = dict.fromkeys(wids)
+        for wid in [w for w in self.mapping if w not in wanted]:
+            self.remove(wid)
+        for wid in wanted:
+            self.add(wid)
+
+    @property
+    def dirty(self):
+        return bool(self._rewrite or self._stack_rewrite
+                    or self._appended or self._stack_appended)
+
+    # -----------------------
+    # Publicação
+    # -----------------------
+    def publish(self):
+        if not self.dirty:
+            return
+        _ensure()
+        self._write(NET_CLIENT_LIST, self.mapping, self._rewrite, self._appended)
+        self._write(NET_CLIENT_LIST_STACKING, self.stacking, self._stack_rewrite,
+                    self._stack_appended)
+        self._appended = []
+        self._stack_appended = []
+        self._rewrite = False
+        self._stack_rewrite = False
+
+    def _write(self, atom, ids, rewrite, appended):
+        if rewrite:
+            root.change_property(atom, Xatom.WINDOW, 32, list(ids))
+            self.rewrites += 1
+        elif appended:
+            root.change_property(atom, Xatom.WINDOW, 32, appended, mode=X.PropModeAppend)
+            self.appends += 1
+
+
+client_list = ClientList()
+
+
+class RootState:
+    """Últimos valores EWMH publicados; só mudanças reais chegam ao servidor
+
+    Os setters guardam o valor desejado e publish() escreve, no fim da
+    iteração do loop, apenas o que difere do último publicado. Alt-tab
+    repetido no mesmo lote vira uma escrita de _NET_ACTIVE_WINDOW; repetir o
+    mesmo valor não gera PropertyNotify nenhum.
+
+    _NET_WM_STATE de cada janela é um conjunto de atoms: só adições saem como
+    PropModeAppend com os atoms novos; remoções reescrevem a lista (ou apagam
+    a propriedade quando o conjunto fica vazio).
+    """
+    # propriedades da raiz: nome da variável do atom -> tipo
+    ROOT_TYPES = {
+        "NET_ACTIVE_WINDOW": Xatom.WINDOW,
+        "NET_CURRENT_DESKTOP": Xatom.CARDINAL,
+    }
+
+    def __init__(self):
+        self._published = {}   # nome -> valor já no servidor
+        self._pending = {}     # nome -> valor a publicar
+        self._windows = {}     # wid -> janela Xlib
+        self._states = {}      # wid -> conjunto desejado de atoms _NET_WM_STATE
+        self._states_published = {}   # wid -> frozenset no servidor
+        self._states_dirty = set()
+        self.writes = 0
+        self.appends = 0
+        self.skipped = 0
+
+    def _set(self, key, value):
+        if self._published.get(key) == value:
+            # voltou ao valor publicado: nada a escrever
+            if self._pending.pop(key, None) is None:
+                self.skipped += 1
+            return
+        self._pending[key] = value
+
+    def published(self, key, value):
+        """Registra um valor escrito fora do publisher (ex.: init_ewmh)."""
+        self._published[key] = value
+        self._pending.pop(key, None)
+
+    # -----------------------
+    # Valores desejados
+    # -----------------------
+    def set_root(self, name, data):
+        self._set(name, tuple(data))
+
+    def track_window(self, win, atoms=()):
+        """Começa a seguir uma janela com o _NET_WM_STATE lido no manage."""
+        self._windows[win.id] = win
+        self._states[win.id] = set(atoms)
+        self._states_published[win.id] = frozenset(atoms)
+
+    def window_state(self, wid):
+        return set(self._states.get(wid, ()))
+
+    def change_window_state(self, win, add=(), remove=()):
+        """Aplica add/remove ao conjunto da janela; retorna o novo conjunto."""
+        wid = win.id
+        if wid not in self._states:
+            self.track_window(win)
+        current = self._states[wid]
+        current.difference_update(remove)
+        current.update(add)
+        if current == self._states_published[wid]:
+            self._states_dirty.discard(wid)
+        else:
+            self._states_dirty.add(wid)
+        return set(current)
+
+    def forget_window(self, wid):
+        self._windows.pop(wid, None)
+        self._states.pop(wid, None)
+        self._states_published.pop(wid, None)
+        self._states_dirty.discard(wid)
+
+    @property
+    def dirty(self):
+        return bool(self._pending or self._states_dirty)
+
+    # -----------------------
+    # Publicação
+    # -----------------------
+    def publish(self):
+        if not self.dirty:
+            return
+        _ensure()
+        pending, self._pending = self._pending, {}
+        for name, value in pending.items():
+            try:
+                root.change_property(globals()[name], self.ROOT_TYPES[name], 32, list(value))
+            except Exception:
+                continue
+            self._published[name] = value
+            self.writes += 1
+        dirty, self._states_dirty = self._states_dirty, set()
+        for wid in dirty:
+            try:
+                self._write_state(wid)
+            except Exception:
+                continue
+
+    def _write_state(self, wid):
+        win = self._windows[wid]
+        wanted = frozenset(self._states[wid])
+        old = self._states_published[wid]
+        if wanted == old:
+            return
+        if not wanted:
+            win.delete_property(NET_WM_STATE)
+        elif old and old <= wanted:
+            win.change_property(NET_WM_STATE, Xatom.ATOM, 32, sorted(wanted - old),
+                                mode=X.PropModeAppend)
+            self.appends += 1
+        else:
+            win.change_property(NET_WM_STATE, Xatom.ATOM, 32, sorted(wanted))
+        self._states_published[wid] = wanted
+        self.writes += 1
+
+
+state = RootState()
+
+def add_client(wid):
+    client_list.add(wid)
+
+def remove_client(wid):
+    client_list.remove(wid)
+    state.forget_window(wid)
+
+def track_client(win, atoms=()):
+    """Estado inicial de _NET_WM_STATE, lido no manage."""
+    state.track_window(win, atoms)
+
+def raise_client(wid):
+    client_list.raise_(wid)
+
+def publish_client_list():
+    """Escreve as mudanças acumuladas da lista de clientes (uma vez por lote)."""
+    client_list.publish()
+
+def publish():
+    """Publica tudo que mudou desde a última iteração (lista de clientes,
+    janela ativa, desktop, estados de janela). Chamado pelo hook de idle."""
+    client_list.publish()
+    state.publish()
+
 def update_client_list(windows):
-    ids = [w.id for w in windows if hasattr(w, "id")]
-    root.change_property(NET_CLIENT_LIST, Xatom.WINDOW, 32, ids)
-    dpy.flush()
+    client_list.sync(w.id for w in windows if hasattr(w, "id"))
 
 def set_active_window(win):
-    wid = win.id if win else 0
-    root.change_property(NET_ACTIVE_WINDOW, Xatom.WINDOW, 32, [wid])
-    dpy.flush()
+    state.set_root("NET_ACTIVE_WINDOW", [win.id if win else 0])
 
 def set_current_desktop(idx):
     global current_desktop
     current_desktop = idx
-    root.change_property(NET_CURRENT_DESKTOP, Xatom.CARDINAL, 32, [idx])
-    dpy.flush()
+    state.set_root("NET_CURRENT_DESKTOP", [idx])
 
-def set_fullscreen(win, enable=True):
+def set_window_state(win, action, *names):
+    """Ação de _NET_WM_STATE (REMOVE/ADD/TOGGLE) sobre variáveis de atom,
+    sem tocar nos demais estados da janela."""
     if not win:
-        return
-    if enable:
-        win.change_property(NET_WM_STATE, Xatom.ATOM, 32, [NET_WM_STATE_FULLSCREEN])
+        return set()
+    _ensure()
+    atoms = {globals()[n] for n in names}
+    current = state.window_state(win.id)
+    if action == NET_WM_STATE_ADD:
+        add, remove = atoms, ()
+    elif action == NET_WM_STATE_REMOVE:
+        add, remove = (), atoms
     else:
-        win.delete_property(NET_WM_STATE)
-    dpy.flush()
+        add, remove = atoms - current, atoms & current
+    return state.change_window_state(win, add, remove)
+
+def set_fullscreen(win, enable=True):
+    action = NET_WM_STATE_ADD if enable else NET_WM_STATE_REMOVE
+    return set_window_state(win, action, "NET_WM_STATE_FULLSCREEN")
 
 def set_maximized(win, enable=True):
-    if not win:
-        return
-    if enable:
-        win.change_property(NET_WM_STATE, Xatom.ATOM, 32, [NET_WM_STATE_MAXIMIZED_VERT, NET_WM_STATE_MAXIMIZED_HORZ])
-    else:
-        win.delete_property(NET_WM_STATE)
-    dpy.flush()
+    action = NET_WM_STATE_ADD if enable else NET_WM_STATE_REMOVE
+    return set_window_state(win, action, "NET_WM_STATE_MAXIMIZED_VERT", "NET_WM_STATE_MAXIMIZED_HORZ")
 
 # -----------------------
 # Scratchpads avançados
@@ -140,14 +433,12 @@ def toggle_scratchpad(name):
             )
         sp["window"].map()
     sp["visible"] = not sp["visible"]
-    dpy.flush()
 
 def hide_all_scratchpads():
     for sp in scratchpads.values():
         if sp["visible"]:
             sp["window"].unmap()
             sp["visible"] = False
-    dpy.flush()
 
 # -----------------------
 # Notificações EWMH
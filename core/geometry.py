@@ -0,0 +1,112 @@
+# mywm1.0/core/geometry.py
+# Cache de geometria por janela
+#
+# Guarda o último retângulo, borda e estado de map que o WM enviou para cada
+# janela. Layouts passam por aqui: só sai ConfigureWindow com os campos que
+# realmente mudaram e MapWindow/UnmapWindow só quando o estado muda. Evita
+# redraws desnecessários em clientes pesados (Electron/Chromium).
+
+GEOMETRY_FIELDS = ("x", "y", "width", "height", "border_width")
+
+
+class GeometryCache:
+    """Último estado enviado ao servidor, por id de janela X"""
+    def __init__(self):
+        self._geom = {}     # wid -> [x, y, width, height, border_width]
+        self._mapped = {}   # wid -> bool
+        self.sent = 0
+        self.skipped = 0
+
+    # =======================
+    # CONFIGURE / MAP
+    # =======================
+    def configure(self, win, x=None, y=None, width=None, height=None, border_width=None, **extra):
+        """Envia ConfigureWindow apenas com os campos alterados.
+
+        Campos None são ignorados. `extra` (ex.: stack_mode) sempre força o
+        envio, pois não é rastreado. Retorna True se algo foi enviado.
+        """
+        wid = win.id
+        prev = self._geom.get(wid)
+        if prev is None:
+            prev = [None] * len(GEOMETRY_FIELDS)
+        changes = {}
+        updated = list(prev)
+        for i, value in enumerate((x, y, width, height, border_width)):
+            if value is not None and prev[i] != value:
+                changes[GEOMETRY_FIELDS[i]] = value
+                updated[i] = value
+        changes.update(extra)
+        if not changes:
+            self.skipped += 1
+            return False
+        # cache só depois do envio: se o request falhar, o próximo igual sai
+        win.configure(**changes)
+        self._geom[wid] = updated
+        self.sent += 1
+        return True
+
+    def map(self, win):
+        if self._mapped.get(win.id):
+            self.skipped += 1
+            return False
+        win.map()
+        self._mapped[win.id] = True
+        self.sent += 1
+        return True
+
+    def unmap(self, win):
+        if self._mapped.get(win.id) is False:
+            self.skipped += 1
+            return False
+        win.unmap()
+        self._mapped[win.id] = False
+        self.sent += 1
+        return True
+
+    # =======================
+    # APLICAR PLANO DE LAYOUT
+    # =======================
+    def apply_plan(self, plan, windows):
+        """Empurra um plano (lista de Placement de core.layouts) para o X.
+
+        windows: dict wid -> objeto janela Xlib. Primeiro todos os configures,
+        depois os maps/unmaps, para o cliente ver a geometria final ao mapear.
+        """
+        for p in plan:
+            if p.visible:
+                self.configure(windows[p.wid], x=p.x, y=p.y, width=p.width, height=p.height)
+        for p in plan:
+            if p.visible:
+                self.map(windows[p.wid])
+            else:
+                self.unmap(windows[p.wid])
+
+    # =======================
+    # INVALIDAÇÃO
+    # =======================
+    def forget(self, wid):
+        """Descarta o estado de uma janela (destruída ou alterada pelo cliente)."""
+        self._geom.pop(wid, None)
+        self._mapped.pop(wid, None)
+
+    def forget_mapping(self, wid):
+        self._mapped.pop(wid, None)
+
+    def clear(self):
+        self._geom.clear()
+        self._mapped.clear()
+
+    # =======================
+    # ESTATÍSTICAS
+    # =======================
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "tracked": len(self._geom),
+        }
+
+    def reset_stats(self):
+        self.sent = 0
+        self.skipped = 0
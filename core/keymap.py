@@ -0,0 +1,91 @@
+# mywm1.0/core/keymap.py
+# Keymap em trie: acordes ("Mod4+w h") e modos nomeados (estilo i3)
+#
+# Cada modo é uma trie cujas arestas são teclas já compiladas, ou seja
+# (keycode, máscara). Despachar uma tecla é um acesso a dict no nó corrente:
+# não se varre a lista de bindings nem se converte keysym por tecla. Este
+# módulo não fala com o X: quem compila os keycodes, faz os grabs e arma o
+# timeout dos acordes é managers/keybindings.py.
+
+from itertools import product
+
+DEFAULT_MODE = "default"
+
+
+class KeyNode:
+    """Nó da trie: ação da sequência até aqui e próximas teclas possíveis"""
+    __slots__ = ("children", "action", "sequence")
+
+    def __init__(self, sequence=()):
+        self.children = {}
+        self.action = None
+        self.sequence = sequence
+
+    @property
+    def is_prefix(self):
+        return bool(self.children)
+
+
+class Keymap:
+    """Tries por modo mais a posição corrente (modo e nó)"""
+    def __init__(self):
+        self.modes = {DEFAULT_MODE: KeyNode()}
+        self.mode = DEFAULT_MODE
+        self.node = self.modes[DEFAULT_MODE]
+
+    # =======================
+    # CONSTRUÇÃO
+    # =======================
+    def bind(self, strokes, action, mode=DEFAULT_MODE):
+        """Liga uma sequência à ação.
+
+        strokes: uma lista por tecla da sequência, cada uma com as teclas
+        (keycode, máscara) equivalentes (um keysym pode estar em vários
+        keycodes); todas as combinações levam à mesma ação.
+        """
+        root = self.modes.setdefault(mode, KeyNode())
+        for sequence in product(*strokes):
+            node = root
+            for i, key in enumerate(sequence):
+                child = node.children.get(key)
+                if child is None:
+                    child = node.children[key] = KeyNode(sequence[:i + 1])
+                node = child
+            node.action = action
+
+    def add_mode(self, mode):
+        return self.modes.setdefault(mode, KeyNode())
+
+    def root(self, mode=None):
+        return self.modes[mode or self.mode]
+
+    # =======================
+    # DESPACHO
+    # =======================
+    @property
+    def in_chord(self):
+        return self.node is not self.modes[self.mode]
+
+    def set_mode(self, mode):
+        if mode not in self.modes:
+            raise KeyError(mode)
+        self.mode = mode
+        self.node = self.modes[mode]
+
+    def reset(self):
+        """Abandona o acorde em andamento (continua no mesmo modo)."""
+        self.node = self.modes[self.mode]
+
+    def feed(self, key):
+        """Avança uma tecla. Retorna o nó alcançado ou None se a tecla não
+        continua nenhuma sequência. Um nó com filhos fica à espera da próxima
+        tecla; uma folha devolve a posição à raiz do modo."""
+        node = self.node.children.get(key)
+        if node is None:
+            self.reset()
+            return None
+        if node.children:
+            self.node = node
+        else:
+            self.reset()
+        return node
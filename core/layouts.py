@@ -1,14 +1,43 @@
 # mywm1.0/core/layouts.py
 # Layouts avançados MyWM v2.0
 # Funcional, com snapping, floating inteligente, multi-monitor e notificações
+#
+# Os layouts são puros: plan() recebe ids de janela e a área (x, y, w, h) em
+# inteiros e devolve uma lista de Placement, sem tocar no Xlib. Quem envia o
+# plano ao servidor é o GeometryCache (core/geometry.py), que só emite o que
+# mudou. Assim layouts podem ser testados, comparados e medidos sem X.
 
-from Xlib import X
+from collections import namedtuple
+
+from core.geometry import GeometryCache
+
+# Resultado de um layout para uma janela. Janelas invisíveis têm geometria None.
+Placement = namedtuple("Placement", "wid x y width height visible")
+
+
+def hidden(wid):
+    return Placement(wid, None, None, None, None, False)
+
+
+def area_of(screen_geom):
+    """Normaliza dict/objeto de geometria (ou None) para (x, y, width, height)."""
+    if screen_geom is None:
+        return (0, 0, 800, 600)
+    if isinstance(screen_geom, tuple):
+        return screen_geom
+    if isinstance(screen_geom, dict):
+        return (screen_geom.get("x", 0), screen_geom.get("y", 0),
+                screen_geom["width"], screen_geom["height"])
+    return (getattr(screen_geom, "x", 0), getattr(screen_geom, "y", 0),
+            screen_geom.width, screen_geom.height)
 
 # =======================
 # GERENCIADOR DE LAYOUTS
 # =======================
 class LayoutManager:
-    def __init__(self, default_layout="tile"):
+    def __init__(self, default_layout="tile", cache=None):
+        # cache compartilhado: aplica planos enviando só o que mudou
+        self.cache = cache if cache is not None else GeometryCache()
         self.layouts = [
             Tile(), Monocle(), Floating(), BSP(), Grid(), Tabbed(), Stacking()
         ]
@@ -30,15 +59,26 @@ class LayoutManager:
     def prev_layout(self):
         self.current_index = (self.current_index - 1) % len(self.layouts)
 
+    def plan(self, wids, area):
+        """Plano do layout atual, sem efeitos colaterais no X."""
+        return self.current_layout().plan(wids, area)
+
     def apply(self, windows, screen_geom):
         if windows:
-            self.current_layout().apply(windows, screen_geom)
+            by_id = {w.id: w for w in windows}
+            plan = self.plan(list(by_id), area_of(screen_geom))
+            self.cache.apply_plan(plan, by_id)
 
     def add_window(self, win):
-        self.current_layout().on_window_add(win)
+        self.current_layout().on_window_add(win.id)
 
     def remove_window(self, win):
-        self.current_layout().on_window_remove(win)
+        self.current_layout().on_window_remove(win.id)
+        self.cache.forget(win.id)
+
+    def stats(self):
+        """Contadores de requests enviados vs. evitados pelo cache."""
+        return self.cache.stats()
 
 # =======================
 # CLASSE BASE
@@ -46,14 +86,27 @@ class LayoutManager:
 class BaseLayout:
     def __init__(self, name):
         self.name = name
+        # usado pelo atalho apply() quando o chamador não passa o seu cache
+        self.cache = GeometryCache()
 
-    def apply(self, windows, screen_geom):
+    def plan(self, wids, area):
+        """wids: lista de ids; area: (x, y, width, height). Retorna [Placement]."""
         raise NotImplementedError
 
-    def on_window_add(self, win):
+    def apply(self, windows, screen_geom, cache=None):
+        """Atalho: calcula o plano e o aplica diretamente nas janelas.
+
+        Prefira passar o GeometryCache compartilhado do WM; sem ele vale o
+        cache desta instância, que persiste entre chamadas.
+        """
+        cache = cache if cache is not None else self.cache
+        by_id = {w.id: w for w in windows}
+        cache.apply_plan(self.plan(list(by_id), area_of(screen_geom)), by_id)
+
+    def on_window_add(self, wid):
         pass
 
-    def on_window_remove(self, win):
+    def on_window_remove(self, wid):
         pass
 
 # =======================
@@ -63,37 +116,37 @@ class Tile(BaseLayout):
     def __init__(self):
         super().__init__("tile")
 
-    def apply(self, windows, screen_geom):
-        n = len(windows)
+    def plan(self, wids, area):
+        n = len(wids)
         if n == 0:
-            return
-        master_width = screen_geom["width"] // 2
-        for i, w in enumerate(windows):
-            if i == 0:
-                w.configure(x=0, y=0, width=master_width, height=screen_geom["height"])
-            else:
-                w.configure(
-                    x=master_width,
-                    y=(i-1)*(screen_geom["height"]//(n-1)),
-                    width=screen_geom["width"]-master_width,
-                    height=screen_geom["height"]//(n-1)
-                )
-            w.map()
+            return []
+        ax, ay, aw, ah = area
+        master_width = aw // 2
+        out = [Placement(wids[0], ax, ay, master_width, ah, True)]
+        if n > 1:
+            stack_h = ah // (n - 1)
+            for i in range(1, n):
+                out.append(Placement(wids[i], ax + master_width, ay + (i - 1) * stack_h,
+                                     aw - master_width, stack_h, True))
+        return out
 
 # =======================
 # MONOCLE
 # =======================
 class Monocle(BaseLayout):
-    def __init__(self):
+    def __init__(self, hide_others=True):
         super().__init__("monocle")
-
-    def apply(self, windows, screen_geom):
-        for i, w in enumerate(windows):
-            if i == 0:
-                w.configure(x=0, y=0, width=screen_geom["width"], height=screen_geom["height"])
-                w.map()
-            else:
-                w.unmap()
+        # False: todas ocupam a área inteira e continuam mapeadas (monocle do
+        # WindowManager); True: só a primeira fica visível
+        self.hide_others = hide_others
+
+    def plan(self, wids, area):
+        if not wids:
+            return []
+        ax, ay, aw, ah = area
+        if not self.hide_others:
+            return [Placement(wid, ax, ay, aw, ah, True) for wid in wids]
+        return [Placement(wids[0], ax, ay, aw, ah, True)] + [hidden(wid) for wid in wids[1:]]
 
 # =======================
 # FLOATING INTELIGENTE
@@ -104,23 +157,26 @@ class Floating(BaseLayout):
         self.positions = {}
         self.snap_threshold = 20
 
-    def apply(self, windows, screen_geom):
-        for w in windows:
-            if w.id not in self.positions:
-                self.positions[w.id] = {"x":50, "y":50, "w":screen_geom["width"]//2, "h":screen_geom["height"]//2}
-            geom = self.snap_to_edges(self.positions[w.id], screen_geom)
-            w.configure(x=geom["x"], y=geom["y"], width=geom["w"], height=geom["h"])
-            w.map()
-
-    def snap_to_edges(self, geom, screen_geom):
-        if abs(geom["x"]) < self.snap_threshold:
-            geom["x"] = 0
-        if abs(geom["x"] + geom["w"] - screen_geom["width"]) < self.snap_threshold:
-            geom["x"] = screen_geom["width"] - geom["w"]
-        if abs(geom["y"]) < self.snap_threshold:
-            geom["y"] = 0
-        if abs(geom["y"] + geom["h"] - screen_geom["height"]) < self.snap_threshold:
-            geom["y"] = screen_geom["height"] - geom["h"]
+    def plan(self, wids, area):
+        ax, ay, aw, ah = area
+        out = []
+        for wid in wids:
+            if wid not in self.positions:
+                self.positions[wid] = {"x": ax + 50, "y": ay + 50, "w": aw // 2, "h": ah // 2}
+            geom = self.snap_to_edges(self.positions[wid], area)
+            out.append(Placement(wid, geom["x"], geom["y"], geom["w"], geom["h"], True))
+        return out
+
+    def snap_to_edges(self, geom, area):
+        ax, ay, aw, ah = area
+        if abs(geom["x"] - ax) < self.snap_threshold:
+            geom["x"] = ax
+        if abs(geom["x"] + geom["w"] - (ax + aw)) < self.snap_threshold:
+            geom["x"] = ax + aw - geom["w"]
+        if abs(geom["y"] - ay) < self.snap_threshold:
+            geom["y"] = ay
+        if abs(geom["y"] + geom["h"] - (ay + ah)) < self.snap_threshold:
+            geom["y"] = ay + ah - geom["h"]
         return geom
 
     def move(self, win, dx, dy):
@@ -133,13 +189,13 @@ class Floating(BaseLayout):
             self.positions[win.id]["w"] = max(50, self.positions[win.id]["w"] + dw)
             self.positions[win.id]["h"] = max(50, self.positions[win.id]["h"] + dh)
 
-    def on_window_add(self, win):
-        if win.id not in self.positions:
-            self.positions[win.id] = {"x":50, "y":50, "w":400, "h":300}
+    def on_window_add(self, wid):
+        if wid not in self.positions:
+            self.positions[wid] = {"x":50, "y":50, "w":400, "h":300}
 
-    def on_window_remove(self, win):
-        if win.id in self.positions:
-            del self.positions[win.id]
+    def on_window_remove(self, wid):
+        if wid in self.positions:
+            del self.positions[wid]
 
 # =======================
 # BSP
@@ -148,23 +204,25 @@ class BSP(BaseLayout):
     def __init__(self):
         super().__init__("bsp")
 
-    def apply(self, windows, screen_geom):
-        def split_area(wins, x, y, w, h, vertical=True):
-            if not wins:
+    def plan(self, wids, area):
+        out = []
+
+        # trabalha com índices [lo, hi) para não copiar fatias da lista
+        def split_area(lo, hi, x, y, w, h, vertical=True):
+            if lo >= hi:
                 return
-            if len(wins) == 1:
-                win = wins[0]
-                win.configure(x=x, y=y, width=w, height=h)
-                win.map()
+            if hi - lo == 1:
+                out.append(Placement(wids[lo], x, y, w, h, True))
                 return
-            mid = len(wins)//2
+            mid = (lo + hi) // 2
             if vertical:
-                split_area(wins[:mid], x, y, w//2, h, not vertical)
-                split_area(wins[mid:], x + w//2, y, w - w//2, h, not vertical)
+                split_area(lo, mid, x, y, w//2, h, not vertical)
+                split_area(mid, hi, x + w//2, y, w - w//2, h, not vertical)
             else:
-                split_area(wins[:mid], x, y, w, h//2, not vertical)
-                split_area(wins[mid:], x, y + h//2, w, h - h//2, not vertical)
-        split_area(windows, 0, 0, screen_geom["width"], screen_geom["height"])
+                split_area(lo, mid, x, y, w, h//2, not vertical)
+                split_area(mid, hi, x, y + h//2, w, h - h//2, not vertical)
+        split_area(0, len(wids), *area)
+        return out
 
 # =======================
 # GRID
@@ -173,19 +231,17 @@ class Grid(BaseLayout):
     def __init__(self):
         super().__init__("grid")
 
-    def apply(self, windows, screen_geom):
-        n = len(windows)
+    def plan(self, wids, area):
+        n = len(wids)
         if n == 0:
-            return
+            return []
+        ax, ay, aw, ah = area
         cols = int(n**0.5)
         rows = (n + cols -1)//cols
-        cell_w = screen_geom["width"]//cols
-        cell_h = screen_geom["height"]//rows
-        for i, w in enumerate(windows):
-            c = i % cols
-            r = i // cols
-            w.configure(x=c*cell_w, y=r*cell_h, width=cell_w, height=cell_h)
-            w.map()
+        cell_w = aw//cols
+        cell_h = ah//rows
+        return [Placement(wid, ax + (i % cols)*cell_w, ay + (i // cols)*cell_h, cell_w, cell_h, True)
+                for i, wid in enumerate(wids)]
 
 # =======================
 # TABBED
@@ -195,15 +251,10 @@ class Tabbed(BaseLayout):
         super().__init__("tabbed")
         self.current_tab = 0
 
-    def apply(self, windows, screen_geom):
-        if not windows:
-            return
-        for i, w in enumerate(windows):
-            if i == self.current_tab:
-                w.configure(x=0, y=20, width=screen_geom["width"], height=screen_geom["height"]-20)
-                w.map()
-            else:
-                w.unmap()
+    def plan(self, wids, area):
+        ax, ay, aw, ah = area
+        return [Placement(wid, ax, ay + 20, aw, ah - 20, True) if i == self.current_tab else hidden(wid)
+                for i, wid in enumerate(wids)]
 
 # =======================
 # STACKING
@@ -212,9 +263,7 @@ class Stacking(BaseLayout):
     def __init__(self):
         super().__init__("stacking")
 
-    def apply(self, windows, screen_geom):
-        if not windows:
-            return
-        for i, w in enumerate(windows):
-            w.configure(x=20*i, y=20*i, width=screen_geom["width"]-40, height=screen_geom["height"]-40)
-            w.map()
+    def plan(self, wids, area):
+        ax, ay, aw, ah = area
+        return [Placement(wid, ax + 20*i, ay + 20*i, aw - 40, ah - 40, True)
+                for i, wid in enumerate(wids)]
@@ -0,0 +1,118 @@
+# mywm1.0/core/prefetch.py
+# Busca de propriedades X em pipeline
+#
+# O python-xlib permite criar ReplyRequests com defer=True: o request é
+# enfileirado sem esperar a reply. Aqui todos os GetProperty/GetGeometry
+# necessários (de uma ou várias janelas) são emitidos de uma vez e as replies
+# coletadas juntas — custo de um round trip em vez de N, o que pesa muito em
+# X via SSH.
+
+from Xlib import X
+from Xlib.protocol import request, rq
+from Xlib.xobject import icccm
+
+# Tamanho pedido por propriedade, em unidades de 32 bits. Grande o bastante
+# para títulos/listas de atoms comuns sem precisar de segunda leitura.
+PROPERTY_LENGTH = 1024
+
+
+class WindowInfo:
+    """Replies coletadas para uma janela: props[atom] -> reply ou None."""
+    __slots__ = ("wid", "props", "geometry")
+
+    def __init__(self, wid):
+        self.wid = wid
+        self.props = {}
+        self.geometry = None
+
+
+def _send(dpy, wid, atoms, geometry, length):
+    pending = []
+    for atom in atoms:
+        pending.append((atom, request.GetProperty(
+            display=dpy.display, defer=True, delete=False, window=wid,
+            property=atom, type=X.AnyPropertyType, long_offset=0, long_length=length)))
+    geom = request.GetGeometry(display=dpy.display, defer=True, drawable=wid) if geometry else None
+    return pending, geom
+
+
+def _collect(wid, pending, geom):
+    info = WindowInfo(wid)
+    for atom, req in pending:
+        try:
+            req.reply()
+            info.props[atom] = req if req.property_type != X.NONE else None
+        except Exception:
+            # janela destruída no meio do caminho (BadWindow), etc.
+            info.props[atom] = None
+    if geom is not None:
+        try:
+            geom.reply()
+            info.geometry = geom
+        except Exception:
+            info.geometry = None
+    return info
+
+
+def fetch_many(dpy, windows, atoms, geometry=True, length=PROPERTY_LENGTH):
+    """Emite todos os requests de todas as janelas e só então espera replies.
+
+    windows: ids ou objetos janela. Retorna dict wid -> WindowInfo.
+    """
+    sent = []
+    for win in windows:
+        wid = getattr(win, "id", win)
+        sent.append((wid,) + _send(dpy, wid, atoms, geometry, length))
+    dpy.flush()
+    return {wid: _collect(wid, pending, geom) for wid, pending, geom in sent}
+
+
+def fetch(dpy, window, atoms, geometry=True, length=PROPERTY_LENGTH):
+    wid = getattr(window, "id", window)
+    return fetch_many(dpy, [wid], atoms, geometry, length)[wid]
+
+# =======================
+# DECODIFICAÇÃO
+# =======================
+def decode_text(reply, utf8_atom=None):
+    if reply is None or reply.format != 8:
+        return None
+    value = reply.value
+    if isinstance(value, str):
+        return value
+    encoding = "utf-8" if utf8_atom is not None and reply.property_type == utf8_atom else "latin-1"
+    return value.decode(encoding, "replace")
+
+
+def decode_class(reply):
+    """WM_CLASS: 'instance\\0class\\0' -> (instance, class)."""
+    if reply is None or reply.format != 8:
+        return ()
+    value = reply.value
+    if isinstance(value, str):
+        value = value.encode("latin-1")
+    parts = value.split(b"\0")
+    if len(parts) < 2:
+        return ()
+    return (parts[0].decode("latin-1"), parts[1].decode("latin-1"))
+
+
+def decode_atoms(reply):
+    if reply is None or reply.format != 32:
+        return ()
+    return tuple(reply.value)
+
+
+def decode_hints(reply, dpy):
+    if reply is None or reply.format != 32:
+        return None
+    value = rq.encode_array(reply.value)
+    if len(value) != icccm.WMHints.static_size:
+        return None
+    return icccm.WMHints.parse_binary(value, dpy)[0]
+
+
+def decode_cardinal(reply):
+    if reply is None or reply.format != 32 or not len(reply.value):
+        return None
+    return int(reply.value[0])
@@ -0,0 +1,222 @@
+# mywm1.0/core/reactor.py
+# Loop de eventos do MyWM baseado em selectors
+#
+# Um único reator multiplexa a conexão X (dpy.fileno()), sockets de IPC,
+# pipes de processos filhos e timers. Quando nada acontece o processo fica
+# bloqueado em select() sem timeout — zero wakeups em idle.
+
+import heapq
+import itertools
+import os
+import selectors
+import time
+from collections import deque
+
+
+class Timer:
+    """Handle de um callback agendado; cancel() o descarta."""
+    __slots__ = ("when", "callback", "args", "cancelled")
+
+    def __init__(self, when, callback, args):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Reactor:
+    """Loop de eventos single-thread: fds, timers e hooks de fim de iteração"""
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self.running = False
+        self._timers = []             # heap de (when, seq, Timer)
+        self._seq = itertools.count()
+        self._ready = deque()         # callbacks de call_soon
+        self._idle = []               # hooks executados ao fim de cada iteração
+        self._displays = []           # (dpy, handler)
+
+        # self-pipe para acordar o select a partir de outras threads
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self.add_reader(self._wake_r, self._drain_wakeup)
+
+    # =======================
+    # REGISTRO DE FONTES
+    # =======================
+    def add_reader(self, fileobj, callback):
+        """callback() é chamado sempre que fileobj estiver legível."""
+        self._update(fileobj, 0, callback)
+
+    def remove_reader(self, fileobj):
+        self._update(fileobj, 0, None)
+
+    def add_writer(self, fileobj, callback):
+        """callback() é chamado enquanto fileobj aceitar escrita; registre só
+        com dados pendentes e remova ao esvaziar o buffer."""
+        self._update(fileobj, 1, callback)
+
+    def remove_writer(self, fileobj):
+        self._update(fileobj, 1, None)
+
+    def _update(self, fileobj, slot, callback):
+        # data do selector: [leitor, escritor], alterada no lugar para que o
+        # loop veja remoções feitas no meio de um lote; a máscara segue os presentes
+        try:
+            key = self.selector.get_key(fileobj)
+        except (KeyError, ValueError):
+            key = None
+        handlers = key.data if key is not None else [None, None]
+        handlers[slot] = callback
+        mask = ((selectors.EVENT_READ if handlers[0] else 0)
+                | (selectors.EVENT_WRITE if handlers[1] else 0))
+        try:
+            if key is None:
+                if mask:
+                    self.selector.register(fileobj, mask, handlers)
+            elif mask:
+                self.selector.modify(fileobj, mask, handlers)
+            else:
+                self.selector.unregister(fileobj)
+        except (KeyError, ValueError, OSError):
+            # fd já fechado
+            pass
+
+    def add_display(self, dpy, handler):
+        """Registra uma conexão X.
+
+        handler() deve drenar dpy.pending_events(). Além do fd, o reator checa
+        a fila interna do Xlib antes de dormir (eventos podem ter sido lidos
+        junto com uma reply) e faz um único flush por iteração.
+        """
+        self._displays.append((dpy, handler))
+        self.add_reader(dpy.fileno(), handler)
+
+    # =======================
+    # CALLBACKS E TIMERS
+    # =======================
+    def call_soon(self, callback, *args):
+        self._ready.append((callback, args))
+
+    def call_soon_threadsafe(self, callback, *args):
+        self._ready.append((callback, args))
+        try:
+            os.write(self._wake_w, b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def call_later(self, delay, callback, *args):
+        timer = Timer(time.monotonic() + max(0.0, delay), callback, args)
+        heapq.heappush(self._timers, (timer.when, next(self._seq), timer))
+        return timer
+
+    def call_every(self, interval, callback, *args):
+        """Agenda callback periódico; retorna o Timer da próxima execução
+        (o handle é reaproveitado, então cancel() interrompe a série)."""
+        timer = Timer(time.monotonic() + interval, None, args)
+
+        def tick(*a):
+            callback(*a)
+            if not timer.cancelled:
+                timer.when = max(timer.when + interval, time.monotonic())
+                heapq.heappush(self._timers, (timer.when, next(self._seq), timer))
+
+        timer.callback = tick
+        heapq.heappush(self._timers, (timer.when, next(self._seq), timer))
+        return timer
+
+    def on_idle(self, callback):
+        """callback() roda uma vez ao fim de cada iteração, depois de todos os
+        eventos do lote terem sido tratados e antes do flush/sleep."""
+        self._idle.append(callback)
+
+    # =======================
+    # LOOP
+    # =======================
+    def stop(self):
+        self.running = False
+        try:
+            os.write(self._wake_w, b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def run(self):
+        self.running = True
+        while self.running:
+            self.run_once()
+
+    def run_once(self, timeout=None):
+        """Uma iteração: callbacks prontos, timers vencidos, fila X, hooks de
+        idle, flush e por fim select() pelo tempo até o próximo timer."""
+        self._run_ready()
+        self._run_timers()
+        for dpy, handler in self._displays:
+            try:
+                if dpy.pending_events():
+                    handler()
+            except Exception as e:
+                print(f"[Reactor] erro no handler X: {e}")
+        for cb in list(self._idle):
+            try:
+                cb()
+            except Exception as e:
+                print(f"[Reactor] erro em hook idle: {e}")
+        for dpy, _ in self._displays:
+            try:
+                dpy.flush()
+            except Exception:
+                pass
+
+        if not self.running:
+            return
+        wait = self._next_timeout(timeout)
+        for key, events in self.selector.select(wait):
+            handlers = key.data
+            try:
+                if events & selectors.EVENT_READ and handlers[0]:
+                    handlers[0]()
+                # relido: o leitor pode ter removido o escritor (conexão fechada)
+                if events & selectors.EVENT_WRITE and handlers[1]:
+                    handlers[1]()
+            except Exception as e:
+                print(f"[Reactor] erro em callback de fd: {e}")
+
+    def _next_timeout(self, limit):
+        if self._ready:
+            return 0
+        wait = limit
+        while self._timers and self._timers[0][2].cancelled:
+            heapq.heappop(self._timers)
+        if self._timers:
+            delta = max(0.0, self._timers[0][0] - time.monotonic())
+            wait = delta if wait is None else min(wait, delta)
+        return wait
+
+    def _run_ready(self):
+        for _ in range(len(self._ready)):
+            cb, args = self._ready.popleft()
+            try:
+                cb(*args)
+            except Exception as e:
+                print(f"[Reactor] erro em callback: {e}")
+
+    def _run_timers(self):
+        now = time.monotonic()
+        while self._timers and self._timers[0][0] <= now:
+            _, _, timer = heapq.heappop(self._timers)
+            if timer.cancelled:
+                continue
+            try:
+                timer.callback(*timer.args)
+            except Exception as e:
+                print(f"[Reactor] erro em timer: {e}")
+
+    def _drain_wakeup(self):
+        try:
+            while os.read(self._wake_r, 512):
+                pass
+        except (BlockingIOError, OSError):
+            pass
@@ -0,0 +1,124 @@
+# mywm1.0/core/registry.py
+# Registro central de clientes, indexado pelo id da janela X
+#
+# Substitui as buscas lineares espalhadas pelos gerenciadores: a partir do id
+# de uma janela obtém-se em O(1) o objeto cliente, o workspace, o monitor e o
+# scratchpad a que ela pertence. Uma única instância é criada pelo
+# WindowManager e compartilhada pelos demais gerenciadores.
+
+
+def window_id(obj):
+    """Id X de um int, de uma janela Xlib (obj.id) ou de um Window do WM (obj.window.id)."""
+    if obj is None:
+        return None
+    if isinstance(obj, int):
+        return obj
+    wid = getattr(obj, "id", None)
+    if wid is None:
+        wid = getattr(getattr(obj, "window", None), "id", None)
+    return wid
+
+
+class ClientEntry:
+    """Onde um cliente está: workspace (índice), monitor e scratchpad."""
+    __slots__ = ("wid", "client", "workspace", "monitor", "scratchpad")
+
+    def __init__(self, wid, client=None, workspace=None, monitor=None, scratchpad=None):
+        self.wid = wid
+        self.client = client
+        self.workspace = workspace
+        self.monitor = monitor
+        self.scratchpad = scratchpad
+
+    def __repr__(self):
+        return (f"<ClientEntry 0x{self.wid:x} ws={self.workspace} "
+                f"mon={getattr(self.monitor, 'name', self.monitor)} sp={self.scratchpad}>")
+
+
+class ClientRegistry:
+    """dict id -> ClientEntry; insert, lookup e remove em O(1).
+
+    A ordem de iteração é a ordem de inserção (ordem de mapeamento).
+    """
+    def __init__(self):
+        self._entries = {}
+
+    # =======================
+    # INSERÇÃO / REMOÇÃO
+    # =======================
+    def add(self, win, client=None, workspace=None, monitor=None, scratchpad=None):
+        wid = window_id(win)
+        entry = self._entries.get(wid)
+        if entry is None:
+            entry = self._entries[wid] = ClientEntry(wid)
+        entry.client = client if client is not None else (entry.client or win)
+        if workspace is not None:
+            entry.workspace = workspace
+        if monitor is not None:
+            entry.monitor = monitor
+        if scratchpad is not None:
+            entry.scratchpad = scratchpad
+        return entry
+
+    def remove(self, win):
+        return self._entries.pop(window_id(win), None)
+
+    # =======================
+    # CONSULTAS
+    # =======================
+    def get(self, win):
+        return self._entries.get(window_id(win))
+
+    def client(self, win):
+        entry = self._entries.get(window_id(win))
+        return entry.client if entry else None
+
+    def workspace_of(self, win):
+        entry = self._entries.get(window_id(win))
+        return entry.workspace if entry else None
+
+    def monitor_of(self, win):
+        entry = self._entries.get(window_id(win))
+        return entry.monitor if entry else None
+
+    def scratchpad_of(self, win):
+        entry = self._entries.get(window_id(win))
+        return entry.scratchpad if entry else None
+
+    def clients(self):
+        return [e.client for e in self._entries.values()]
+
+    # =======================
+    # ATUALIZAÇÕES (só entradas existentes)
+    # =======================
+    # Não criam entrada: uma janela já desregistrada (DestroyNotify) voltaria
+    # como fantasma com a janela Xlib crua como cliente. Registrar é com add().
+    def set_workspace(self, win, workspace):
+        entry = self._entries.get(window_id(win))
+        if entry is not None:
+            entry.workspace = workspace
+        return entry
+
+    def set_monitor(self, win, monitor):
+        entry = self._entries.get(window_id(win))
+        if entry is not None:
+            entry.monitor = monitor
+        return entry
+
+    def set_scratchpad(self, win, scratchpad):
+        entry = self._entries.get(window_id(win))
+        if entry is not None:
+            entry.scratchpad = scratchpad
+        return entry
+
+    # =======================
+    # PROTOCOLO DE CONTAINER
+    # =======================
+    def __contains__(self, win):
+        return window_id(win) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(list(self._entries.values()))
@@ -0,0 +1,191 @@
+# mywm1.0/core/rules.py
+# Regras de posicionamento de janelas, pré-compiladas
+#
+# Uma regra casa campos da janela (class, instance, title, role, type) e
+# define ações (workspace, monitor, floating, geometry, scratchpad). Com
+# centenas de regras, testar uma por uma a cada MapRequest não escala; aqui o
+# conjunto é compilado uma vez por campo em:
+#
+#   - um dict valor exato -> bitmask das regras que pedem esse valor;
+#   - uma única regex com um lookahead opcional nomeado por padrão, de modo
+#     que um só match() revela todos os padrões que casam.
+#
+# Casar uma janela custa uma consulta de dict e um match() por campo,
+# independente do número de regras; o AND entre campos de uma mesma regra é
+# feito com bitmasks. Padrões usam o prefixo "re:" (busca em qualquer ponto;
+# use ^/$ para ancorar e (?i:...) para ignorar caixa). Sem prefixo o valor é
+# comparado exatamente.
+#
+#     "rules": [
+#         {"match": {"class": "Firefox"}, "workspace": 2},
+#         {"match": {"title": "re:(?i:youtube)"}, "floating": True},
+#         {"match": {"class": "mpv", "type": "dialog"}, "floating": True,
+#          "geometry": {"width": 640, "height": 360}},
+#         {"match": {"role": "pop-up"}, "floating": True, "monitor": 1},
+#     ]
+
+import re
+
+FIELDS = ("class", "instance", "title", "role", "type")
+ACTIONS = ("workspace", "monitor", "floating", "geometry", "scratchpad")
+PATTERN_PREFIX = "re:"
+
+# referência numérica (\1..\99) ou condicional por número ((?(1)...)): na
+# regex combinada os grupos mudam de número, então esses padrões rodam sozinhos
+NUMBERED_REF = re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]|\(\?\(\d")
+
+
+class Rule:
+    """Uma regra: condições por campo e ações"""
+    __slots__ = ("index", "match", "actions")
+
+    def __init__(self, index, match, actions):
+        self.index = index
+        self.match = match
+        self.actions = actions
+
+    @classmethod
+    def from_spec(cls, index, spec):
+        match = {f: str(v) for f, v in (spec.get("match") or {}).items() if f in FIELDS}
+        actions = {a: spec[a] for a in ACTIONS if a in spec}
+        return cls(index, match, actions)
+
+    def __repr__(self):
+        return f"<Rule {self.index} {self.match} -> {self.actions}>"
+
+
+class FieldMatcher:
+    """Valores exatos e padrões de um campo, para todas as regras"""
+    def __init__(self):
+        self.exact = {}        # valor -> bitmask de regras
+        self.patterns = []     # (bit, regex fonte)
+        self.constrained = 0   # regras que restringem este campo
+        self.regex = None
+        self.groups = {}       # nome do grupo -> bit
+        self._fallback = None  # [(bit, regex)] testados um a um (ver compile)
+
+    def add(self, bit, value):
+        self.constrained |= bit
+        if value.startswith(PATTERN_PREFIX):
+            self.patterns.append((bit, value[len(PATTERN_PREFIX):]))
+        else:
+            self.exact[value] = self.exact.get(value, 0) | bit
+
+    def compile(self):
+        if not self.patterns:
+            return
+        parts = []
+        separate = []
+        for i, (bit, source) in enumerate(self.patterns):
+            re.compile(source)   # erro aponta o padrão culpado, não a combinação
+            if NUMBERED_REF.search(source):
+                separate.append((bit, re.compile(source, re.S)))
+                continue
+            name = f"r{i}"
+            self.groups[name] = bit
+            # lookahead opcional: testa o padrão sem consumir nada, então todos
+            # os padrões são avaliados no mesmo match()
+            parts.append(f"(?:(?=.*?(?P<{name}>{source})))?")
+        if separate:
+            self._fallback = separate
+        if not parts:
+            return
+        try:
+            self.regex = re.compile("".join(parts), re.S)
+        except re.error:
+            # padrões com grupos nomeados/flags globais não combinam: um a um
+            self._fallback = [(bit, re.compile(source, re.S)) for bit, source in self.patterns]
+
+    def matched(self, value):
+        """Bitmask das regras cujo critério neste campo casa `value`."""
+        if value is None:
+            return 0
+        bits = self.exact.get(value, 0)
+        if self.regex is not None:
+            m = self.regex.match(value)
+            # só os grupos das regras: grupos nomeados do usuário também
+            # aparecem no match
+            for name, bit in self.groups.items():
+                if m.group(name) is not None:
+                    bits |= bit
+        if self._fallback is not None:
+            for bit, regex in self._fallback:
+                if regex.search(value):
+                    bits |= bit
+        return bits
+
+
+class RuleSet:
+    """Regras compiladas; match() casa uma janela em uma passada"""
+    def __init__(self, specs=()):
+        self.rules = [Rule.from_spec(i, spec) for i, spec in enumerate(specs or ())]
+        self.compile()
+
+    def compile(self):
+        self.fields = {f: FieldMatcher() for f in FIELDS}
+        self.all = 0
+        for rule in self.rules:
+            bit = 1 << rule.index
+            self.all |= bit
+            for field, value in rule.match.items():
+                self.fields[field].add(bit, value)
+        for matcher in self.fields.values():
+            matcher.compile()
+        # só campos com alguma regra entram no match
+        self._active = [(f, m) for f, m in self.fields.items() if m.constrained]
+
+    def add(self, spec):
+        rule = Rule.from_spec(len(self.rules), spec)
+        self.rules.append(rule)
+        self.compile()
+        return rule
+
+    def __len__(self):
+        return len(self.rules)
+
+    # =======================
+    # CONSULTA
+    # =======================
+    def matching_bits(self, props):
+        """props: dict campo -> valor. Bitmask das regras que casam."""
+        candidates = self.all
+        for field, matcher in self._active:
+            # regra casa se não restringe o campo ou se o critério bate
+            candidates &= matcher.matched(props.get(field)) | ~matcher.constrained
+            if not candidates:
+                break
+        return candidates
+
+    def matches(self, props):
+        """Regras que casam, na ordem da configuração."""
+        bits = self.matching_bits(props)
+        found = []
+        while bits:
+            low = bits & -bits
+            found.append(self.rules[low.bit_length() - 1])
+            bits ^= low
+        return found
+
+    def first(self, props):
+        bits = self.matching_bits(props)
+        if not bits:
+            return None
+        return self.rules[(bits & -bits).bit_length() - 1]
+
+    def resolve(self, props):
+        """Ações combinadas: a primeira regra que define cada ação vence."""
+        result = {}
+        for rule in self.matches(props):
+            for action, value in rule.actions.items():
+                result.setdefault(action, value)
+        return result
+
+
+def window_type_name(atom_name):
+    """'_NET_WM_WINDOW_TYPE_DIALOG' -> 'dialog'."""
+    if not atom_name:
+        return None
+    prefix = "_NET_WM_WINDOW_TYPE_"
+    if atom_name.startswith(prefix):
+        return atom_name[len(prefix):].lower()
+    return atom_name.lower()
@@ -0,0 +1,233 @@
+# mywm1.0/core/spawner.py
+# Lançador de processos do MyWM: posix_spawn, reaper por SIGCHLD e latência
+#
+# subprocess.Popen no thread de eventos custava um fork da imagem inteira do
+# WM, e ninguém chamava wait(): zumbis acumulavam em sessões longas. Aqui os
+# filhos nascem com os.posix_spawnp (vfork+exec na libc), em sessão própria,
+# e o SIGCHLD só escreve um byte num pipe registrado no reator; o reap roda no
+# loop, com WNOHANG, apenas para os pids lançados por este Spawner (filhos de
+# subprocess, como o lemonbar, continuam com o Popen deles).
+#
+# Quando a primeira janela de um filho é gerenciada (_NET_WM_PID), o tempo
+# desde o spawn é registrado por comando: stats() e o log mostram quanto cada
+# app leva para aparecer.
+
+import os
+import shlex
+import shutil
+import signal
+import time
+from collections import deque
+
+# caracteres que exigem /bin/sh -c
+SHELL_CHARS = set("|&;<>()$`\\\"'*?[]#~={}\n")
+
+# sinais que o Python ignora (SIG_IGN herda no exec) e os filhos não devem
+DEFAULT_SIGNALS = tuple(getattr(signal, name) for name in ("SIGPIPE", "SIGXFSZ")
+                        if hasattr(signal, name))
+
+# quantas amostras de latência guardar por comando
+LATENCY_SAMPLES = 20
+
+
+def to_argv(cmd):
+    """str -> argv; comandos com sintaxe de shell vão para /bin/sh -c."""
+    if isinstance(cmd, (list, tuple)):
+        return [str(a) for a in cmd]
+    if SHELL_CHARS.intersection(cmd):
+        return ["/bin/sh", "-c", cmd]
+    return shlex.split(cmd)
+
+
+def parent_pid(pid):
+    """ppid via /proc/<pid>/stat (None se o processo sumiu)."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            data = f.read()
+        # o nome do comando vem entre parênteses e pode conter espaços
+        return int(data[data.rindex(b")") + 2:].split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Child:
+    """Processo lançado pelo Spawner"""
+    __slots__ = ("pid", "cmd", "started", "mapped", "status")
+
+    def __init__(self, pid, cmd, started):
+        self.pid = pid
+        self.cmd = cmd
+        self.started = started
+        self.mapped = None
+        self.status = None
+
+
+class Spawner:
+    """Lança processos sem bloquear o loop e colhe só os próprios filhos"""
+    def __init__(self, reactor=None):
+        self.reactor = None
+        self.children = {}        # pid -> Child ainda vivo
+        self.awaiting_map = {}    # pid -> Child sem janela gerenciada ainda
+        self.latency = {}         # cmd -> deque de segundos até o primeiro map
+        self._which = {}
+        self._wake_r = self._wake_w = None
+        self.spawned = 0
+        self.reaped = 0
+        if reactor is not None:
+            self.attach(reactor)
+
+    # =======================
+    # SIGCHLD
+    # =======================
+    def attach(self, reactor):
+        """Reap dirigido por SIGCHLD através de um self-pipe no reator."""
+        self.reactor = reactor
+        r, w = os.pipe()
+        os.set_blocking(r, False)
+        os.set_blocking(w, False)
+        try:
+            signal.signal(signal.SIGCHLD, self._on_sigchld)
+        except ValueError:
+            # fora do thread principal não há handler: reap periódico
+            os.close(r)
+            os.close(w)
+            reactor.call_every(1.0, self.reap)
+            return
+        self._wake_r, self._wake_w = r, w
+        reactor.add_reader(r, self._drain)
+
+    def _on_sigchld(self, signum, frame):
+        # handler mínimo: o trabalho de verdade roda no loop
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
+
+    def _drain(self):
+        try:
+            while os.read(self._wake_r, 512):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+        self.reap()
+
+    def reap(self):
+        """waitpid(WNOHANG) só nos pids deste Spawner; nunca bloqueia."""
+        for pid in list(self.children):
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done, status = pid, None
+            if not done:
+                continue
+            child = self.children.pop(pid)
+            child.status = status
+            self.awaiting_map.pop(pid, None)
+            self.reaped += 1
+
+    # =======================
+    # SPAWN
+    # =======================
+    def available(self, program):
+        """shutil.which com cache (PATH não muda durante a sessão)."""
+        if program not in self._which:
+            self._which[program] = shutil.which(program)
+        return self._which[program] is not None
+
+    def spawn(self, cmd, track_map=True):
+        """Lança `cmd` (str ou lista). Retorna o pid ou None em erro.
+
+        track_map: espera uma janela do processo para medir a latência
+        spawn -> primeiro map (desligue para utilitários sem janela).
+        """
+        argv = to_argv(cmd)
+        if not argv:
+            return None
+        if self.reactor is None:
+            # sem reator não há SIGCHLD: aproveita o spawn para colher
+            self.reap()
+        try:
+            pid = os.posix_spawnp(
+                argv[0], argv, os.environ,
+                file_actions=[(os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0)],
+                setsigdef=DEFAULT_SIGNALS,
+                setsid=True,
+            )
+        except OSError as e:
+            print(f"[Spawner] erro ao executar {cmd!r}: {e}")
+            return None
+        label = cmd if isinstance(cmd, str) else " ".join(argv)
+        child = Child(pid, label, time.monotonic())
+        self.children[pid] = child
+        if track_map:
+            self.awaiting_map[pid] = child
+        self.spawned += 1
+        return pid
+
+    # =======================
+    # LATÊNCIA ATÉ O PRIMEIRO MAP
+    # =======================
+    def window_mapped(self, pid):
+        """Chamado pelo WM ao gerenciar uma janela com _NET_WM_PID.
+
+        Apps que fazem fork (ou sh -c sem exec) têm outro pid: sobe alguns
+        níveis de ppid até achar um processo lançado aqui.
+        """
+        if not pid or not self.awaiting_map:
+            return None
+        child = None
+        for _ in range(4):
+            child = self.awaiting_map.pop(pid, None)
+            if child is not None:
+                break
+            pid = parent_pid(pid)
+            if not pid or pid == 1:
+                return None
+        if child is None:
+            return None
+        child.mapped = time.monotonic()
+        elapsed = child.mapped - child.started
+        samples = self.latency.get(child.cmd)
+        if samples is None:
+            samples = self.latency[child.cmd] = deque(maxlen=LATENCY_SAMPLES)
+        samples.append(elapsed)
+        print(f"[Spawner] {child.cmd!r}: primeira janela em {elapsed * 1000:.0f} ms")
+        return elapsed
+
+    def stats(self):
+        """Latência spawn -> map por comando, em ms."""
+        result = {}
+        for cmd, samples in self.latency.items():
+            result[cmd] = {
+                "count": len(samples),
+                "last_ms": samples[-1] * 1000,
+                "avg_ms": sum(samples) / len(samples) * 1000,
+                "max_ms": max(samples) * 1000,
+            }
+        return result
+
+    def close(self):
+        if self._wake_r is not None:
+            if self.reactor is not None:
+                self.reactor.remove_reader(self._wake_r)
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            self._wake_r = self._wake_w = None
+
+
+# Spawner usado quando não há um no Context (scripts, testes)
+_default = None
+
+
+def spawner_for(owner=None):
+    """Spawner do Context de `owner` (WM, Context ou gerenciador com .wm);
+    sem contexto, um Spawner compartilhado sem reator."""
+    global _default
+    for candidate in (owner, getattr(owner, "ctx", None),
+                      getattr(getattr(owner, "wm", None), "ctx", None)):
+        spawner = getattr(candidate, "spawner", None)
+        if isinstance(spawner, Spawner):
+            return spawner
+    if _default is None:
+        _default = Spawner()
+    return _default
@@ -0,0 +1,46 @@
+# mywm1.0/core/startup.py
+# Perfil de inicialização do MyWM (--profile-startup)
+#
+# Cronometra imports e etapas de init e marca marcos como "primeiro frame"
+# (primeira iteração do loop com flush para o servidor). Desligado, step()
+# não mede nada e o custo é desprezível.
+
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    """Tempo de cada etapa da inicialização"""
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.t0 = time.perf_counter()
+        self.steps = []        # (nome, segundos)
+        self.milestones = []   # (nome, segundos desde t0)
+
+    @contextmanager
+    def step(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.perf_counter() - start))
+
+    def mark(self, name):
+        if self.enabled:
+            self.milestones.append((name, time.perf_counter() - self.t0))
+
+    def report(self, out=None):
+        if not self.enabled:
+            return
+        out = out or sys.stderr
+        total = sum(d for _, d in self.steps) or 1e-9
+        print("[startup] etapa                              ms      %", file=out)
+        for name, d in self.steps:
+            print(f"[startup] {name:<32} {d * 1000:8.2f} {d / total * 100:6.1f}", file=out)
+        print(f"[startup] {'total das etapas':<32} {total * 1000:8.2f}", file=out)
+        for name, t in self.milestones:
+            print(f"[startup] >> {name:<29} {t * 1000:8.2f} ms após início", file=out)
@@ -0,0 +1,53 @@
+# mywm1.0/core/transaction.py
+# Camada de transação para layouts
+#
+# Eventos não reaplicam layouts diretamente: apenas marcam workspaces ou
+# monitores como "sujos". Ao fim do lote de eventos (hook idle do Reactor)
+# commit() roda um único relayout por alvo e faz um único flush, de modo que
+# todos os ConfigureWindow/MapWindow do lote saem juntos para o servidor.
+
+
+class LayoutTransaction:
+    """Conjunto de relayouts pendentes, aplicados uma vez por lote"""
+    def __init__(self, *displays):
+        self.displays = [d for d in displays if d is not None]
+        self._dirty = {}   # chave -> callback (dict preserva ordem de marcação)
+        self.commits = 0
+        self.coalesced = 0
+
+    def add_display(self, dpy):
+        if dpy is not None and dpy not in self.displays:
+            self.displays.append(dpy)
+
+    def mark(self, key, callback):
+        """Marca `key` (ex.: ("workspace", 0), ("monitor", "DP-1")) como sujo.
+
+        Marcar de novo a mesma chave no mesmo lote só troca o callback.
+        """
+        if key in self._dirty:
+            self.coalesced += 1
+        self._dirty[key] = callback
+
+    def discard(self, key):
+        self._dirty.pop(key, None)
+
+    def pending(self):
+        return bool(self._dirty)
+
+    def commit(self):
+        """Aplica os relayouts pendentes e faz um flush por conexão."""
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, {}
+        for callback in dirty.values():
+            try:
+                callback()
+            except Exception as e:
+                print(f"[Transaction] erro aplicando layout: {e}")
+        for dpy in self.displays:
+            try:
+                dpy.flush()
+            except Exception:
+                pass
+        self.commits += 1
+        return len(dirty)
@@ -1,82 +1,121 @@
 #!/usr/bin/env python3
 # mywm1.0/main.py
 # Main funcional e evoluído do MyWM 1.0+
+#
+# Imports pesados ficam dentro das funções: nada é conectado ou desenhado no
+# import, e notificações/autostart só sobem depois do primeiro frame.
 
 import sys
-import time
-from mywm.config import config
-from mywm.core.layouts import LayoutManager
-from mywm.core.ewmh import init_ewmh, update_client_list, set_current_desktop, set_active_window
-from mywm.managers.workspaces import WorkspaceManager
-from mywm.managers.scratchpad import ScratchpadManager
-from mywm.managers.window import WindowManager
-from mywm.managers.notificacoes import NotificationManager
-from Xlib import X, display
 
-# =======================
-# Inicialização do Display
-# =======================
-dpy = display.Display()
-root = dpy.screen().root
+from core.startup import StartupProfile
+
+# --profile-startup imprime o tempo de cada etapa até o primeiro frame
+profile = StartupProfile(enabled="--profile-startup" in sys.argv)
 
 # =======================
 # Inicialização do WM
 # =======================
 def initialize_wm():
-    # EWMH
-    init_ewmh(wm_name=config["wm_name"], workspaces=config["workspaces"]["names"])
-    
+    with profile.step("import config"):
+        from config.config import config
+    with profile.step("import core"):
+        from core.context import Context
+        from core.ewmh import init_ewmh
+        from core.layouts import LayoutManager
+        from core.reactor import Reactor
+        from core.spawner import Spawner
+
+    # Conexão X única e loop de eventos
+    with profile.step("conexão X"):
+        ctx = Context(config)
+        reactor = Reactor()
+        ctx.reactor = reactor
+        # filhos lançados com posix_spawn e colhidos via SIGCHLD no reator
+        ctx.spawner = Spawner(reactor)
+
+    # EWMH (atoms internados em um único lote)
+    with profile.step("EWMH"):
+        init_ewmh(wm_name=config["wm_name"], workspaces=config["workspaces"]["names"], context=ctx)
+
     # Gerenciadores
-    layout_manager = LayoutManager()
-    workspace_manager = WorkspaceManager(config)
-    scratchpad_manager = ScratchpadManager(config)
-    notification_manager = NotificationManager(config)
-    window_manager = WindowManager(dpy, root, layout_manager, workspace_manager, scratchpad_manager, notification_manager)
+    with profile.step("import managers"):
+        from managers.keybindings import KeyBindings
+        from managers.scratchpad import Scratchpad
+        from managers.window import WindowManager
+        from managers.workspaces import WorkspacesManager
+    with profile.step("init managers"):
+        window_manager = WindowManager(config, ctx=ctx)
+        layout_manager = LayoutManager(cache=window_manager.geometry)
+        window_manager.layout_manager = layout_manager
+        workspace_manager = WorkspacesManager(window_manager, config["workspaces"]["names"])
+        scratchpad_manager = Scratchpad(window_manager, config)
+        window_manager.setup_scratchpad(scratchpad_manager)
+        window_manager.setup_keybindings(KeyBindings(window_manager, config))
+
+    return config, reactor, layout_manager, workspace_manager, scratchpad_manager, window_manager
 
-    # Autostart
-    for cmd in config["autostart"]:
-        import subprocess
-        subprocess.Popen(cmd, shell=True)
+def start_notifications(config, reactor, window_manager):
+    with profile.step("import notifications"):
+        from managers.notifications import Notifications
+    with profile.step("init notifications"):
+        notification_manager = Notifications(window_manager, config.get("notifications"))
+        window_manager.setup_notifications(notification_manager)
+        notification_manager.start(reactor)
+    return notification_manager
 
-    return layout_manager, workspace_manager, scratchpad_manager, notification_manager, window_manager
+def run_autostart(config, reactor, window_manager):
+    with profile.step("autostart"):
+        from core.autostart import AutostartScheduler
+        # independentes sobem juntos; "after"/"ready" ordenam o resto
+        scheduler = AutostartScheduler(config["autostart"], window_manager.ctx.spawner,
+                                       reactor, window_manager)
+        scheduler.start()
+    return scheduler
 
 # =======================
 # Loop principal
 # =======================
-def main_loop(layout_manager, workspace_manager, scratchpad_manager, notification_manager, window_manager):
-    try:
-        while True:
-            # Captura eventos do X
-            window_manager.handle_events()
+def main_loop(config, reactor, layout_manager, workspace_manager, scratchpad_manager, window_manager):
+    from core.ewmh import publish, set_current_desktop, set_active_window
 
-            # Atualiza layouts e workspaces
-            workspace_manager.update()
-            layout_manager.apply(workspace_manager.get_windows(), window_manager.get_screen_geometry())
+    def sync_ewmh():
+        # roda uma vez por lote de eventos, não mais a cada 10 ms; os setters
+        # só anotam o valor e publish() escreve o que de fato mudou
+        set_current_desktop(window_manager.current_workspace)
+        focused = window_manager.focused_window
+        set_active_window(focused.window if focused else None)
+        publish()
+        # mesma conexão do WM: o reator faz um único flush ao fim do lote
 
-            # Atualiza scratchpads
-            scratchpad_manager.update()
+    # Fonte de eventos X
+    window_manager.start(reactor)
+    reactor.on_idle(sync_ewmh)
 
-            # Atualiza EWMH
-            update_client_list(window_manager.get_windows())
-            set_current_desktop(workspace_manager.current_index)
-            set_active_window(window_manager.get_focused_window())
+    # primeiro frame: uma iteração sem bloquear, com flush para o servidor
+    with profile.step("primeira iteração"):
+        reactor.run_once(timeout=0)
+    profile.mark("primeiro frame")
 
-            # Atualiza notificações
-            notification_manager.update(workspace_manager, scratchpad_manager, window_manager)
-
-            # Delay mínimo para não sobrecarregar CPU
-            time.sleep(0.01)
+    # o resto sobe com o WM já respondendo
+    notification_manager = start_notifications(config, reactor, window_manager)
+    run_autostart(config, reactor, window_manager)
+    profile.mark("notificações + autostart")
+    profile.report()
 
+    try:
+        # bloqueia em select() até haver evento X, IPC ou timer vencido
+        reactor.run()
     except KeyboardInterrupt:
         print("Encerrando MyWM...")
+        notification_manager.stop()
         sys.exit(0)
 
 # =======================
 # Main
 # =======================
 def main():
-    layout_manager, workspace_manager, scratchpad_manager, notification_manager, window_manager = initialize_wm()
-    main_loop(layout_manager, workspace_manager, scratchpad_manager, notification_manager, window_manager)
+    managers = initialize_wm()
+    main_loop(*managers)
 
 if __name__ == "__main__":
     main()
@@ -38,12 +38,16 @@ class Decorations:
         except Exception:
             layout = None
 
+        clients = getattr(self.wm, "clients", None)
         n = len(getattr(monitor, "windows", []))
         for i, win in enumerate(list(getattr(monitor, "windows", []))):
-            try:
-                geom = win.get_geometry()
-            except Exception:
-                continue
+            # geometria do registro (mantida por ConfigureNotify), sem round trip
+            geom = clients.client(win) if clients is not None else None
+            if not hasattr(geom, "border_width"):
+                try:
+                    geom = win.get_geometry()
+                except Exception:
+                    continue
 
             # Bordas internas
             x = geom.x + self.inner_gap
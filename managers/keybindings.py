@@ -1,8 +1,11 @@
 # managers/keybindings.py
 # Keybindings avançados MyWM 1.2+
 
-from Xlib import X, XK
-import subprocess
+from Xlib import X, XK, error
+from functools import partial
+
+from core.keymap import DEFAULT_MODE, Keymap
+from core.spawner import spawner_for
 
 # Masks úteis (padrão X)
 MOD_MAP = {
@@ -16,9 +19,71 @@ MOD_MAP = {
     "Mod5": X.Mod5Mask,
 }
 
-# máscaras extras para NumLock/Caps (valores comuns; o ideal é obter do display)
-NUMLOCK_MASK = 1 << 5  # fallback — o ideal é detectar dinamicamente
+# bits de modificador do campo state (o resto são botões do mouse)
+ALL_MODS = (X.ShiftMask | X.LockMask | X.ControlMask | X.Mod1Mask | X.Mod2Mask
+            | X.Mod3Mask | X.Mod4Mask | X.Mod5Mask)
 CAPSLOCK_MASK = X.LockMask
+# ordem das linhas de get_modifier_mapping()
+MODIFIER_MASKS = (X.ShiftMask, X.LockMask, X.ControlMask, X.Mod1Mask,
+                  X.Mod2Mask, X.Mod3Mask, X.Mod4Mask, X.Mod5Mask)
+
+
+# tempo (s) para completar um acorde antes de voltar à raiz do modo
+CHORD_TIMEOUT = 1.5
+
+
+def numlock_mask(dpy, mapping=None):
+    """Máscara real do NumLock segundo o modifier mapping do servidor."""
+    try:
+        numlock = {code for code, _ in dpy.keysym_to_keycodes(XK.XK_Num_Lock)}
+        if mapping is None:
+            mapping = dpy.get_modifier_mapping()
+        for mask, keycodes in zip(MODIFIER_MASKS, mapping):
+            if numlock.intersection(keycodes):
+                return mask
+    except Exception:
+        pass
+    return 0
+
+class KeyGrabs:
+    """Conjunto de grabs ativos na raiz, atualizado por diferença
+
+    apply() recebe o conjunto desejado de (keycode, máscara), envia só os
+    UngrabKey/GrabKey que mudaram, todos em sequência, e faz um único sync
+    para colher os erros. BadAccess (tecla já pega por outro cliente) vira
+    conflito reportado em vez de exceção engolida por chamada.
+    """
+    def __init__(self, dpy, root):
+        self.dpy = dpy
+        self.root = root
+        self.active = set()
+        self.conflicts = set()
+        self.sent = 0
+
+    def apply(self, wanted):
+        wanted = set(wanted)
+        stale = self.active - wanted
+        new = wanted - self.active
+        for keycode, mask in stale:
+            self.root.ungrab_key(keycode, mask)
+        catchers = []
+        for keycode, mask in new:
+            catcher = error.CatchError(error.BadAccess)
+            self.root.grab_key(keycode, mask, True, X.GrabModeAsync, X.GrabModeAsync,
+                               onerror=catcher)
+            catchers.append(((keycode, mask), catcher))
+        self.sent += len(stale) + len(new)
+        if catchers or stale:
+            # um round trip para todo o lote
+            self.dpy.sync()
+        conflicts = {grab for grab, catcher in catchers if catcher.get_error()}
+        self.active = (self.active - stale) | (new - conflicts)
+        self.conflicts = (self.conflicts & wanted) | conflicts
+        return conflicts
+
+    def release(self):
+        return self.apply(())
+
 
 class KeyBindings:
     def __init__(self, wm, config=None):
@@ -27,7 +92,21 @@ class KeyBindings:
         """
         self.wm = wm
         self.config = config or {}
+        self.keys = self.config.get("keybindings", self.config)
         self.bindings = {}  # map: (keysym, mod_mask) -> callable
+        # acordes e modos: (modo, [(keysym, mask), ...], ação)
+        self.sequences = []
+        # compilado: trie por modo com arestas (keycode, máscara limpa)
+        self.keymap = Keymap()
+        # primeiro nível do modo padrão: o que recebe grab passivo
+        self.table = {}
+        self.numlock_mask = 0
+        self.clean_mask = ALL_MODS & ~CAPSLOCK_MASK
+        self.modifier_keycodes = set()
+        self.grabs = None
+        self.keyboard_grabbed = False
+        self.chord_timeout = self.keys.get("chord_timeout", CHORD_TIMEOUT)
+        self._chord_timer = None
         self._setup_default_bindings()
 
     # =======================
@@ -36,13 +115,49 @@ class KeyBindings:
     def _setup_default_bindings(self):
         # limpa e registra
         self.bindings.clear()
-        self._bind_from_string(self.config.get("alt_tab", "Mod1+Tab"), self.cycle_windows)
-        self._bind_from_string(self.config.get("mod_enter", "Mod4+Return"), self.launch_terminal)
-        self._bind_from_string(self.config.get("mod_shift_q", "Mod4+Shift+q"), self.close_focused)
-        self._bind_from_string(self.config.get("mod_space", "Mod4+space"), self.next_layout)
-        self._bind_from_string(self.config.get("mod_shift_space", "Mod4+Shift+space"), self.prev_layout)
-        self._bind_from_string(self.config.get("mod_shift_s", "Mod4+Shift+s"), self.toggle_scratchpad)
-        self._bind_from_string(self.config.get("mod_r", "Mod4+r"), self.reload_config)
+        keys = self.keys
+        self._bind_from_string(keys.get("alt_tab", "Mod1+Tab"), self.cycle_windows)
+        self._bind_from_string(keys.get("mod_enter", "Mod4+Return"), self.launch_terminal)
+        self._bind_from_string(keys.get("mod_shift_q", "Mod4+Shift+q"), self.close_focused)
+        self._bind_from_string(keys.get("mod_space", "Mod4+space"), self.next_layout)
+        self._bind_from_string(keys.get("mod_shift_space", "Mod4+Shift+space"), self.prev_layout)
+        self._bind_from_string(keys.get("mod_shift_s", "Mod4+Shift+s"), self.toggle_scratchpad)
+        self._bind_from_string(keys.get("mod_r", "Mod4+r"), self.reload_config)
+        self._setup_sequences()
+
+    def _setup_sequences(self):
+        """Acordes ("Mod4+w h") e modos nomeados vindos da configuração."""
+        self.sequences = []
+        for sequence, action in self.keys.get("chords", {}).items():
+            self._bind_sequence(DEFAULT_MODE, sequence, action)
+        for mode, bindings in self.keys.get("modes", {}).items():
+            for sequence, action in bindings.items():
+                self._bind_sequence(mode, sequence, action)
+            # todo modo tem saída, mesmo que a configuração esqueça
+            if "Escape" not in bindings:
+                self._bind_sequence(mode, "Escape", "mode:" + DEFAULT_MODE)
+
+    def _bind_sequence(self, mode, sequence, action):
+        strokes = [self._parse_combo(combo) for combo in sequence.split()]
+        callback = self._resolve_action(action)
+        if strokes and all(keysym for keysym, _ in strokes) and callback:
+            self.sequences.append((mode, strokes, callback))
+        else:
+            print(f"[KeyBindings] binding ignorado: {sequence!r} -> {action!r}")
+
+    def _resolve_action(self, action):
+        """Nome de ação da configuração -> callable.
+
+        "mode:<nome>" entra num modo, "exec:<cmd>" roda um comando; outros
+        nomes são métodos deste objeto ou do WM (next_workspace, ...).
+        """
+        if callable(action):
+            return action
+        if action.startswith("mode:"):
+            return partial(self.enter_mode, action[5:])
+        if action.startswith("exec:"):
+            return partial(self.spawn, action[5:])
+        return getattr(self, action, None) or getattr(self.wm, action, None)
 
     def _normalize_token(self, tok):
         tok = tok.strip()
@@ -76,6 +191,49 @@ class KeyBindings:
         if keysym:
             self.bindings[(keysym, mask)] = action
 
+    # =======================
+    # TABELA COMPILADA
+    # =======================
+    def compile(self):
+        """Converte bindings, acordes e modos na trie de (keycode, máscara).
+
+        Feito uma vez (e de novo só em MappingNotify): o KeyPress vira um
+        acesso a dict no nó corrente, sem keycode_to_keysym por tecla.
+        """
+        dpy = self.wm.dpy
+        try:
+            mapping = dpy.get_modifier_mapping()
+        except Exception:
+            mapping = []
+        self.numlock_mask = numlock_mask(dpy, mapping)
+        self.clean_mask = ALL_MODS & ~(CAPSLOCK_MASK | self.numlock_mask)
+        self.modifier_keycodes = {code for row in mapping for code in row if code}
+
+        def keys_for(keysym, mask):
+            try:
+                keycodes = {code for code, _ in dpy.keysym_to_keycodes(keysym)}
+            except Exception:
+                keycodes = set()
+            return [(keycode, mask & self.clean_mask) for keycode in keycodes]
+
+        mode = self.keymap.mode
+        keymap = Keymap()
+        for (keysym, mask), action in self.bindings.items():
+            keymap.bind([keys_for(keysym, mask)], action)
+        for seq_mode, strokes, action in self.sequences:
+            keymap.add_mode(seq_mode)
+            keymap.bind([keys_for(keysym, mask) for keysym, mask in strokes], action, seq_mode)
+        if mode in keymap.modes:
+            keymap.set_mode(mode)
+        self.keymap = keymap
+        self.table = keymap.root(DEFAULT_MODE).children
+        return self.table
+
+    def ignored_masks(self):
+        """Combinações de Caps/NumLock que não devem impedir o atalho."""
+        lock, num = CAPSLOCK_MASK, self.numlock_mask
+        return sorted({0, lock, num, lock | num})
+
     # =======================
     # FUNÇÕES DE TECLA
     # =======================
@@ -93,42 +251,52 @@ class KeyBindings:
             self.wm.set_focus(next_win)
         except Exception:
             pass
-        if hasattr(self.wm, "notifications"):
+        if getattr(self.wm, "notifications", None):
             self.wm.notifications.window_changed()
 
     def next_layout(self):
         if hasattr(self.wm, "layout_manager"):
             self.wm.layout_manager.next_layout()
-            self.wm.layout_manager.apply(getattr(self.wm, "windows", []), getattr(self.wm, "screen_geom", None))
-        if hasattr(self.wm, "notifications"):
-            self.wm.notifications.window_changed()
+            if hasattr(self.wm, "mark_dirty"):
+                self.wm.mark_dirty()
+            else:
+                self.wm.layout_manager.apply(getattr(self.wm, "windows", []), getattr(self.wm, "screen_geom", None))
+        if getattr(self.wm, "notifications", None):
+            self.wm.notifications.changed("layout")
 
     def prev_layout(self):
         if hasattr(self.wm, "layout_manager"):
             self.wm.layout_manager.prev_layout()
-            self.wm.layout_manager.apply(getattr(self.wm, "windows", []), getattr(self.wm, "screen_geom", None))
-        if hasattr(self.wm, "notifications"):
-            self.wm.notifications.window_changed()
+            if hasattr(self.wm, "mark_dirty"):
+                self.wm.mark_dirty()
+            else:
+                self.wm.layout_manager.apply(getattr(self.wm, "windows", []), getattr(self.wm, "screen_geom", None))
+        if getattr(self.wm, "notifications", None):
+            self.wm.notifications.changed("layout")
 
     def toggle_scratchpad(self):
-        if hasattr(self.wm, "scratchpad"):
+        if getattr(self.wm, "scratchpad", None):
             self.wm.scratchpad.toggle_by_key()
-        if hasattr(self.wm, "notifications"):
+        if getattr(self.wm, "notifications", None):
             self.wm.notifications.window_changed()
 
+    def next_workspace(self):
+        self.wm.next_workspace()
+
+    def prev_workspace(self):
+        self.wm.prev_workspace()
+
+    def spawn(self, cmd):
+        # posix_spawn fora do caminho quente; o reaper do Spawner colhe o filho
+        spawner_for(self.wm).spawn(cmd)
+
     def launch_terminal(self):
-        terminal = self.config.get("terminal", "xterm")
-        try:
-            # prefer passar como lista quando possível
-            subprocess.Popen([terminal])
-        except Exception:
-            # fallback
-            subprocess.Popen(terminal, shell=True)
+        self.spawn(self.config.get("terminal", "xterm"))
 
     def close_focused(self):
         if hasattr(self.wm, "remove_focused"):
             self.wm.remove_focused()
-        if hasattr(self.wm, "notifications"):
+        if getattr(self.wm, "notifications", None):
             self.wm.notifications.notify("Janela fechada", "normal")
             self.wm.notifications.window_changed()
 
@@ -136,37 +304,136 @@ class KeyBindings:
         if hasattr(self.wm, "decorations"):
             self.wm.decorations.reload_config(self.config.get("decorations", {}))
         self._setup_default_bindings()
-        if hasattr(self.wm, "notifications"):
+        self.compile()
+        self.grab_keys()
+        # o modo corrente pode ter sumido da configuração
+        self._update_keyboard_grab()
+        if getattr(self.wm, "notifications", None):
             self.wm.notifications.notify("Configuração recarregada", "low")
 
     # =======================
     # REGISTRAR ATALHOS NO X SERVER
     # =======================
     def grab_keys(self):
-        """ Registra todas as teclas no X server, considerando máscaras comuns """
-        # máscaras adicionais para NumLock/Caps — ideal detectar dinamicamente
-        extra_masks = [0, NUMLOCK_MASK, CAPSLOCK_MASK, NUMLOCK_MASK | CAPSLOCK_MASK]
-        for (keysym, base_mod), action in list(self.bindings.items()):
-            keycode = self.wm.dpy.keysym_to_keycode(keysym)
-            for extra in extra_masks:
-                mod = base_mod | extra
-                try:
-                    self.wm.root.grab_key(keycode, mod, True, X.GrabModeAsync, X.GrabModeAsync)
-                except Exception:
-                    pass
+        """ Sincroniza os grabs do X server com a tabela, considerando Caps/NumLock.
+
+        Só a diferença para o conjunto anterior é enviada, então recarregar a
+        configuração não deixa grabs velhos para trás.
+        """
+        if self.grabs is None:
+            self.grabs = KeyGrabs(self.wm.dpy, self.wm.root)
+        extra_masks = self.ignored_masks()
+        wanted = {(keycode, mask | extra)
+                  for keycode, mask in self.table for extra in extra_masks}
+        try:
+            conflicts = self.grabs.apply(wanted)
+        except Exception as e:
+            print(f"[KeyBindings] erro ao registrar atalhos: {e}")
+            return set()
+        if conflicts:
+            self._report_conflicts(conflicts)
+        return conflicts
+
+    def _report_conflicts(self, conflicts):
+        names = sorted({self._describe(keycode, mask & self.clean_mask)
+                        for keycode, mask in conflicts})
+        message = "Atalhos em uso por outro cliente: " + ", ".join(names)
+        print(f"[KeyBindings] {message}")
+        if getattr(self.wm, "notifications", None):
+            self.wm.notifications.notify(message, "normal")
+
+    def _describe(self, keycode, mask):
+        mods = [name for name, bit in MOD_MAP.items() if mask & bit]
+        try:
+            key = XK.keysym_to_string(self.wm.dpy.keycode_to_keysym(keycode, 0))
+        except Exception:
+            key = None
+        return "+".join(mods + [key or str(keycode)])
 
     # =======================
-    # TRATAR EVENTO DE TECLA
+    # TRATAR EVENTOS DE TECLADO
     # =======================
     def handle_key_press(self, event):
-        # Obtém keysym e máscara do evento
+        if event.detail in self.modifier_keycodes:
+            # Shift/Mod4 soltos no meio de um acorde não contam como tecla
+            return
+        self._cancel_chord_timer()
+        node = self.keymap.feed((event.detail, event.state & self.clean_mask))
+        if node is not None and node.is_prefix:
+            # início/meio de acorde: espera a próxima tecla com o teclado preso
+            self._update_keyboard_grab(event.time)
+            self._arm_chord_timer()
+            return
+        if node is not None and node.action:
+            self._run(node.action)
+        self._update_keyboard_grab(event.time)
+
+    def _run(self, action):
+        try:
+            action()
+        except Exception as e:
+            print(f"[KeyBindings] erro no atalho: {e}")
+
+    # =======================
+    # MODOS E ACORDES
+    # =======================
+    def enter_mode(self, mode):
+        try:
+            self.keymap.set_mode(mode)
+        except KeyError:
+            print(f"[KeyBindings] modo desconhecido: {mode}")
+            return
+        self._update_keyboard_grab()
+        if getattr(self.wm, "notifications", None):
+            self.wm.notifications.window_changed()
+
+    @property
+    def mode(self):
+        return self.keymap.mode
+
+    def _update_keyboard_grab(self, time=X.CurrentTime):
+        """Grab ativo do teclado só enquanto há acorde pendente ou modo ativo;
+        no modo padrão valem apenas os grabs passivos do primeiro nível."""
+        wanted = self.keymap.in_chord or self.keymap.mode != DEFAULT_MODE
+        if wanted == self.keyboard_grabbed:
+            return
+        try:
+            if wanted:
+                reply = self.wm.root.grab_keyboard(True, X.GrabModeAsync, X.GrabModeAsync, time)
+                self.keyboard_grabbed = reply.status == X.GrabSuccess
+            else:
+                self.wm.dpy.ungrab_keyboard(time)
+                self.keyboard_grabbed = False
+        except Exception as e:
+            print(f"[KeyBindings] erro no grab do teclado: {e}")
+
+    def _arm_chord_timer(self):
+        reactor = getattr(getattr(self.wm, "ctx", None), "reactor", None)
+        if reactor is not None and self.chord_timeout:
+            self._chord_timer = reactor.call_later(self.chord_timeout, self._chord_expired)
+
+    def _cancel_chord_timer(self):
+        if self._chord_timer is not None:
+            self._chord_timer.cancel()
+            self._chord_timer = None
+
+    def _chord_expired(self):
+        """Acorde incompleto: volta à raiz; um prefixo com ação própria
+        (ex.: "Mod4+w" e "Mod4+w h") executa a ação curta."""
+        self._chord_timer = None
+        node = self.keymap.node
+        self.keymap.reset()
+        self._update_keyboard_grab()
+        if node.action:
+            self._run(node.action)
+
+    def handle_mapping_notify(self, event):
+        """Teclado ou modificadores remapeados: recompila e refaz os grabs."""
+        if event.request not in (X.MappingKeyboard, X.MappingModifier):
+            return
         try:
-            state = event.state
-            keysym = self.wm.dpy.keycode_to_keysym(event.detail, 0)
-            # Normalizar máscara removendo NumLock/Caps para procurar binding
-            norm_state = state & ~NUMLOCK_MASK & ~CAPSLOCK_MASK
-            action = self.bindings.get((keysym, norm_state))
-            if action:
-                action()
+            self.wm.dpy.refresh_keyboard_mapping(event)
         except Exception:
             pass
+        self.compile()
+        self.grab_keys()
@@ -0,0 +1,299 @@
+# mywm1.0/managers/mixer.py
+# Backends de volume para o VolumeModule, orientados a eventos
+#
+# Antes o módulo rodava `amixer get Master` a cada update da barra (um fork
+# por segundo, mais um por troca de foco). Agora o estado é lido uma vez e
+# depois só quando o mixer avisa que mudou: um filho de longa duração
+# (`pactl subscribe` ou `amixer events`) tem o stdout registrado no reator e
+# cada linha relevante dispara uma releitura, também sem bloquear o loop.
+# O VolumeModule só lê o cache.
+#
+# FakeMixer não fala com o sistema: serve para testes e benchmarks.
+
+import os
+import re
+import shutil
+import subprocess
+
+# segundos até relançar o filho de eventos se ele morrer
+RESTART_DELAY = 5.0
+# filhos encerrados são recolhidos por polling no reator, sem wait() bloqueante:
+# intervalo entre tentativas e tentativas antes de passar do SIGTERM ao SIGKILL
+REAP_INTERVAL = 0.1
+REAP_TRIES = 10
+
+AMIXER_RE = re.compile(r"\[(\d{1,3})%\](?:.*?\[(on|off)\])?")
+PACTL_VOLUME_RE = re.compile(r"(\d{1,3})%")
+
+
+class BaseMixer:
+    """Estado do volume em cache e avisos de mudança"""
+    name = "base"
+
+    def __init__(self, control="Master"):
+        self.control = control
+        self.state = None        # (percentual, ligado) ou None
+        self.listeners = []
+        self.reactor = None
+        self.reads = 0
+
+    def add_listener(self, callback):
+        """callback(state) a cada mudança real de volume/mute."""
+        self.listeners.append(callback)
+
+    def get(self):
+        return self.state
+
+    def _set(self, state):
+        if state == self.state:
+            return
+        self.state = state
+        for callback in self.listeners:
+            try:
+                callback(state)
+            except Exception as e:
+                print(f"[Mixer] erro em listener: {e}")
+
+    def start(self, reactor=None):
+        self.reactor = reactor
+
+    def stop(self):
+        pass
+
+
+class FakeMixer(BaseMixer):
+    """Mixer em memória para testes: set() simula uma mudança no sistema"""
+    name = "fake"
+
+    def __init__(self, volume=50, on=True):
+        super().__init__()
+        self.state = (volume, on)
+
+    def set(self, volume=None, on=None):
+        current = self.state or (0, True)
+        self._set((current[0] if volume is None else int(volume),
+                   current[1] if on is None else bool(on)))
+
+
+class StreamMixer(BaseMixer):
+    """Base dos backends com filho de eventos + leituras assíncronas
+
+    Subclasses definem events_argv(), query_argv() e parse(output), e
+    is_change(line) para filtrar as linhas do stream.
+    """
+    def __init__(self, control="Master"):
+        super().__init__(control)
+        self._events = None
+        self._events_buf = b""
+        self._query = None
+        self._query_buf = b""
+        self._stale = False
+        self._restart_timer = None
+        self.running = False
+
+    # =======================
+    # CICLO
+    # =======================
+    def start(self, reactor=None):
+        self.reactor = reactor
+        self.running = True
+        if reactor is None:
+            # uso isolado: uma leitura síncrona, sem eventos
+            self._read_sync()
+            return
+        self._start_events()
+        self.refresh()
+
+    def stop(self):
+        self.running = False
+        if self._restart_timer is not None:
+            self._restart_timer.cancel()
+            self._restart_timer = None
+        for proc in (self._events, self._query):
+            self._close(proc)
+        self._events = self._query = None
+
+    def _close(self, proc):
+        if proc is None:
+            return
+        if self.reactor is not None:
+            self.reactor.remove_reader(proc.stdout)
+        try:
+            proc.stdout.close()
+        except Exception:
+            pass
+        try:
+            proc.terminate()
+        except Exception:
+            pass
+        self._reap(proc, 0)
+
+    def _reap(self, proc, tries):
+        # roda na thread do reator: nunca espera o filho, só consulta
+        try:
+            if proc.poll() is not None:
+                return
+            if tries == REAP_TRIES:
+                proc.kill()
+        except Exception:
+            return
+        if self.reactor is not None and tries < 2 * REAP_TRIES:
+            self.reactor.call_later(REAP_INTERVAL, self._reap, proc, tries + 1)
+
+    def _spawn_reader(self, argv, callback):
+        proc = subprocess.Popen(argv, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL)
+        os.set_blocking(proc.stdout.fileno(), False)
+        self.reactor.add_reader(proc.stdout, callback)
+        return proc
+
+    # =======================
+    # STREAM DE EVENTOS
+    # =======================
+    def _start_events(self):
+        self._restart_timer = None
+        if not self.running:
+            return
+        try:
+            self._events = self._spawn_reader(self.events_argv(), self._on_events)
+        except Exception as e:
+            print(f"[Mixer] não foi possível iniciar {self.name}: {e}")
+            self._events = None
+
+    def _on_events(self):
+        data = self._read_available(self._events)
+        if data is None:
+            # filho morreu: relança mais tarde e relê o estado ao voltar
+            self._close(self._events)
+            self._events = None
+            if self.running and self.reactor is not None:
+                self._restart_timer = self.reactor.call_later(RESTART_DELAY, self._restart)
+            return
+        self._events_buf += data
+        *lines, self._events_buf = self._events_buf.split(b"\n")
+        if any(self.is_change(line.decode(errors="replace")) for line in lines):
+            self.refresh()
+
+    def _restart(self):
+        self._start_events()
+        self.refresh()
+
+    # =======================
+    # LEITURA DO ESTADO
+    # =======================
+    def refresh(self):
+        """Relê o estado sem bloquear; pedidos durante uma leitura em
+        andamento viram uma única releitura no fim dela."""
+        if self.reactor is None:
+            self._read_sync()
+            return
+        if self._query is not None:
+            self._stale = True
+            return
+        self._stale = False
+        self._query_buf = b""
+        try:
+            self._query = self._spawn_reader(self.query_argv(), self._on_query)
+        except Exception:
+            self._query = None
+
+    def _on_query(self):
+        data = self._read_available(self._query)
+        if data:
+            self._query_buf += data
+            return
+        if data is None:
+            # EOF: saída completa
+            self._close(self._query)
+            self._query = None
+            self.reads += 1
+            state = self.parse(self._query_buf.decode(errors="replace"))
+            if state is not None:
+                self._set(state)
+            if self._stale:
+                self.refresh()
+
+    def _read_sync(self):
+        try:
+            out = subprocess.run(self.query_argv(), capture_output=True, timeout=2).stdout
+        except Exception:
+            return
+        self.reads += 1
+        state = self.parse(out.decode(errors="replace"))
+        if state is not None:
+            self._set(state)
+
+    @staticmethod
+    def _read_available(proc):
+        """Bytes disponíveis, b"" se nada agora, None em EOF."""
+        if proc is None:
+            return None
+        try:
+            data = os.read(proc.stdout.fileno(), 65536)
+        except BlockingIOError:
+            return b""
+        except (OSError, ValueError):
+            return None
+        return data or None
+
+
+class AmixerMixer(StreamMixer):
+    """ALSA via `amixer events` (stream) e `amixer get` (leitura)"""
+    name = "amixer"
+
+    def events_argv(self):
+        return ["amixer", "events"]
+
+    def query_argv(self):
+        return ["amixer", "get", self.control]
+
+    def is_change(self, line):
+        # ex.: "event value: numid=3,iface=MIXER,name='Master Playback Volume'"
+        return "event value" in line and f"'{self.control}" in line
+
+    def parse(self, output):
+        m = AMIXER_RE.search(output)
+        if not m:
+            return None
+        return int(m.group(1)), m.group(2) != "off"
+
+
+class PactlMixer(StreamMixer):
+    """PulseAudio/PipeWire via `pactl subscribe` e `pactl get-sink-*`"""
+    name = "pactl"
+
+    def events_argv(self):
+        return ["pactl", "subscribe"]
+
+    def query_argv(self):
+        # volume e mute do sink padrão numa única execução do shell
+        return ["sh", "-c", "pactl get-sink-volume @DEFAULT_SINK@; pactl get-sink-mute @DEFAULT_SINK@"]
+
+    def is_change(self, line):
+        # ex.: "Event 'change' on sink #0" / "Event 'change' on server"
+        return "'change' on sink" in line or "'change' on server" in line
+
+    def parse(self, output):
+        m = PACTL_VOLUME_RE.search(output)
+        if not m:
+            return None
+        return int(m.group(1)), "Mute: yes" not in output
+
+
+BACKENDS = {"pactl": PactlMixer, "amixer": AmixerMixer, "fake": FakeMixer}
+
+
+def create(cfg=None):
+    """Backend conforme cfg["volume_backend"] ("auto", "pactl", "amixer",
+    "fake"); "auto" prefere pactl (Pulse/PipeWire) e cai para amixer."""
+    cfg = cfg or {}
+    choice = cfg.get("volume_backend", "auto")
+    control = cfg.get("volume_control", "Master")
+    if choice == "fake":
+        return FakeMixer()
+    if choice in BACKENDS:
+        return BACKENDS[choice](control)
+    for name in ("pactl", "amixer"):
+        if shutil.which(name):
+            return BACKENDS[name](control)
+    return None
@@ -40,6 +40,12 @@ class MultiMonitorWM:
         self.root = wm.root
         self.monitors = []
         self.focus = None
+        # registro compartilhado do WM (ou próprio, quando isolado)
+        self.clients = getattr(wm, "clients", None)
+        self._own_registry = self.clients is None
+        if self._own_registry:
+            from core.registry import ClientRegistry
+            self.clients = ClientRegistry()
         # inicializar monitores
         self.detect_monitors()
         # conectar eventos de mudança de tela (XRandR)
@@ -89,9 +95,14 @@ class MultiMonitorWM:
     # =======================
     def add_window(self, win):
         """Adiciona janela ao monitor apropriado baseado em geometria."""
-        try:
-            geom = win.get_geometry()
-        except Exception:
+        # registro do WM já tem a geometria; só consulta o X se não houver
+        geom = self.clients.client(win)
+        if not hasattr(geom, "border_width"):
+            try:
+                geom = win.get_geometry()
+            except Exception:
+                geom = None
+        if geom is None:
             # coloque no monitor 0 por padrão
             target = self.monitors[0]
         else:
@@ -113,6 +124,12 @@ class MultiMonitorWM:
                     # fallback
                     target = self.monitors[0]
         target.windows.append(win)
+        if self._own_registry:
+            # uso isolado: o registro é só nosso, então registramos aqui
+            self.clients.add(win, monitor=target)
+        else:
+            # registro do WM: quem cria a entrada é manage_window
+            self.clients.set_monitor(win, target)
         # usa layout do WM principal
         self.wm.layout_manager.add_window(win)
         self.apply_layout(target)
@@ -121,11 +138,19 @@ class MultiMonitorWM:
         self.set_focus(win)
 
     def remove_window(self, win):
-        for mon in self.monitors:
+        registered = win in self.clients
+        mon = self.clients.monitor_of(win)
+        if mon is None:
+            # entrada já removida do registro por outro gerenciador
+            mon = next((m for m in self.monitors if win in m.windows), None)
+        if mon is not None:
             if win in mon.windows:
                 mon.windows.remove(win)
+            if registered:
+                self.clients.set_monitor(win, None)
         self.wm.layout_manager.remove_window(win)
-        self.apply_all_layouts()
+        if mon is not None:
+            self.apply_layout(mon)
         if self.focus == win:
             self.focus = self.get_focused_window()
             if self.focus:
@@ -148,9 +173,8 @@ class MultiMonitorWM:
 
     def get_focused_window(self):
         # retorna foco do monitor que contém foco ou o primeiro
-        for mon in self.monitors:
-            if self.focus and self.focus in mon.windows:
-                return self.focus
+        if self.focus and self.clients.monitor_of(self.focus) is not None:
+            return self.focus
         for mon in self.monitors:
             if mon.windows:
                 return mon.windows[0]
@@ -160,7 +184,17 @@ class MultiMonitorWM:
     # APLICAR LAYOUTS
     # =======================
     def apply_layout(self, monitor):
-        """Aplica layout para um monitor específico."""
+        """Agenda o layout de um monitor para o fim do lote de eventos.
+
+        Sem transação no WM (uso isolado) aplica imediatamente.
+        """
+        transaction = getattr(self.wm, "transaction", None)
+        if transaction is None:
+            self._apply_now(monitor)
+        else:
+            transaction.mark(("monitor", monitor.name), lambda: self._apply_now(monitor))
+
+    def _apply_now(self, monitor):
         self.wm.layout_manager.apply(monitor.windows, monitor.geom())
 
     def apply_all_layouts(self):
@@ -184,13 +218,17 @@ class MultiMonitorWM:
         if target_monitor_index < 0 or target_monitor_index >= len(self.monitors):
             return
         # remove de onde está
-        for mon in self.monitors:
-            if win in mon.windows:
-                mon.windows.remove(win)
+        source = self.clients.monitor_of(win)
+        if source is not None and win in source.windows:
+            source.windows.remove(win)
         # adiciona ao monitor alvo
-        self.monitors[target_monitor_index].windows.append(win)
-        # Reaplica layouts
-        self.apply_all_layouts()
+        target = self.monitors[target_monitor_index]
+        target.windows.append(win)
+        self.clients.set_monitor(win, target)
+        # Reaplica layouts só dos monitores envolvidos
+        if source is not None and source is not target:
+            self.apply_layout(source)
+        self.apply_layout(target)
         self.set_focus(win)
 
     # =======================
@@ -4,9 +4,17 @@
 # Funcionalidades:
 # - Módulos plugáveis (clock, cpu, mem, battery, workspaces, layout, focus, volume)
 # - Barra persistente via lemonbar (escreve por stdin)
-# - IPC JSON via UNIX socket (/tmp/mywm-status.sock)
+# - IPC JSON via UNIX socket (/tmp/mywm-status.sock): snapshot único ou
+#   assinatura com deltas por linha (managers/status_ipc.py)
 # - Socket para eventos de clique (/tmp/mywm-click.sock) -> handle_click
-# - Threaded, eficiente e com fallback se dependências faltarem
+# - Orientado a eventos: timers e sockets rodam no Reactor do WM (ou num
+#   reator próprio em thread separada quando usado de forma isolada)
+# - Cada módulo tem o seu período (clock 1 s, cpu 2 s, battery 30 s) ou é
+#   só orientado a eventos (focus, layout, workspaces); apenas o segmento que
+#   mudou é recalculado e a barra só é reescrita se a linha final mudar
+# - Módulos que podem bloquear (BLOCKING: leitura de /proc e /sys, scripts)
+#   rodam num pool de threads com timeout; a barra é montada com o que já
+#   estiver pronto e, se um módulo falha ou trava, o último valor bom fica
 
 import os
 import shutil
@@ -15,49 +23,110 @@ import threading
 import time
 import socket
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-# opcional
-try:
-    import psutil
-except Exception:
-    psutil = None
+from core.reactor import Reactor
+from core.spawner import spawner_for
+from managers import mixer, sysinfo
+from managers.status_ipc import StatusServer
+
+# opcional, carregado só no primeiro uso (mantém o import do módulo barato)
+_PSUTIL = False  # False = ainda não tentado
+
+def _psutil():
+    global _PSUTIL
+    if _PSUTIL is False:
+        try:
+            import psutil
+            _PSUTIL = psutil
+        except Exception:
+            _PSUTIL = None
+    return _PSUTIL
 
 # -----------------------
 # Config defaults
 # -----------------------
 DEFAULT_LEMON_CMD = ["lemonbar", "-p", "-g", "1920x24+0+0", "-B", "#222", "-F", "#fff"]
+STATUS_WORKERS = 2
 STATUS_SOCKET_PATH = "/tmp/mywm-status.sock"
 CLICK_SOCKET_PATH = "/tmp/mywm-click.sock"
+# segundos até descartar uma conexão de clique que não mandou um comando
+CLICK_TIMEOUT = 5.0
+# tamanho máximo de um comando de clique
+CLICK_MAX = 4096
 
 # -----------------------
 # Módulos de Status
 # -----------------------
 class BaseModule:
+    # chave no JSON e em config["intervals"]
+    NAME = "base"
+    # período em segundos; None = só atualiza por evento
+    INTERVAL = None
+    # eventos que invalidam o segmento ("focus", "windows", "workspace", "layout")
+    EVENTS = ()
+    # get() pode bloquear? roda no pool em vez da thread do WM
+    BLOCKING = False
+    # segundos até considerar o get() travado (só para BLOCKING)
+    TIMEOUT = 2.0
     def __init__(self, wm=None, cfg=None):
         self.wm = wm
         self.cfg = cfg or {}
     def get(self):
         return ""
+    def close(self):
+        pass
 
 class ClockModule(BaseModule):
+    NAME = "clock"
+    INTERVAL = 1.0
     ICON = ""
     def get(self):
         return f"{self.ICON} {datetime.now().strftime('%H:%M:%S')}"
 
 class CpuModule(BaseModule):
+    NAME = "cpu"
+    BLOCKING = True
+    INTERVAL = 2.0
     ICON = ""
+    def __init__(self, wm=None, cfg=None):
+        super().__init__(wm, cfg)
+        self.collector = sysinfo.collector(sysinfo.CpuCollector)
+        if self.collector:
+            self.collector.sample()   # primeira amostra: base para o delta
     def get(self):
+        if self.collector:
+            try:
+                return f"{self.ICON} {self.collector.sample()}%"
+            except Exception:
+                return f"{self.ICON} ?%"
+        psutil = _psutil()
         if psutil:
             try:
                 return f"{self.ICON} {psutil.cpu_percent(interval=None)}%"
             except Exception:
                 return f"{self.ICON} ?%"
         return f"{self.ICON} n/a"
+    def close(self):
+        if self.collector:
+            self.collector.close()
 
 class MemModule(BaseModule):
+    NAME = "mem"
+    BLOCKING = True
+    INTERVAL = 5.0
     ICON = ""
+    def __init__(self, wm=None, cfg=None):
+        super().__init__(wm, cfg)
+        self.collector = sysinfo.collector(sysinfo.MemCollector)
     def get(self):
+        if self.collector:
+            try:
+                return f"{self.ICON} {self.collector.sample()}%"
+            except Exception:
+                return f"{self.ICON} ?%"
+        psutil = _psutil()
         if psutil:
             try:
                 m = psutil.virtual_memory()
@@ -65,34 +134,57 @@ class MemModule(BaseModule):
             except Exception:
                 return f"{self.ICON} ?%"
         return f"{self.ICON} n/a"
+    def close(self):
+        if self.collector:
+            self.collector.close()
 
 class BatteryModule(BaseModule):
+    NAME = "battery"
+    BLOCKING = True
+    INTERVAL = 30.0
     ICON_AC = ""
     ICON_FULL = ""
     ICON_HIGH = ""
     ICON_LOW = ""
     ICON_CRIT = ""
+    def __init__(self, wm=None, cfg=None):
+        super().__init__(wm, cfg)
+        self.collector = sysinfo.collector(sysinfo.BatteryCollector)
+    def _format(self, pct):
+        pct = int(pct)
+        if pct > 80:
+            icon = self.ICON_FULL
+        elif pct > 50:
+            icon = self.ICON_HIGH
+        elif pct > 20:
+            icon = self.ICON_LOW
+        else:
+            icon = self.ICON_CRIT
+        return f"{icon} {pct}%"
     def get(self):
+        if self.collector:
+            battery = self.collector.sample()
+            if battery is None:
+                return f"{self.ICON_AC} AC"
+            return self._format(battery[0])
+        psutil = _psutil()
         if psutil and hasattr(psutil, "sensors_battery"):
             try:
                 b = psutil.sensors_battery()
                 if not b:
                     return f"{self.ICON_AC} AC"
-                pct = int(b.percent)
-                if pct > 80:
-                    icon = self.ICON_FULL
-                elif pct > 50:
-                    icon = self.ICON_HIGH
-                elif pct > 20:
-                    icon = self.ICON_LOW
-                else:
-                    icon = self.ICON_CRIT
-                return f"{icon} {pct}%"
+                return self._format(b.percent)
             except Exception:
                 return f"{self.ICON_FULL} ?%"
-        return " n/a"
+        return " n/a"
+    def close(self):
+        if self.collector:
+            self.collector.close()
+
 
 class WorkspacesModule(BaseModule):
+    NAME = "workspaces"
+    EVENTS = ("workspace",)
     ICON = ""
     def get(self):
         ws_man = getattr(self.wm, "workspaces_manager", None)
@@ -107,6 +199,8 @@ class WorkspacesModule(BaseModule):
         return f"{self.ICON} {idx}/{t}"
 
 class LayoutModule(BaseModule):
+    NAME = "layout"
+    EVENTS = ("layout",)
     ICON = ""
     def get(self):
         lm = getattr(self.wm, "layout_manager", None)
@@ -122,40 +216,32 @@ class LayoutModule(BaseModule):
         return f"{self.ICON} {name}"
 
 class FocusModule(BaseModule):
+    NAME = "focus"
+    EVENTS = ("focus", "windows", "workspace")
     ICON = ""
     def get(self):
         focused = getattr(self.wm, "focus", None)
         if not focused:
             return f"{self.ICON} none"
-        try:
-            title = focused.get_wm_name() or "no-title"
-        except Exception:
-            title = "no-title"
+        # registro do WM mantém o título em cache (PropertyNotify); nada de
+        # round trip X aqui, isto roda na thread do WM a cada troca de foco
+        title = getattr(focused, "title", None) or "no-title"
         # truncate
         if len(title) > 30:
             title = title[:27] + "..."
         return f"{self.ICON} {title}"
 
 class VolumeModule(BaseModule):
+    NAME = "volume"
+    # sem período: o backend avisa quando o mixer muda (evento "volume")
+    EVENTS = ("volume",)
     ICON = ""
-    # tenta amixer
-    def _get_amixer(self):
-        if shutil.which("amixer") is None:
-            return None
-        try:
-            out = subprocess.check_output(["amixer", "get", "Master"], text=True, stderr=subprocess.DEVNULL)
-            # procura por '[xx%]'
-            import re
-            m = re.search(r"\[(\d{1,3})%\].*\[(on|off)\]", out)
-            if m:
-                pct = int(m.group(1))
-                on = m.group(2) == "on"
-                return pct, on
-        except Exception:
-            pass
-        return None
+    def __init__(self, wm=None, cfg=None):
+        super().__init__(wm, cfg)
+        # definido pelo Notifications (managers/mixer.py)
+        self.mixer = None
     def get(self):
-        v = self._get_amixer()
+        v = self.mixer.get() if self.mixer else None
         if v is None:
             return f"{self.ICON} n/a"
         pct, on = v
@@ -172,14 +258,19 @@ class Notifications:
         config: dict com chaves:
           - modules: lista de nomes de módulos na ordem desejada
           - lemon_cmd: comando (lista) para lemonbar (opcional)
-          - update_interval: float segundos
+          - intervals: dict módulo -> segundos (sobrepõe o INTERVAL do módulo;
+            None deixa o módulo só orientado a eventos)
+          - timeouts: dict módulo -> segundos até um módulo BLOCKING ser
+            dado como travado (sobrepõe o TIMEOUT do módulo)
+          - status_workers: threads do pool dos módulos BLOCKING (padrão 2)
           - status_socket: caminho do socket unix para status JSON
           - click_socket: caminho do socket unix para clicks
         """
         self.wm = wm
         self.cfg = config or {}
         self.lemon_cmd = self.cfg.get("lemon_cmd", DEFAULT_LEMON_CMD)
-        self.update_interval = float(self.cfg.get("update_interval", 1.0))
+        self.intervals = dict(self.cfg.get("intervals", {}))
+        self.module_timeouts = dict(self.cfg.get("timeouts", {}))
         self.status_socket = self.cfg.get("status_socket", STATUS_SOCKET_PATH)
         self.click_socket = self.cfg.get("click_socket", CLICK_SOCKET_PATH)
         self.modules = []
@@ -189,10 +280,29 @@ class Notifications:
         self._lock = threading.Lock()
         # cache de info (JSON)
         self._last_info = {}
-        # threads
-        self._t_update = None
-        self._t_status_server = None
-        self._t_click_server = None
+        # último texto de cada módulo e última linha escrita na barra
+        self._values = {}
+        self._last_line = None
+        self._render_pending = False
+        self.renders = 0
+        self.writes = 0
+        # reator (do WM ou próprio) e recursos registrados nele
+        self.reactor = None
+        self._own_reactor = False
+        self._t_reactor = None
+        self._timers = []
+        self._sockets = []
+        # conexões de clique abertas: socket -> [buffer, timer]
+        self._click_conns = {}
+        self.status_server = None
+        self.mixer = None
+        # pool dos módulos BLOCKING: nome -> future em andamento; chamadas que
+        # passaram do timeout saem de _jobs e vão para _abandoned
+        self.executor = None
+        self.workers = self.cfg.get("status_workers", STATUS_WORKERS)
+        self._jobs = {}
+        self._abandoned = set()
+        self.timeouts = 0
 
     # -----------------------
     # helper: construir módulos
@@ -224,7 +334,11 @@ class Notifications:
     # -----------------------
     # Start / Stop
     # -----------------------
-    def start(self):
+    def start(self, reactor=None):
+        """Registra timers e sockets no reator do WM.
+
+        Sem reator (uso isolado), cria um próprio e o roda numa thread daemon.
+        """
         if self.running:
             return
         self.running = True
@@ -242,18 +356,67 @@ class Notifications:
         else:
             print("[Notifications] lemonbar não encontrado; status não será exibido.")
 
-        # threads
-        self._t_update = threading.Thread(target=self._loop_update, daemon=True)
-        self._t_update.start()
+        self._own_reactor = reactor is None
+        self.reactor = reactor or Reactor()
+
+        self._start_mixer()
+        if any(m.BLOCKING for m in self.modules):
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="mywm-status")
+
+        # um timer por módulo periódico; os demais só mudam por evento
+        for m in self.modules:
+            interval = self.interval_of(m)
+            if interval:
+                self._timers.append(self.reactor.call_every(interval, self._refresh_timer, m))
+        self.reactor.call_soon(self.force_update)
 
-        self._t_status_server = threading.Thread(target=self._status_server_loop, daemon=True)
-        self._t_status_server.start()
+        sock = self._bind_socket(self.status_socket, "status")
+        if sock:
+            self.status_server = StatusServer(self.reactor, self.status_snapshot)
+            self.status_server.listen(sock)
+        sock = self._bind_socket(self.click_socket, "click")
+        if sock:
+            self.reactor.add_reader(sock, lambda s=sock: self._accept_click(s))
 
-        self._t_click_server = threading.Thread(target=self._click_server_loop, daemon=True)
-        self._t_click_server.start()
+        if self._own_reactor:
+            self._t_reactor = threading.Thread(target=self.reactor.run, daemon=True)
+            self._t_reactor.start()
 
     def stop(self):
         self.running = False
+        for timer in self._timers:
+            timer.cancel()
+        self._timers = []
+        if self.mixer:
+            self.mixer.stop()
+        if self.executor:
+            # não espera módulos travados: as threads do pool morrem com o processo
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self._jobs = {}
+        self._abandoned = set()
+        for m in self.modules:
+            try:
+                m.close()
+            except Exception:
+                pass
+        if self.status_server:
+            self.status_server.close()
+            self.status_server = None
+        for conn in list(self._click_conns):
+            self._close_click(conn)
+        for sock in self._sockets:
+            if self.reactor:
+                self.reactor.remove_reader(sock)
+            try:
+                sock.close()
+            except Exception:
+                pass
+        self._sockets = []
+        if self._own_reactor and self.reactor:
+            self.reactor.stop()
         # fechar lemonbar
         try:
             if self._lemon_proc:
@@ -312,100 +475,241 @@ class Notifications:
                 pass
 
     # -----------------------
-    # Loop de atualização
+    # Volume (backend orientado a eventos)
     # -----------------------
-    def _loop_update(self):
-        while self.running:
-            try:
-                self.force_update()
-            except Exception:
-                pass
-            time.sleep(self.update_interval)
+    def _start_mixer(self):
+        volume = [m for m in self.modules if isinstance(m, VolumeModule)]
+        if not volume:
+            return
+        if self.mixer is None:
+            self.mixer = mixer.create(self.cfg)
+        if self.mixer is None:
+            return
+        for m in volume:
+            m.mixer = self.mixer
+        self.mixer.add_listener(lambda state: self.changed("volume"))
+        self.mixer.start(self.reactor)
+
+    # -----------------------
+    # Atualização por módulo
+    # -----------------------
+    def interval_of(self, module):
+        return self.intervals.get(module.NAME, module.INTERVAL)
+
+    def timeout_of(self, module):
+        return self.module_timeouts.get(module.NAME, module.TIMEOUT)
+
+    def _refresh_timer(self, module):
+        # chamado pelo timer do próprio módulo
+        if self.running:
+            self._refresh(module)
+
+    def _refresh(self, module):
+        """Recalcula um segmento; agenda render só se o texto mudou.
+
+        Módulos BLOCKING vão para o pool e o resultado chega depois por
+        _collected(); até lá (e se falharem) vale o último valor bom.
+        """
+        if module.BLOCKING and self.executor is not None:
+            self._submit(module)
+            return False
+        try:
+            value = module.get()
+        except Exception:
+            return False
+        return self._store(module, value)
+
+    def _store(self, module, value):
+        if self._values.get(module.NAME) == value:
+            return False
+        self._values[module.NAME] = value
+        self._schedule_render()
+        return True
+
+    def _submit(self, module):
+        if module.NAME in self._jobs:
+            # ainda rodando dentro do timeout: não empilha outra chamada
+            return
+        self._abandoned = {f for f in self._abandoned if not f.done()}
+        if len(self._abandoned) >= max(self.workers - 1, 1):
+            # chamadas travadas ocupam threads que não dá para matar: deixa
+            # sempre uma livre para os outros módulos e tenta no próximo período
+            return
+        try:
+            future = self.executor.submit(module.get)
+        except RuntimeError:
+            # pool já encerrado (stop em andamento)
+            return
+        self._jobs[module.NAME] = future
+        self.reactor.call_later(self.timeout_of(module), self._timed_out, module, future)
+        future.add_done_callback(
+            lambda f, m=module: self.reactor.call_soon_threadsafe(self._collected, m, f))
+
+    def _timed_out(self, module, future):
+        if future.done() or self._jobs.get(module.NAME) is not future:
+            return
+        # abandona a chamada: o próximo período pode submeter de novo e o
+        # valor antigo continua na barra
+        del self._jobs[module.NAME]
+        self._abandoned.add(future)
+        self.timeouts += 1
+        print(f"[Notifications] módulo {module.NAME} passou de {self.timeout_of(module)}s; "
+              f"mantendo o último valor")
+
+    def _collected(self, module, future):
+        """Resultado de um módulo BLOCKING, já na thread do reator."""
+        current = self._jobs.get(module.NAME)
+        if current is future:
+            del self._jobs[module.NAME]
+        self._abandoned.discard(future)
+        if current is not None and current is not future:
+            # chamada abandonada terminou depois de outra mais nova ter saído
+            return
+        if not self.running or future.cancelled() or future.exception() is not None:
+            return
+        self._store(module, future.result())
+
+    def changed(self, *events):
+        """Algo no WM mudou: recalcula só os módulos que dependem desses eventos."""
+        if self._t_reactor is not None and threading.current_thread() is not self._t_reactor:
+            # reator próprio em outra thread: _values só é mexido por ela
+            self.reactor.call_soon_threadsafe(self._changed, events)
+            return
+        self._changed(events)
+
+    def _changed(self, events):
+        events = set(events)
+        for m in self.modules:
+            if events.intersection(m.EVENTS):
+                self._refresh(m)
 
     def force_update(self):
-        """Força coleta de todos os módulos e atualização (barra + cache JSON)."""
-        parts = []
-        data = {}
+        """Recalcula todos os módulos (início, clique) e atualiza barra + cache JSON."""
         for m in self.modules:
-            try:
-                s = m.get()
-            except Exception:
-                s = ""
-            parts.append(s)
-            # usar o nome da classe como chave no JSON
-            key = type(m).__name__.replace("Module", "").lower()
-            data[key] = s
+            self._refresh(m)
+        self._render()
+
+    def _schedule_render(self):
+        # vários segmentos mudando na mesma iteração viram um único render
+        if self.reactor is None or not self.running:
+            return
+        if not self._render_pending:
+            self._render_pending = True
+            self.reactor.call_soon_threadsafe(self._render)
+
+    def _render(self):
+        self._render_pending = False
+        parts = [self._values.get(m.NAME, "") for m in self.modules]
         text = " | ".join(p for p in parts if p)
+        self.renders += 1
+        if text == self._last_line:
+            return
+        self._last_line = text
+        data = {m.NAME: self._values.get(m.NAME, "") for m in self.modules}
         data["raw"] = text
         data["timestamp"] = time.time()
 
         # salva cache
         with self._lock:
+            previous = self._last_info
             self._last_info = data
 
+        # deltas para os assinantes do socket de status
+        if self.status_server:
+            changed = {k: v for k, v in data.items()
+                       if k != "timestamp" and previous.get(k) != v}
+            self.status_server.publish(changed, data["timestamp"])
+
         # escreve na lemonbar (se disponível)
+        self.writes += 1
         self._write_lemonbar(text)
 
     # -----------------------
-    # Accessor JSON (IPC)
+    # Sockets UNIX (IPC)
     # -----------------------
-    def _status_server_loop(self):
-        # socket UNIX que, ao conectar, envia JSON com status atual e fecha
+    def _bind_socket(self, path, label):
         sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         try:
-            sock.bind(self.status_socket)
-            sock.listen(1)
-            os.chmod(self.status_socket, 0o666)
+            sock.bind(path)
+            # assinantes ficam conectados: backlog para rajadas de reconexão
+            sock.listen(socket.SOMAXCONN)
+            sock.setblocking(False)
+            os.chmod(path, 0o666)
         except Exception as e:
-            print(f"[Notifications] Não foi possível bindar socket status: {e}")
-            return
-        while self.running:
+            print(f"[Notifications] Não foi possível bindar socket {label}: {e}")
+            sock.close()
+            return None
+        self._sockets.append(sock)
+        return sock
+
+    def _accept_click(self, sock):
+        # aceita todas as conexões pendentes; a leitura fica no reator, então
+        # um cliente que conecta e não manda nada não trava os eventos X
+        while True:
             try:
                 conn, _ = sock.accept()
-                with conn:
-                    with self._lock:
-                        payload = json.dumps(self._last_info)
-                    conn.sendall(payload.encode("utf-8"))
+            except (BlockingIOError, InterruptedError):
+                return
             except Exception:
-                # loop
-                time.sleep(0.1)
+                return
+            conn.setblocking(False)
+            timer = self.reactor.call_later(CLICK_TIMEOUT, self._close_click, conn)
+            self._click_conns[conn] = [b"", timer]
+            self.reactor.add_reader(conn, lambda c=conn: self._read_click(c))
+
+    def _close_click(self, conn):
+        state = self._click_conns.pop(conn, None)
+        if state is not None:
+            state[1].cancel()
+        if self.reactor:
+            self.reactor.remove_reader(conn)
         try:
-            sock.close()
+            conn.close()
         except Exception:
             pass
 
-    # -----------------------
-    # Click socket (recebe JSON com comando/ id )
-    # -----------------------
-    def _click_server_loop(self):
-        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    def status_snapshot(self):
+        with self._lock:
+            return dict(self._last_info)
+
+    def _read_click(self, conn):
+        # recebe JSON com comando/id: termina em newline, em EOF ou quando o
+        # buffer já é um JSON completo (clientes que mandam sem newline e esperam)
+        state = self._click_conns.get(conn)
+        if state is None:
+            return
         try:
-            sock.bind(self.click_socket)
-            sock.listen(1)
-            os.chmod(self.click_socket, 0o666)
-        except Exception as e:
-            print(f"[Notifications] Não foi possível bindar socket click: {e}")
+            data = conn.recv(CLICK_MAX)
+        except (BlockingIOError, InterruptedError):
             return
-        while self.running:
+        except Exception:
+            self._close_click(conn)
+            return
+        buf = state[0] + data
+        if not data or b"\n" in buf:
+            line = buf.split(b"\n", 1)[0]
+        else:
             try:
-                conn, _ = sock.accept()
-                with conn:
-                    data = conn.recv(4096)
-                    if not data:
-                        continue
-                    try:
-                        payload = json.loads(data.decode("utf-8"))
-                    except Exception:
-                        payload = {"raw": data.decode("utf-8", errors="ignore")}
-                    # delega para handler
-                    try:
-                        self.handle_click(payload)
-                    except Exception:
-                        pass
-            except Exception:
-                time.sleep(0.1)
+                json.loads(buf.decode("utf-8"))
+                line = buf
+            except ValueError:
+                if len(buf) > CLICK_MAX:
+                    self._close_click(conn)
+                else:
+                    state[0] = buf
+                return
+        self._close_click(conn)
+        if line.strip():
+            self._serve_click(line)
+
+    def _serve_click(self, data):
         try:
-            sock.close()
+            payload = json.loads(data.decode("utf-8"))
+        except Exception:
+            payload = {"raw": data.decode("utf-8", errors="ignore")}
+        # delega para handler
+        try:
+            self.handle_click(payload)
         except Exception:
             pass
 
@@ -428,21 +732,12 @@ class Notifications:
                         self.wm.set_workspace(int(n) - 1)
                 except Exception:
                     pass
-                # forçar update
-                self.force_update()
+                self.changed("workspace")
                 return
             if "open" in payload:
                 cmd = payload.get("open")
-                if isinstance(cmd, list):
-                    try:
-                        subprocess.Popen(cmd)
-                    except Exception:
-                        pass
-                elif isinstance(cmd, str):
-                    try:
-                        subprocess.Popen(cmd.split())
-                    except Exception:
-                        pass
+                if isinstance(cmd, (list, str)):
+                    spawner_for(self.wm).spawn(cmd)
                 return
             if "action" in payload:
                 act = payload["action"]
@@ -461,14 +756,15 @@ class Notifications:
     # Métodos utilitários
     # -----------------------
     def notify(self, message, urgency="low"):
-        if shutil.which("notify-send"):
-            try:
-                subprocess.Popen(["notify-send", "-u", urgency, "MyWM", message])
-            except Exception:
+        spawner = spawner_for(self.wm)
+        if spawner.available("notify-send"):
+            # sem janela: não entra na medição de latência de map
+            if spawner.spawn(["notify-send", "-u", urgency, "MyWM", message], track_map=False) is None:
                 print(f"[Notifications] notify-send falhou: {message}")
         else:
             print(f"[{urgency}] {message}")
 
     def window_changed(self):
-        """Chamar quando janela é criada/removida/foco mudou — força update imediato"""
-        self.force_update()
+        """Chamar quando janela é criada/removida/foco mudou; só os módulos
+        ligados a foco/janelas são recalculados"""
+        self.changed("focus", "windows")
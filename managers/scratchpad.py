@@ -2,11 +2,14 @@
 # Scratchpad avançado para MyWM
 # Funcionalidades: múltiplos scratchpads, auto-respawn, stack, persistência, integração com notifications
 
-import subprocess
 import threading
 import time
 from Xlib import X
 
+from core import ewmh
+from core.rules import RuleSet
+from core.spawner import spawner_for
+
 class ScratchpadWindow:
     def __init__(self, identifier, cmd, match=None, geometry=None, floating=True):
         self.identifier = identifier
@@ -31,6 +34,8 @@ class Scratchpad:
         self.config = config or {}
         self.scratchpads = {}
         self.lock = threading.Lock()
+        # critérios de match de todos os scratchpads compilados num RuleSet
+        self.rules = RuleSet()
         self._setup_from_config()
 
     # -------------------------
@@ -49,6 +54,20 @@ class Scratchpad:
                 geometry=sp.get("geometry"),
                 floating=sp.get("floating", True),
             )
+        self._compile_rules()
+
+    def _compile_rules(self):
+        """wm_class casa instance ou class; wm_name casa o título exato.
+        A ordem dos scratchpads define a prioridade (primeira regra vence)."""
+        specs = []
+        for spw in self.scratchpads.values():
+            wm_class = spw.match.get("wm_class")
+            if wm_class:
+                specs.append({"match": {"instance": wm_class}, "scratchpad": spw.identifier})
+                specs.append({"match": {"class": wm_class}, "scratchpad": spw.identifier})
+            if spw.match.get("wm_name"):
+                specs.append({"match": {"title": spw.match["wm_name"]}, "scratchpad": spw.identifier})
+        self.rules = RuleSet(specs)
 
     # -------------------------
     # API pública
@@ -58,7 +77,7 @@ class Scratchpad:
         if not spw:
             return
         with self.lock:
-            if not spw.windows or all(spw.is_dead(w) for w in spw.windows):
+            if not spw.windows or all(self._is_dead(spw, w) for w in spw.windows):
                 self._spawn(spw)
                 return
             if spw.visible:
@@ -81,47 +100,73 @@ class Scratchpad:
         nxt = active[(idx + 1) % len(active)]
         self._show(nxt)
 
-    def check_new_window(self, window):
-        """Chamar no MapRequest do WM para associar janelas ao scratchpad."""
-        try:
-            wm_class = window.get_wm_class() or []
-        except Exception:
-            wm_class = []
-        try:
-            wm_name = window.get_wm_name()
-        except Exception:
-            wm_name = None
+    def check_new_window(self, window, client=None):
+        """Chamar no MapRequest do WM para associar janelas ao scratchpad.
 
-        for spw in self.scratchpads.values():
-            if spw.match.get("wm_class") and spw.match["wm_class"] in wm_class:
-                self._register_window(spw, window)
-                return True
-            if spw.match.get("wm_name") and spw.match["wm_name"] == wm_name:
-                self._register_window(spw, window)
-                return True
-        return False
+        client: registro Window já preenchido pelo WM; evita novas consultas X.
+        """
+        clients = getattr(self.wm, "clients", None)
+        if clients is not None and clients.scratchpad_of(window) is not None:
+            # já registrada: é o scratchpad sendo mostrado de novo
+            return True
+        if client is not None:
+            wm_class = client.wm_class
+            wm_name = client.title
+        else:
+            try:
+                wm_class = window.get_wm_class() or []
+            except Exception:
+                wm_class = []
+            try:
+                wm_name = window.get_wm_name()
+            except Exception:
+                wm_name = None
+
+        wm_class = tuple(wm_class or ())
+        rule = self.rules.first({
+            "instance": wm_class[0] if len(wm_class) > 0 else None,
+            "class": wm_class[1] if len(wm_class) > 1 else None,
+            "title": wm_name,
+        })
+        if rule is None:
+            return False
+        self._register_window(self.scratchpads[rule.actions["scratchpad"]], window, client)
+        return True
 
     # -------------------------
     # Internos
     # -------------------------
     def _spawn(self, spw):
-        try:
-            if isinstance(spw.cmd, list):
-                subprocess.Popen(spw.cmd)
-            else:
-                subprocess.Popen(spw.cmd.split())
-        except Exception as e:
-            print(f"[Scratchpad] Erro ao spawn {spw.identifier}: {e}")
+        if spawner_for(self.wm).spawn(spw.cmd) is None:
+            print(f"[Scratchpad] Erro ao spawn {spw.identifier}")
+
+    def forget_window(self, identifier, window):
+        """Chamar no DestroyNotify de uma janela registrada (via registro do WM)."""
+        spw = self.scratchpads.get(identifier)
+        if spw and window in spw.windows:
+            spw.windows.remove(window)
+            if not spw.windows:
+                spw.visible = False
 
-    def _register_window(self, spw, window):
+    def _register_window(self, spw, window, client=None):
         spw.windows.append(window)
+        clients = getattr(self.wm, "clients", None)
+        if clients is not None:
+            clients.add(window, client, scratchpad=spw.identifier)
         spw.visible = True
         if spw.floating:
             self._apply_geometry(spw, window)
         self.wm.set_focus(window)
         # atualiza notifications se disponível
         if hasattr(self.wm, "notifications"):
-            self.wm.notifications.force_update()
+            self.wm.notifications.window_changed()
+
+    def _is_dead(self, spw, window):
+        # com o registro do WM, DestroyNotify já tirou a janela: sem round trip
+        clients = getattr(self.wm, "clients", None)
+        if clients is not None:
+            return window not in clients
+        return spw.is_dead(window)
 
     def _apply_geometry(self, spw, window):
         try:
@@ -132,6 +177,7 @@ class Scratchpad:
             gh = spw.geometry.get("height", mon["height"] // 2)
             bw = spw.geometry.get("border_width", 2)
             window.configure(x=gx, y=gy, width=gw, height=gh, border_width=bw, stack_mode=X.Above)
+            ewmh.raise_client(window.id)
         except Exception:
             pass
 
@@ -143,10 +189,10 @@ class Scratchpad:
                 pass
         spw.visible = False
         if hasattr(self.wm, "notifications"):
-            self.wm.notifications.force_update()
+            self.wm.notifications.window_changed()
 
     def _show(self, spw):
-        dead = [w for w in spw.windows if spw.is_dead(w)]
+        dead = [w for w in spw.windows if self._is_dead(spw, w)]
         for w in dead:
             spw.windows.remove(w)
         if not spw.windows:
@@ -161,4 +207,4 @@ class Scratchpad:
                 pass
         spw.visible = True
         if hasattr(self.wm, "notifications"):
-            self.wm.notifications.force_update()
+            self.wm.notifications.window_changed()
@@ -0,0 +1,252 @@
+# mywm1.0/managers/status_ipc.py
+# Servidor do socket de status: snapshot único ou assinatura com push
+#
+# Antes cada conexão recebia um JSON com o status e era fechada, então
+# polybar/eww/scripts precisavam reconectar e fazer polling. Agora o cliente
+# pode mandar comandos, um JSON por linha:
+#
+#   {"subscribe": ["focus", "workspaces"]}   -> snapshot + deltas por linha
+#   {"subscribe": []}                        -> idem, todos os tópicos
+#   {"get": true}                            -> snapshot e fecha
+#
+# Tópicos: "workspaces", "focus", "layout" e "modules" (os demais módulos:
+# clock, cpu, mem, ...); o nome de um módulo também vale como tópico. Cada
+# mensagem enviada ao assinante é uma linha JSON:
+#
+#   {"type": "snapshot", "data": {...}, "timestamp": ...}
+#   {"type": "delta", "data": {"focus": "..."}, "timestamp": ...}
+#
+# Cliente que não manda nada em LEGACY_GRACE segundos recebe o JSON antigo
+# (sem "type") e a conexão é fechada, como antes. Tudo roda no reator do WM:
+# sockets não bloqueantes, um buffer de saída por cliente e escrita só quando
+# o socket aceita (add_writer); assinante que não lê é desconectado ao passar
+# de MAX_BUFFER em vez de fazer o WM acumular memória.
+
+import json
+
+# segundos de espera por um comando antes de tratar como cliente antigo
+LEGACY_GRACE = 0.1
+# bytes pendentes de saída por cliente antes de desconectá-lo
+MAX_BUFFER = 256 * 1024
+# tamanho máximo de uma linha de comando
+MAX_LINE = 4096
+
+TOPICS = ("workspaces", "focus", "layout")
+MODULES_TOPIC = "modules"
+
+
+def topic_of(key):
+    """Tópico de uma chave do status ("cpu" -> "modules")."""
+    return key if key in TOPICS else MODULES_TOPIC
+
+
+class Client:
+    """Uma conexão no socket de status"""
+    __slots__ = ("sock", "inbuf", "outbuf", "topics", "subscribed",
+                 "closing", "writing", "grace")
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.inbuf = b""
+        self.outbuf = bytearray()
+        self.topics = None        # None = todos
+        self.subscribed = False
+        self.closing = False      # fecha ao esvaziar outbuf
+        self.writing = False      # escritor registrado no reator
+        self.grace = None
+
+    def wants(self, key):
+        return self.topics is None or key in self.topics or topic_of(key) in self.topics
+
+
+class StatusServer:
+    """Clientes do socket de status num único loop de select"""
+    def __init__(self, reactor, snapshot):
+        # snapshot() -> dict com o status atual (cache do Notifications)
+        self.reactor = reactor
+        self.snapshot = snapshot
+        self.sock = None
+        self.clients = {}         # fileno -> Client
+        self.pushed = 0
+        self.dropped = 0
+
+    # =======================
+    # CICLO
+    # =======================
+    def listen(self, sock):
+        self.sock = sock
+        self.reactor.add_reader(sock, self._accept)
+
+    def close(self):
+        for client in list(self.clients.values()):
+            self._close(client)
+        if self.sock is not None:
+            self.reactor.remove_reader(self.sock)
+            self.sock = None
+
+    @property
+    def subscribers(self):
+        return sum(1 for c in self.clients.values() if c.subscribed)
+
+    def _accept(self):
+        # aceita todas as conexões pendentes (socket não bloqueante)
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            conn.setblocking(False)
+            client = Client(conn)
+            self.clients[conn.fileno()] = client
+            self.reactor.add_reader(conn, lambda c=client: self._on_read(c))
+            client.grace = self.reactor.call_later(LEGACY_GRACE, self._legacy, client)
+
+    def _close(self, client):
+        if client.grace is not None:
+            client.grace.cancel()
+            client.grace = None
+        self.reactor.remove_reader(client.sock)
+        self.reactor.remove_writer(client.sock)
+        self.clients.pop(client.sock.fileno(), None)
+        try:
+            client.sock.close()
+        except OSError:
+            pass
+
+    # =======================
+    # ENTRADA
+    # =======================
+    def _on_read(self, client):
+        try:
+            data = client.sock.recv(MAX_LINE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self._close(client)
+            return
+        if not data:
+            # EOF: cliente antigo que fechou a escrita ainda recebe o snapshot
+            if client.subscribed or client.closing:
+                self._close(client)
+            else:
+                self._legacy(client)
+            return
+        client.inbuf += data
+        *lines, client.inbuf = client.inbuf.split(b"\n")
+        if len(client.inbuf) > MAX_LINE:
+            self._close(client)
+            return
+        for line in lines:
+            if line.strip() and client.sock.fileno() in self.clients:
+                self._command(client, line)
+
+    def _command(self, client, line):
+        if client.grace is not None:
+            client.grace.cancel()
+            client.grace = None
+        try:
+            msg = json.loads(line.decode("utf-8"))
+            if not isinstance(msg, dict):
+                raise ValueError("esperado um objeto JSON")
+        except ValueError as e:
+            self._send(client, {"type": "error", "error": str(e)})
+            return
+        if "subscribe" in msg:
+            topics = msg.get("subscribe") or ()
+            if isinstance(topics, str):
+                topics = [topics]
+            client.topics = set(topics) or None
+            client.subscribed = True
+            data = self.snapshot()
+            self._send(client, {"type": "snapshot",
+                                "data": self._select(client, data),
+                                "timestamp": data.get("timestamp")})
+        else:
+            # {"get": ...} ou comando desconhecido: snapshot e fecha
+            self._legacy(client)
+
+    def _legacy(self, client):
+        client.grace = None
+        if client.sock.fileno() not in self.clients or client.closing:
+            return
+        client.closing = True
+        self._queue(client, json.dumps(self.snapshot()).encode("utf-8"))
+
+    # =======================
+    # SAÍDA
+    # =======================
+    def _select(self, client, data):
+        return {k: v for k, v in data.items() if k != "timestamp" and client.wants(k)}
+
+    def publish(self, changed, timestamp=None):
+        """Envia `changed` (chave -> valor novo) aos assinantes interessados.
+
+        A linha é serializada uma vez por conjunto de tópicos, não por cliente.
+        """
+        if not changed:
+            return
+        lines = {}
+        for client in list(self.clients.values()):
+            if not client.subscribed or client.closing:
+                continue
+            key = frozenset(client.topics) if client.topics is not None else None
+            if key not in lines:
+                data = self._select(client, changed)
+                lines[key] = (self._encode({"type": "delta", "data": data,
+                                            "timestamp": timestamp}) if data else None)
+            if lines[key] is not None:
+                self.pushed += 1
+                self._queue(client, lines[key])
+
+    @staticmethod
+    def _encode(msg):
+        return (json.dumps(msg) + "\n").encode("utf-8")
+
+    def _send(self, client, msg):
+        self._queue(client, self._encode(msg))
+
+    def _queue(self, client, payload):
+        if client.sock.fileno() not in self.clients:
+            # já desconectado (fileno() é -1 depois do close)
+            return
+        if not client.outbuf:
+            # caminho comum: o socket aceita tudo de uma vez
+            try:
+                sent = client.sock.send(payload)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            except OSError:
+                self._close(client)
+                return
+            payload = payload[sent:]
+            if not payload:
+                if client.closing:
+                    self._close(client)
+                return
+        client.outbuf += payload
+        if len(client.outbuf) > MAX_BUFFER:
+            # assinante parado: desconecta em vez de acumular
+            self.dropped += 1
+            self._close(client)
+            return
+        if not client.writing:
+            client.writing = True
+            self.reactor.add_writer(client.sock, lambda c=client: self._on_write(c))
+
+    def _on_write(self, client):
+        try:
+            sent = client.sock.send(client.outbuf)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self._close(client)
+            return
+        del client.outbuf[:sent]
+        if client.outbuf:
+            return
+        client.writing = False
+        self.reactor.remove_writer(client.sock)
+        if client.closing:
+            self._close(client)
@@ -0,0 +1,201 @@
+# mywm1.0/managers/sysinfo.py
+# Coletores leves de CPU, memória e bateria direto de /proc e /sys
+#
+# Os módulos da barra dependiam do psutil (e mostravam "n/a" sem ele); cada
+# amostra passava pela construção de objetos genéricos do psutil. Aqui cada
+# arquivo fica aberto durante a sessão e é relido com os.preadv no offset 0
+# para um buffer pré-alocado: sem open/close, sem alocar buffer por amostra.
+# O parsing trabalha direto no bytearray (find/startswith com limites) e só
+# copia os poucos bytes de cada número. A CPU guarda os contadores da
+# amostra anterior e calcula o percentual pela diferença.
+#
+# sample() é protegido por lock: com o pool da barra uma chamada que passou
+# do timeout pode ainda estar rodando quando a próxima começa.
+#
+# Sem /proc (outro SO) os construtores levantam OSError e os módulos caem
+# para o psutil, se houver.
+
+import os
+import threading
+
+PROC_STAT = "/proc/stat"
+PROC_MEMINFO = "/proc/meminfo"
+POWER_SUPPLY = "/sys/class/power_supply"
+PLUGGED_STATUS = (b"Charging", b"Full", b"Not charging")
+
+
+class ProcFile:
+    """Arquivo de /proc ou /sys mantido aberto e relido com preadv
+
+    read()/read_head() devolvem quantos bytes válidos há em self.buf; o
+    conteúdo é lido direto do buffer, sem cópia.
+    """
+    __slots__ = ("path", "fd", "buf")
+
+    def __init__(self, path, size=4096):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+        self.buf = bytearray(size)
+
+    def read(self):
+        """Arquivo inteiro no buffer. O buffer dobra se não couber."""
+        while True:
+            n = os.preadv(self.fd, [self.buf], 0)
+            if n < len(self.buf):
+                return n
+            self.buf = bytearray(len(self.buf) * 2)
+
+    def read_head(self):
+        """Só o que couber no buffer (para quem quer as primeiras linhas)."""
+        return os.preadv(self.fd, [self.buf], 0)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+# =======================
+# CPU
+# =======================
+class CpuCollector:
+    """Uso de CPU (%) entre duas amostras da linha "cpu" de /proc/stat"""
+    def __init__(self, path=PROC_STAT):
+        # a linha agregada vem primeiro: 256 bytes bastam
+        self.file = ProcFile(path, 256)
+        self._total = None
+        self._idle = None
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """Percentual desde a amostra anterior (0.0 na primeira, como o
+        psutil.cpu_percent(interval=None))."""
+        with self._lock:
+            buf = self.file.buf
+            n = self.file.read_head()
+            end = buf.find(b"\n", 0, n)
+            # "cpu  user nice system idle iowait irq softirq steal ..." (guest
+            # já conta em user); só a primeira linha é fatiada
+            values = [int(v) for v in buf[4:n if end < 0 else end].split()[:8]]
+            total = sum(values)
+            idle = values[3] + (values[4] if len(values) > 4 else 0)
+            last_total, last_idle = self._total, self._idle
+            self._total, self._idle = total, idle
+        if last_total is None or total <= last_total:
+            return 0.0
+        busy = 1.0 - (idle - last_idle) / (total - last_total)
+        return round(max(0.0, min(busy, 1.0)) * 100, 1)
+
+    def close(self):
+        self.file.close()
+
+
+# =======================
+# MEMÓRIA
+# =======================
+def _meminfo_value(buf, n, key):
+    """kB de uma chave de /proc/meminfo, lido direto do buffer."""
+    start = buf.find(key, 0, n)
+    if start < 0:
+        return None
+    end = buf.find(b"\n", start, n)
+    # "MemTotal:       16318504 kB": int() ignora os espaços
+    return int(buf[start + len(key):(n if end < 0 else end) - 3])
+
+
+class MemCollector:
+    """Memória em uso (%) = (MemTotal - MemAvailable) / MemTotal"""
+    def __init__(self, path=PROC_MEMINFO):
+        self.file = ProcFile(path, 4096)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        with self._lock:
+            n = self.file.read()
+            buf = self.file.buf
+            total = _meminfo_value(buf, n, b"MemTotal:")
+            available = _meminfo_value(buf, n, b"MemAvailable:")
+            if available is None:
+                # kernels antigos: aproximação usada pelo próprio psutil
+                available = sum(_meminfo_value(buf, n, k) or 0
+                                for k in (b"MemFree:", b"Buffers:", b"Cached:"))
+        if not total:
+            return None
+        return round((total - available) / total * 100, 1)
+
+    def close(self):
+        self.file.close()
+
+
+# =======================
+# BATERIA
+# =======================
+def _read_text(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read().strip().decode(errors="replace")
+    except OSError:
+        return None
+
+
+class BatteryCollector:
+    """(percentual, na tomada) da primeira bateria; None se não há bateria"""
+    def __init__(self, root=POWER_SUPPLY):
+        self.root = root
+        self.capacity = None
+        self.status = None
+        self.mains = []
+        self._lock = threading.Lock()
+        self.scan()
+
+    def scan(self):
+        """Abre capacity/status da bateria e online das fontes AC."""
+        self.close()
+        try:
+            names = sorted(os.listdir(self.root))
+        except OSError:
+            return
+        for name in names:
+            base = os.path.join(self.root, name)
+            kind = _read_text(os.path.join(base, "type"))
+            try:
+                if kind == "Battery" and self.capacity is None:
+                    self.capacity = ProcFile(os.path.join(base, "capacity"), 16)
+                    self.status = ProcFile(os.path.join(base, "status"), 32)
+                elif kind == "Mains":
+                    self.mains.append(ProcFile(os.path.join(base, "online"), 8))
+            except OSError:
+                continue
+
+    def sample(self):
+        with self._lock:
+            if self.capacity is None:
+                return None
+            try:
+                cap = self.capacity
+                pct = int(cap.buf[:cap.read()])
+                status = self.status
+                n = status.read()
+                plugged = any(status.buf.startswith(s, 0, n) for s in PLUGGED_STATUS)
+                if self.mains:
+                    plugged = any(f.buf.startswith(b"1", 0, f.read()) for f in self.mains)
+            except (OSError, ValueError):
+                # bateria removida/driver recarregado: reabre na próxima
+                self.scan()
+                return None
+        return pct, plugged
+
+    def close(self):
+        for f in [self.capacity, self.status] + self.mains:
+            if f is not None:
+                f.close()
+        self.capacity = self.status = None
+        self.mains = []
+
+
+def collector(cls):
+    """Instancia o coletor ou None se o sistema não tiver /proc//sys."""
+    try:
+        return cls()
+    except (OSError, ValueError, IndexError):
+        return None
@@ -2,26 +2,130 @@
 # Window manager principal para MyWM
 # Funcionalidades: workspaces, layouts, foco, scratchpads, integração com notifications
 
-from Xlib import X, display
+from Xlib import X, Xatom
 from Xlib.protocol import event
 import threading
 import time
 
+from core import ewmh, prefetch
+from core.atoms import declare
+from core.context import Context
+from core.geometry import GeometryCache
+from core.layouts import Monocle, Tile
+from core.registry import ClientRegistry
+from core.rules import RuleSet, window_type_name
+from core.transaction import LayoutTransaction
+
+# Atoms EWMH usados pelos registros de cliente (internados uma vez pelo WM)
+CLIENT_ATOMS = declare("_NET_WM_NAME", "_NET_WM_STATE", "_NET_WM_WINDOW_TYPE", "UTF8_STRING",
+                       "_NET_WM_STATE_FULLSCREEN", "_NET_WM_PID", "WM_WINDOW_ROLE")
+# tipos de janela usados pelas regras; internados no mesmo lote, assim
+# name_of() nunca faz round trip no manage
+WINDOW_TYPE_ATOMS = declare(*("_NET_WM_WINDOW_TYPE_" + t for t in (
+    "DESKTOP", "DOCK", "TOOLBAR", "MENU", "UTILITY", "SPLASH", "DIALOG",
+    "DROPDOWN_MENU", "POPUP_MENU", "TOOLTIP", "NOTIFICATION", "COMBO", "DND", "NORMAL")))
+
 class Window:
-    """Representa uma janela gerenciada pelo WM"""
-    def __init__(self, window, wm):
+    """Registro compacto de uma janela gerenciada pelo WM.
+
+    Propriedades X (WM_NAME, WM_CLASS, geometria, hints, estado EWMH) são lidas
+    uma vez no manage e depois mantidas por PropertyNotify/ConfigureNotify, de
+    modo que os caminhos quentes (barra, decorações, multi-monitor, scratchpad)
+    nunca fazem round trip síncrono. x/y/width/height/border_width ficam no
+    próprio registro, que serve como objeto de geometria.
+    """
+    __slots__ = ("window", "wm", "id", "title", "wm_class", "hints", "net_state",
+                 "window_type", "x", "y", "width", "height", "border_width",
+                 "workspace", "floating", "pid", "role")
+
+    def __init__(self, window, wm, info=None):
         self.window = window
         self.wm = wm
-        self.title = self.get_title()
+        self.id = window.id
+        self.title = "no-title"
+        self.wm_class = ()
+        self.hints = None
+        self.net_state = set()
+        self.window_type = ()
+        self.x = self.y = 0
+        self.width = self.height = 1
+        self.border_width = 0
         self.workspace = None
         self.floating = False
+        self.pid = None
+        self.role = None
+        self.refresh(info)
 
-    def get_title(self):
-        try:
-            return self.window.get_wm_name() or "no-title"
-        except Exception:
-            return "no-title"
+    def __repr__(self):
+        return f"<Window 0x{self.id:x} {self.title!r}>"
+
+    @property
+    def fullscreen(self):
+        return self.wm.atoms["_NET_WM_STATE_FULLSCREEN"] in self.net_state
+
+    # -------------------------
+    # Cache de propriedades
+    # -------------------------
+    def refresh(self, info=None):
+        """Aplica as propriedades rastreadas (usado no manage).
+
+        info: WindowInfo já buscado em lote pelo WM; se ausente, busca agora
+        com todos os requests em pipeline (um único round trip).
+        """
+        if info is None:
+            info = prefetch.fetch(self.wm.dpy, self.window, self.wm.client_atoms)
+        self.apply_info(info)
+
+    def apply_info(self, info):
+        atoms = self.wm.atoms
+        props = info.props
+        net_name = atoms["_NET_WM_NAME"]
+        if net_name in props or Xatom.WM_NAME in props:
+            self.title = (prefetch.decode_text(props.get(net_name), atoms["UTF8_STRING"])
+                          or prefetch.decode_text(props.get(Xatom.WM_NAME), atoms["UTF8_STRING"])
+                          or "no-title")
+        if Xatom.WM_CLASS in props:
+            self.wm_class = prefetch.decode_class(props[Xatom.WM_CLASS])
+        if Xatom.WM_HINTS in props:
+            self.hints = prefetch.decode_hints(props[Xatom.WM_HINTS], self.wm.dpy)
+        if atoms["_NET_WM_STATE"] in props:
+            self.net_state = set(prefetch.decode_atoms(props[atoms["_NET_WM_STATE"]]))
+        if atoms["_NET_WM_WINDOW_TYPE"] in props:
+            self.window_type = prefetch.decode_atoms(props[atoms["_NET_WM_WINDOW_TYPE"]])
+        if atoms["WM_WINDOW_ROLE"] in props:
+            self.role = prefetch.decode_text(props[atoms["WM_WINDOW_ROLE"]], atoms["UTF8_STRING"])
+        if atoms["_NET_WM_PID"] in props:
+            self.pid = prefetch.decode_cardinal(props[atoms["_NET_WM_PID"]])
+        g = info.geometry
+        if g is not None:
+            self.x, self.y, self.width, self.height = g.x, g.y, g.width, g.height
+            self.border_width = g.border_width
 
+    def update_property(self, atom):
+        """PropertyNotify: relê só a propriedade que mudou."""
+        atoms = self.wm.atoms
+        if atom == atoms["_NET_WM_STATE"]:
+            # depois do map o WM é o dono de _NET_WM_STATE (os clientes pedem
+            # mudanças por ClientMessage); o PropertyNotify é eco da nossa escrita
+            return False
+        if atom in (Xatom.WM_NAME, atoms["_NET_WM_NAME"]):
+            # título depende das duas; ambas saem no mesmo round trip
+            wanted = (atoms["_NET_WM_NAME"], Xatom.WM_NAME)
+        elif atom in self.wm.client_atoms:
+            wanted = (atom,)
+        else:
+            return False
+        self.apply_info(prefetch.fetch(self.wm.dpy, self.window, wanted, geometry=False))
+        return True
+
+    def update_geometry(self, e):
+        """ConfigureNotify: geometria vem no próprio evento, sem round trip."""
+        self.x, self.y, self.width, self.height = e.x, e.y, e.width, e.height
+        self.border_width = e.border_width
+
+    # -------------------------
+    # Ações
+    # -------------------------
     def focus(self):
         try:
             self.window.set_input_focus(X.RevertToPointerRoot, X.CurrentTime)
@@ -48,81 +152,350 @@ class Window:
 
 class WindowManager:
     """Gerenciador de janelas principal"""
-    def __init__(self, config=None):
+    def __init__(self, config=None, ctx=None):
         self.config = config or {}
-        self.d = display.Display()
-        self.root = self.d.screen().root
-        self.windows = []
+        # conexão X única, compartilhada com EWMH, keybindings e multi-monitor
+        self.ctx = ctx or Context(self.config)
+        self.dpy = self.ctx.dpy
+        self.root = self.ctx.root
+        self.atoms = self.ctx.atoms
+        # propriedades lidas no manage e mantidas por PropertyNotify
+        self.client_atoms = (Xatom.WM_NAME, self.atoms["_NET_WM_NAME"], Xatom.WM_CLASS,
+                             Xatom.WM_HINTS, self.atoms["_NET_WM_STATE"],
+                             self.atoms["_NET_WM_WINDOW_TYPE"], self.atoms["_NET_WM_PID"],
+                             self.atoms["WM_WINDOW_ROLE"])
+        self._prefetched = {}
+        # registro id X -> cliente/workspace/monitor/scratchpad, compartilhado
+        self.clients = ClientRegistry()
+        # regras de posicionamento (config["rules"]), compiladas uma vez
+        self.rules = RuleSet(self.config.get("rules", ()))
         self.focused_window = None
         self.workspaces = [[] for _ in range(10)]
         self.current_workspace = 0
         self.layouts = ["tile", "monocle", "floating"]
         self.current_layout = "tile"
+        # monocle do WM mantém todas as janelas mapeadas em tela cheia
+        self._planners = {"tile": Tile(), "monocle": Monocle(hide_others=False)}
         self.scratchpad = None
         self.notifications = None
+        self.keybindings = None
+        # callbacks(client) chamados quando um cliente novo é gerenciado
+        self.map_listeners = []
         self.running = False
+        # relayouts pendentes; commit uma vez por lote de eventos
+        self.transaction = LayoutTransaction(self.dpy)
+        # último estado enviado por janela; só reconfigura o que mudou
+        self.geometry = GeometryCache()
 
     # -------------------------
     # Inicialização
     # -------------------------
-    def start(self):
+    def start(self, reactor=None):
         self.running = True
         # captura eventos de criação de janela
         self.root.change_attributes(event_mask=X.SubstructureNotifyMask)
-        threading.Thread(target=self.event_loop, daemon=True).start()
+        if reactor is not None:
+            # o reator acorda quando o fd da conexão X fica legível
+            reactor.add_display(self.dpy, self.handle_events)
+            reactor.on_idle(self.transaction.commit)
+        else:
+            threading.Thread(target=self.event_loop, daemon=True).start()
+
+    def fileno(self):
+        return self.dpy.fileno()
+
+    @property
+    def windows(self):
+        """Clientes gerenciados, em ordem de mapeamento."""
+        return self.clients.clients()
+
+    @property
+    def focus(self):
+        return self.focused_window
 
     # -------------------------
     # Loop de eventos
     # -------------------------
     def event_loop(self):
         while self.running:
-            e = self.d.next_event()
-            if isinstance(e, event.MapRequest):
-                self.manage_window(e.window)
-            elif isinstance(e, event.DestroyNotify):
-                self.unmanage_window(e.window)
-            elif isinstance(e, event.ConfigureRequest):
-                self.handle_configure(e)
+            self.dispatch(self.dpy.next_event())
+            if not self.dpy.pending_events():
+                self.transaction.commit()
+
+    def handle_events(self):
+        """Drena em lote todos os eventos já recebidos, sem bloquear."""
+        events = []
+        while self.dpy.pending_events():
+            events.append(self.dpy.next_event())
+        self._prefetch_new(events)
+        for e in events:
+            self.dispatch(e)
+
+    def _prefetch_new(self, events):
+        """Busca em um único pipeline as propriedades de todas as janelas
+        novas do lote (rajada de MapRequests no início da sessão)."""
+        new = [e.window for e in events
+               if isinstance(e, event.MapRequest) and e.window.id not in self.clients]
+        if not new:
+            return
+        for window in new:
+            self._select_client_events(window)
+        self._prefetched.update(prefetch.fetch_many(self.dpy, new, self.client_atoms))
+
+    def dispatch(self, e):
+        if isinstance(e, event.MapRequest):
+            self.manage_window(e.window)
+        elif isinstance(e, event.DestroyNotify):
+            self.unmanage_window(e.window)
+        elif isinstance(e, event.ConfigureRequest):
+            self.handle_configure(e)
+        elif isinstance(e, event.ConfigureNotify):
+            client = self.clients.client(e.window)
+            if isinstance(client, Window):
+                client.update_geometry(e)
+        elif isinstance(e, event.PropertyNotify):
+            self.handle_property(e)
+        elif isinstance(e, event.ClientMessage):
+            self.handle_client_message(e)
+        elif isinstance(e, event.KeyPress):
+            if self.keybindings:
+                self.keybindings.handle_key_press(e)
+        elif isinstance(e, event.MappingNotify):
+            if self.keybindings:
+                self.keybindings.handle_mapping_notify(e)
 
     # -------------------------
     # Gerenciamento de janelas
     # -------------------------
     def manage_window(self, window):
+        # MapRequest: o cliente está (re)mapeando, estado de map anterior não vale
+        self.geometry.forget_mapping(window.id)
+        entry = self.clients.get(window)
+        if entry is not None:
+            # já gerenciada (remap após unmap do próprio cliente)
+            if entry.scratchpad is None:
+                self.mark_dirty()
+            return
+
+        # propriedades lidas uma única vez (em pipeline); depois mantidas por eventos
+        info = self._prefetched.pop(window.id, None)
+        if info is None:
+            self._select_client_events(window)
+        w = Window(window, self, info)
+        # _NET_CLIENT_LIST: só estado aqui; publicado com append no fim do lote
+        ewmh.add_client(window.id)
+        ewmh.track_client(window, w.net_state)
+        # latência spawn -> primeiro map dos processos lançados pelo WM
+        if w.pid and self.ctx.spawner is not None:
+            self.ctx.spawner.window_mapped(w.pid)
+        for listener in self.map_listeners:
+            try:
+                listener(w)
+            except Exception as e:
+                print(f"[WM] erro em listener de map: {e}")
+
         # verifica se é scratchpad
-        if self.scratchpad and self.scratchpad.check_new_window(window):
+        if self.scratchpad and self.scratchpad.check_new_window(window, client=w):
             return
 
-        w = Window(window, self)
-        self.windows.append(w)
-        self.workspaces[self.current_workspace].append(w)
-        self.focus_window(w)
-        self.apply_layout()
+        actions = self.rules.resolve(self.rule_props(w)) if len(self.rules) else {}
+        workspace = self._rule_workspace(actions.get("workspace"))
+        w.workspace = workspace
+        self.clients.add(window, w, workspace=workspace)
+        self.workspaces[workspace].append(w)
+        if actions:
+            self._apply_rule_actions(w, actions)
+        if workspace == self.current_workspace:
+            self.focus_window(w)
+            if w.fullscreen:
+                # pediu tela cheia antes do map (ex.: player com --fullscreen)
+                self._place_fullscreen(w)
+            self.mark_dirty()
 
         if self.notifications:
             self.notifications.window_changed()
 
+    # -------------------------
+    # Regras
+    # -------------------------
+    def rule_props(self, client):
+        """Campos casados pelas regras, tirados do registro (sem round trip)."""
+        wm_class = tuple(client.wm_class or ())
+        wtype = None
+        if client.window_type:
+            wtype = window_type_name(self.atoms.name_of(client.window_type[0]))
+        return {
+            "instance": wm_class[0] if len(wm_class) > 0 else None,
+            "class": wm_class[1] if len(wm_class) > 1 else None,
+            "title": client.title,
+            "role": client.role,
+            "type": wtype,
+        }
+
+    def _rule_workspace(self, value):
+        """Workspace da regra: nome da config ou número a partir de 1."""
+        if value is None:
+            return self.current_workspace
+        names = self.config.get("workspaces", {}).get("names", [])
+        if str(value) in names:
+            return names.index(str(value))
+        try:
+            index = int(value) - 1
+        except (TypeError, ValueError):
+            return self.current_workspace
+        return index if 0 <= index < len(self.workspaces) else self.current_workspace
+
+    def _apply_rule_actions(self, client, actions):
+        if actions.get("floating"):
+            client.floating = True
+        geometry = actions.get("geometry")
+        if geometry:
+            self.geometry.configure(client.window,
+                                    geometry.get("x", client.x), geometry.get("y", client.y),
+                                    geometry.get("width", client.width),
+                                    geometry.get("height", client.height),
+                                    geometry.get("border_width"))
+        if client.floating and client.workspace == self.current_workspace:
+            # fora do tile: ninguém mais mapeia a janela
+            self.geometry.map(client.window)
+        monitor = actions.get("monitor")
+        monitors = getattr(self, "monitors", None)
+        if monitor is not None and hasattr(monitors, "move_window_to_monitor"):
+            names = [getattr(m, "name", None) for m in monitors.monitors]
+            index = names.index(monitor) if monitor in names else monitor
+            if isinstance(index, int):
+                monitors.move_window_to_monitor(client.window, index)
+
+    def move_to_workspace(self, win, index):
+        """Move o cliente entre as listas de self.workspaces e atualiza o
+        registro junto, para unmanage_window tirar da lista certa."""
+        entry = self.clients.get(win)
+        if entry is None or not isinstance(entry.client, Window):
+            return False
+        if not 0 <= index < len(self.workspaces) or entry.workspace == index:
+            return False
+        client = entry.client
+        if entry.workspace is not None and client in self.workspaces[entry.workspace]:
+            self.workspaces[entry.workspace].remove(client)
+        self.workspaces[index].append(client)
+        client.workspace = index
+        self.clients.set_workspace(win, index)
+        self.mark_dirty()
+        return True
+
+    def _select_client_events(self, window):
+        # selecionar antes de ler: nenhuma mudança entre leitura e seleção se perde
+        try:
+            window.change_attributes(event_mask=X.PropertyChangeMask | X.StructureNotifyMask)
+        except Exception:
+            pass
+
     def unmanage_window(self, window):
-        w = next((win for win in self.windows if win.window == window), None)
+        entry = self.clients.remove(window)
+        if entry is None:
+            return
+        self.geometry.forget(entry.wid)
+        ewmh.remove_client(entry.wid)
+        if entry.scratchpad is not None and self.scratchpad:
+            self.scratchpad.forget_window(entry.scratchpad, window)
+            return
+        w = entry.client
         if w:
-            self.windows.remove(w)
-            for ws in self.workspaces:
+            # só a lista do workspace dono é tocada
+            if entry.workspace is not None:
+                ws = self.workspaces[entry.workspace]
                 if w in ws:
                     ws.remove(w)
             if self.focused_window == w:
                 self.focused_window = None
-            self.apply_layout()
+            self.mark_dirty()
             if self.notifications:
                 self.notifications.window_changed()
 
+    def handle_property(self, e):
+        client = self.clients.client(e.window)
+        if not isinstance(client, Window):
+            return
+        old_title = client.title
+        if client.update_property(e.atom) and client is self.focused_window \
+                and client.title != old_title and self.notifications:
+            self.notifications.window_changed()
+
+    # -------------------------
+    # _NET_WM_STATE
+    # -------------------------
+    def handle_client_message(self, e):
+        if e.client_type != self.atoms["_NET_WM_STATE"]:
+            return
+        client = self.clients.client(e.window)
+        if not isinstance(client, Window):
+            return
+        action, first, second = e.data[1][:3]
+        self.change_state(client, action, {a for a in (first, second) if a})
+
+    def change_state(self, client, action, atoms):
+        """Aplica REMOVE/ADD/TOGGLE ao conjunto em memória; só o que mudou é
+        escrito (no fim do lote, pelo publisher EWMH)."""
+        current = client.net_state
+        if action == ewmh.NET_WM_STATE_ADD:
+            add, remove = atoms - current, set()
+        elif action == ewmh.NET_WM_STATE_REMOVE:
+            add, remove = set(), atoms & current
+        elif action == ewmh.NET_WM_STATE_TOGGLE:
+            add, remove = atoms - current, atoms & current
+        else:
+            return
+        if not add and not remove:
+            return
+        was_fullscreen = client.fullscreen
+        client.net_state = ewmh.state.change_window_state(client.window, add, remove)
+        if client.fullscreen != was_fullscreen:
+            if client.fullscreen:
+                self._place_fullscreen(client)
+            # os demais clientes do workspace ganham/perdem o espaço
+            self.mark_dirty()
+
+    def _place_fullscreen(self, client):
+        x, y, width, height = self._screen_area()
+        self.geometry.configure(client.window, x, y, width, height, 0, stack_mode=X.Above)
+        self.geometry.map(client.window)
+        ewmh.raise_client(client.id)
+
+    def _screen_area(self):
+        monitors = getattr(self, "monitors", None)
+        if hasattr(monitors, "get_current_geometry"):
+            try:
+                g = monitors.get_current_geometry()
+                return g["x"], g["y"], g["width"], g["height"]
+            except Exception:
+                pass
+        screen = self.ctx.screen
+        return 0, 0, screen.width_in_pixels, screen.height_in_pixels
+
     def focus_window(self, window):
         self.focused_window = window
         window.focus()
         if self.notifications:
             self.notifications.window_changed()
 
+    def set_focus(self, win):
+        """Aceita registro Window ou janela Xlib (ex.: vinda do scratchpad)."""
+        client = win if isinstance(win, Window) else self.clients.client(win)
+        if isinstance(client, Window):
+            self.focus_window(client)
+        elif win is not None:
+            try:
+                win.set_input_focus(X.RevertToPointerRoot, X.CurrentTime)
+            except Exception:
+                pass
+
     # -------------------------
     # Layouts
     # -------------------------
+    def mark_dirty(self):
+        """Agenda relayout do workspace visível para o fim do lote de eventos."""
+        self.transaction.mark(("workspace", "current"), self.apply_layout)
+
     def apply_layout(self):
         ws = self.workspaces[self.current_workspace]
         if self.current_layout == "tile":
@@ -131,58 +504,66 @@ class WindowManager:
             self.monocle(ws)
         elif self.current_layout == "floating":
             for w in ws:
-                w.map()
+                self.geometry.map(w.window)
+        self._sync_floating()
+
+    def _sync_floating(self):
+        """Flutuantes ficam fora dos planos de layout: mapeia as do workspace
+        visível e desmapeia as dos demais (o cache evita requests repetidos)."""
+        for index, ws in enumerate(self.workspaces):
+            for w in ws:
+                if not w.floating or w.fullscreen:
+                    continue
+                if index == self.current_workspace:
+                    self.geometry.map(w.window)
+                else:
+                    self.geometry.unmap(w.window)
 
     def tile(self, ws):
-        n = len(ws)
-        if n == 0:
-            return
-        screen = self.d.screen()
-        width = screen.width_in_pixels
-        height = screen.height_in_pixels
-        master_area = width // 2
-        for i, w in enumerate(ws):
-            if i == 0:
-                w.window.configure(x=0, y=0, width=master_area, height=height)
-            else:
-                w.window.configure(x=master_area, y=(i-1)*(height//(n-1)),
-                                   width=width-master_area, height=height//(n-1))
-            w.map()
+        self._apply_planned("tile", ws)
 
     def monocle(self, ws):
-        screen = self.d.screen()
-        width = screen.width_in_pixels
-        height = screen.height_in_pixels
-        for w in ws:
-            w.window.configure(x=0, y=0, width=width, height=height)
-            w.map()
+        self._apply_planned("monocle", ws)
+
+    def _apply_planned(self, name, ws):
+        # janelas em tela cheia ou flutuantes ficam fora do plano: nada de relayout para elas
+        ws = [w for w in ws if not w.fullscreen and not w.floating]
+        if not ws:
+            return
+        area = self._screen_area()
+        by_id = {w.window.id: w.window for w in ws}
+        self.geometry.apply_plan(self._planners[name].plan(list(by_id), area), by_id)
 
     # -------------------------
     # Layout/Workspace management
     # -------------------------
     def next_workspace(self):
         self.current_workspace = (self.current_workspace + 1) % len(self.workspaces)
-        self.apply_layout()
+        self.mark_dirty()
         if self.notifications:
-            self.notifications.force_update()
+            self.notifications.changed("workspace")
 
     def prev_workspace(self):
         self.current_workspace = (self.current_workspace - 1) % len(self.workspaces)
-        self.apply_layout()
+        self.mark_dirty()
         if self.notifications:
-            self.notifications.force_update()
+            self.notifications.changed("workspace")
 
     def set_layout(self, layout):
         if layout in self.layouts:
             self.current_layout = layout
-            self.apply_layout()
+            self.mark_dirty()
             if self.notifications:
-                self.notifications.force_update()
+                self.notifications.changed("layout")
 
     # -------------------------
     # ConfigureRequest handler
     # -------------------------
     def handle_configure(self, e):
+        # o cliente pediu outra geometria: o cache deixa de refletir o servidor
+        self.geometry.forget(e.window.id)
+        if e.value_mask & X.CWStackMode and e.detail == X.Above:
+            ewmh.raise_client(e.window.id)
         try:
             e.window.configure(x=e.x, y=e.y, width=e.width, height=e.height,
                                border_width=e.border_width, stack_mode=e.detail)
@@ -195,6 +576,17 @@ class WindowManager:
     def setup_scratchpad(self, scratchpad_manager):
         self.scratchpad = scratchpad_manager
 
+    def add_map_listener(self, callback):
+        self.map_listeners.append(callback)
+
+    # -------------------------
+    # Keybindings
+    # -------------------------
+    def setup_keybindings(self, keybindings):
+        self.keybindings = keybindings
+        keybindings.compile()
+        keybindings.grab_keys()
+
     # -------------------------
     # Notifications integration
     # -------------------------
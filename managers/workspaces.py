@@ -3,8 +3,9 @@
 # Multi-monitor, layouts independentes, mover janelas, scratchpads, notifications
 
 from Xlib import X
-import subprocess
-import time
+
+from core.autostart import AutostartScheduler
+from core.spawner import spawner_for
 
 class Workspace:
     """Workspace com suporte a layouts, janelas, scratchpads e notificações."""
@@ -15,6 +16,7 @@ class Workspace:
         self.focus = None
         self.scratchpads = []
         self.notifications = None
+        self.transaction = None  # LayoutTransaction do WM, se houver
 
     # -------------------------
     # Gerenciamento de janelas
@@ -22,7 +24,7 @@ class Workspace:
     def add_window(self, win):
         if win not in self.windows:
             self.windows.append(win)
-            self.apply_layout()
+            self.request_layout()
             self.set_focus(win)
             self.update_notifications()
 
@@ -31,7 +33,7 @@ class Workspace:
             self.windows.remove(win)
             if self.focus == win:
                 self.focus = self.windows[0] if self.windows else None
-            self.apply_layout()
+            self.request_layout()
             self.update_notifications()
 
     def set_focus(self, win):
@@ -45,6 +47,13 @@ class Workspace:
     # -------------------------
     # Layouts
     # -------------------------
+    def request_layout(self):
+        """Marca o workspace como sujo; o relayout sai no commit do lote."""
+        if self.transaction is None:
+            self.apply_layout()
+        else:
+            self.transaction.mark(("workspace", self.name), self.apply_layout)
+
     def apply_layout(self, screen_geom=None):
         geom = screen_geom or {"x":0, "y":0, "width":800, "height":600}
         n = len(self.windows)
@@ -69,7 +78,7 @@ class Workspace:
 
     def set_layout(self, layout):
         self.layout = layout
-        self.apply_layout()
+        self.request_layout()
         self.update_notifications()
 
     # -------------------------
@@ -102,6 +111,8 @@ class WorkspacesManager:
     def __init__(self, wm, names=None):
         self.wm = wm
         self.workspaces = [Workspace(n) for n in (names or [str(i+1) for i in range(9)])]
+        for ws in self.workspaces:
+            ws.transaction = getattr(wm, "transaction", None)
         self.current_index = 0
         self.autostart_apps = []
 
@@ -115,7 +126,7 @@ class WorkspacesManager:
         if 0 <= index < len(self.workspaces):
             self.current_index = index
             ws = self.current()
-            ws.apply_layout()
+            ws.request_layout()
             if ws.focus:
                 self.wm.set_focus(ws.focus)
             ws.update_notifications()
@@ -135,10 +146,20 @@ class WorkspacesManager:
             if current_ws:
                 current_ws.remove_window(win)
             self.workspaces[target_index].add_window(win)
-            self.workspaces[target_index].apply_layout()
+            # listas do WM e registro (índice do WM) andam juntos
+            if hasattr(self.wm, "move_to_workspace"):
+                self.wm.move_to_workspace(win, target_index)
             self.wm.set_focus(win)
 
     def find_workspace_of(self, win):
+        clients = getattr(self.wm, "clients", None)
+        if clients is not None:
+            # palpite O(1) pelo registro; o índice é o do WM, então só vale
+            # se a janela estiver mesmo nesse workspace
+            idx = clients.workspace_of(win)
+            if idx is not None and 0 <= idx < len(self.workspaces) \
+                    and win in self.workspaces[idx].windows:
+                return self.workspaces[idx]
         for ws in self.workspaces:
             if win in ws.windows:
                 return ws
@@ -159,16 +180,19 @@ class WorkspacesManager:
     def set_autostart(self, apps):
         self.autostart_apps = apps
 
-    def run_autostart(self, delay=0.1):
-        for cmd in self.autostart_apps:
-            subprocess.Popen(cmd, shell=True)
-            time.sleep(delay)
+    def run_autostart(self, delay=None):
+        """Lança os apps sem bloquear, em paralelo; a ordem vem de "after" e
+        "ready" nas entradas (ver core/autostart.py). `delay` não é mais usado."""
+        reactor = getattr(getattr(self.wm, "ctx", None), "reactor", None)
+        scheduler = AutostartScheduler(self.autostart_apps, spawner_for(self.wm), reactor, self.wm)
+        scheduler.start()
+        return scheduler
 
     # -------------------------
     # Layout e notifications
     # -------------------------
     def apply_current_layout(self):
-        self.current().apply_layout()
+        self.current().request_layout()
 
     def set_notifications(self, notifications_manager):
         for ws in self.workspaces:
@@ -0,0 +1,219 @@
+# mywm1.0/tests/test_mixer.py
+# Testes dos backends de volume (managers/mixer.py) sem amixer/pactl
+#
+# Os filhos são trocados por pipes em processo e o reator por um registro de
+# leitores/timers, então dá para alimentar linhas prontas de `pactl subscribe`
+# e `amixer events` e contar quantas releituras cada rajada dispara.
+#
+#   python3 -m pytest -q tests
+
+import os
+import time
+import unittest
+
+from managers import mixer
+from managers.notifications import VolumeModule
+
+
+# =======================
+# DUBLÊS
+# =======================
+class FakeReactor:
+    def __init__(self):
+        self.readers = {}
+        self.timers = []
+
+    def add_reader(self, fileobj, callback):
+        self.readers[fileobj] = callback
+
+    def remove_reader(self, fileobj):
+        self.readers.pop(fileobj, None)
+
+    def call_later(self, delay, callback, *args):
+        timer = FakeTimer(delay, callback, args)
+        self.timers.append(timer)
+        return timer
+
+    def run_timers(self):
+        timers, self.timers = self.timers, []
+        for timer in timers:
+            if not timer.cancelled:
+                timer.callback(*timer.args)
+
+
+class FakeTimer:
+    def __init__(self, delay, callback, args):
+        self.delay = delay
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FakeProc:
+    """Popen falso: stdout é um pipe que o teste escreve."""
+    def __init__(self, argv):
+        self.argv = argv
+        r, self._w = os.pipe()
+        self.stdout = os.fdopen(r, "rb", buffering=0)
+        self.returncode = None
+        self.signals = []
+
+    def write(self, text):
+        os.write(self._w, text.encode())
+
+    def finish(self, text=""):
+        if text:
+            self.write(text)
+        os.close(self._w)
+        self._w = None
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        self.signals.append("TERM")
+
+    def kill(self):
+        self.signals.append("KILL")
+        self.returncode = -9
+
+    def wait(self, timeout=None):
+        raise AssertionError("wait() bloqueante na thread do reator")
+
+
+def fake_backend(cls):
+    class Backend(cls):
+        def __init__(self, control="Master"):
+            super().__init__(control)
+            self.spawned = []
+
+        def _spawn_reader(self, argv, callback):
+            proc = FakeProc(argv)
+            os.set_blocking(proc.stdout.fileno(), False)
+            self.reactor.add_reader(proc.stdout, callback)
+            self.spawned.append(proc)
+            return proc
+
+        def queries(self):
+            return [p for p in self.spawned if p.argv == self.query_argv()]
+
+    return Backend
+
+
+PACTL_OUTPUT = ("Volume: front-left: 32768 /  50% / -18.06 dB,   "
+                "front-right: 32768 /  50% / -18.06 dB\n"
+                "        balance 0.00\nMute: no\n")
+AMIXER_OUTPUT = ("Simple mixer control 'Master',0\n"
+                 "  Front Left: Playback 42 [65%] [-20.00dB] [on]\n"
+                 "  Front Right: Playback 42 [65%] [-20.00dB] [on]\n")
+
+
+def feed(reactor, proc, text):
+    proc.write(text)
+    reactor.readers[proc.stdout]()
+
+
+def complete(reactor, proc, text):
+    proc.finish(text)
+    # lê até o EOF como o reator faria
+    while proc.stdout in reactor.readers:
+        reactor.readers[proc.stdout]()
+
+
+# =======================
+# TESTES
+# =======================
+class StreamMixerTests(unittest.TestCase):
+    def start(self, cls):
+        reactor = FakeReactor()
+        backend = fake_backend(cls)()
+        backend.start(reactor)
+        self.addCleanup(backend.stop)
+        events = backend.spawned[0]
+        self.assertEqual(events.argv, backend.events_argv())
+        return reactor, backend, events
+
+    def test_pactl_burst_during_query_coalesces_into_one_refresh(self):
+        reactor, backend, events = self.start(mixer.PactlMixer)
+        first = backend.queries()[0]
+        feed(reactor, events, "Event 'change' on sink #0\n"
+                              "Event 'new' on client #41\n"
+                              "Event 'change' on sink #0\n"
+                              "Event 'change' on server\n")
+        self.assertEqual(len(backend.queries()), 1)
+        complete(reactor, first, PACTL_OUTPUT)
+        self.assertEqual(backend.get(), (50, True))
+        # uma única releitura pelo lote inteiro
+        self.assertEqual(len(backend.queries()), 2)
+
+    def test_pactl_ignores_unrelated_events(self):
+        reactor, backend, events = self.start(mixer.PactlMixer)
+        complete(reactor, backend.queries()[0], PACTL_OUTPUT)
+        feed(reactor, events, "Event 'new' on client #41\nEvent 'remove' on source-output #3\n")
+        self.assertEqual(len(backend.queries()), 1)
+
+    def test_amixer_split_lines_and_burst_refresh_once(self):
+        reactor, backend, events = self.start(mixer.AmixerMixer)
+        complete(reactor, backend.queries()[0], AMIXER_OUTPUT)
+        self.assertEqual(backend.get(), (65, True))
+        line = "event value: numid=3,iface=MIXER,name='Master Playback Volume'\n"
+        # linha partida entre dois reads não dispara nada até completar
+        feed(reactor, events, line[:20])
+        self.assertEqual(len(backend.queries()), 1)
+        feed(reactor, events, line[20:] + line + "event value: numid=7,iface=MIXER,name='Capture Volume'\n")
+        self.assertEqual(len(backend.queries()), 2)
+        complete(reactor, backend.queries()[1], AMIXER_OUTPUT.replace("[on]", "[off]"))
+        self.assertEqual(backend.get(), (65, False))
+        self.assertEqual(len(backend.queries()), 2)
+
+    def test_listener_only_on_real_change(self):
+        reactor, backend, events = self.start(mixer.AmixerMixer)
+        seen = []
+        backend.add_listener(seen.append)
+        complete(reactor, backend.queries()[0], AMIXER_OUTPUT)
+        feed(reactor, events, "event value: numid=3,iface=MIXER,name='Master Playback Volume'\n")
+        complete(reactor, backend.queries()[1], AMIXER_OUTPUT)
+        self.assertEqual(seen, [(65, True)])
+
+    def test_dead_event_stream_restarts_without_blocking(self):
+        reactor, backend, events = self.start(mixer.PactlMixer)
+        t0 = time.monotonic()
+        complete(reactor, events, "")
+        self.assertLess(time.monotonic() - t0, 0.05)
+        self.assertEqual(events.signals, ["TERM"])
+        restart = [t for t in reactor.timers if t.delay == mixer.RESTART_DELAY]
+        self.assertEqual(len(restart), 1)
+        # SIGKILL só depois de REAP_TRIES consultas sem o filho sair
+        for _ in range(mixer.REAP_TRIES):
+            reactor.timers = [t for t in reactor.timers if t.delay == mixer.REAP_INTERVAL]
+            reactor.run_timers()
+        self.assertEqual(events.signals, ["TERM", "KILL"])
+
+
+class FakeMixerTests(unittest.TestCase):
+    def test_volume_module_reads_cached_state(self):
+        fake = mixer.FakeMixer(volume=30)
+        module = VolumeModule()
+        module.mixer = fake
+        self.assertTrue(module.get().endswith("30%"))
+        fake.set(on=False)
+        self.assertTrue(module.get().endswith("off"))
+
+    def test_listeners_fire_once_per_change(self):
+        fake = mixer.FakeMixer(volume=30)
+        seen = []
+        fake.add_listener(seen.append)
+        fake.set(volume=30)
+        fake.set(volume=40)
+        fake.set(volume=40)
+        self.assertEqual(seen, [(40, True)])
+
+    def test_create_fake_backend(self):
+        self.assertIsInstance(mixer.create({"volume_backend": "fake"}), mixer.FakeMixer)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+# mywm1.0/tests/test_rules.py
+# Testes das regras pré-compiladas (core/rules.py)
+#
+#   python3 -m pytest -q tests
+
+import unittest
+
+from core.rules import RuleSet
+
+
+class PatternTests(unittest.TestCase):
+    def test_numeric_backreference_keeps_its_group(self):
+        rules = RuleSet([
+            {"match": {"title": "re:(x)y"}, "floating": True},
+            {"match": {"title": r"re:(a)b\1"}, "workspace": 2},
+        ])
+        self.assertEqual([r.index for r in rules.matches({"title": "aba"})], [1])
+        self.assertEqual(rules.matches({"title": "abb"}), [])
+        # o outro padrão continua na regex combinada
+        self.assertIsNotNone(rules.fields["title"].regex)
+        self.assertEqual([r.index for r in rules.matches({"title": "xy aba"})], [0, 1])
+
+    def test_numbered_conditional_runs_alone(self):
+        rules = RuleSet([{"match": {"class": "re:^(<)?mpv(?(1)>)$"}, "floating": True}])
+        self.assertTrue(rules.matches({"class": "<mpv>"}))
+        self.assertTrue(rules.matches({"class": "mpv"}))
+        self.assertFalse(rules.matches({"class": "<mpv"}))
+
+    def test_named_backreference_stays_combined(self):
+        rules = RuleSet([{"match": {"title": "re:(?P<w>o)(?P=w)"}, "floating": True}])
+        self.assertIsNotNone(rules.fields["title"].regex)
+        self.assertTrue(rules.matches({"title": "foo"}))
+
+    def test_escaped_backslash_is_not_a_backreference(self):
+        rules = RuleSet([{"match": {"title": r"re:a\\1"}, "floating": True}])
+        self.assertIsNotNone(rules.fields["title"].regex)
+        self.assertTrue(rules.matches({"title": "a\\1"}))
+
+    def test_exact_and_pattern_fields_combine(self):
+        rules = RuleSet([
+            {"match": {"class": "Firefox", "title": "re:(?i:youtube)"}, "workspace": 3},
+            {"match": {"class": "Firefox"}, "workspace": 2, "floating": False},
+        ])
+        self.assertEqual(rules.resolve({"class": "Firefox", "title": "YouTube - x"}),
+                         {"workspace": 3, "floating": False})
+        self.assertEqual(rules.resolve({"class": "Firefox", "title": "docs"}),
+                         {"workspace": 2, "floating": False})
+
+
+if __name__ == "__main__":
+    unittest.main()